@@ -1,262 +1,115 @@
 import streamlit as st
 import pandas as pd
-import numpy as np
 import streamlit.components.v1 as components
-import requests
-from PIL import Image
-import base64
-import io
-from rapidfuzz import process, fuzz
-from openai import OpenAI
-
-CURATED_ALTERNATIVES = {
-    "Shampoo": [
-        "Ethique Shampoo Bar",
-        "Earth Rhythm Shampoo Bar",
-        "Bare Anatomy Concentrated Shampoo"
-    ],
-    "Cream": [
-        "Minimalist Marula Oil Moisturizer",
-        "Earth Rhythm Phyto Clear Moisturizer",
-        "Plum Green Tea Moisturizer"
-    ],
-    "Sunscreen": [
-        "Raw Beauty Wellness Sunscreen Stick",
-        "Minimalist SPF 50 (50g)",
-        "Dot & Key Sunscreen Stick"
-    ],
-    "Body Wash": [
-        "Ethique Solid Body Wash Bar",
-        "Earth Rhythm Body Wash Bar",
-        "Plum BodyLovin Body Wash Bar"
-    ],
-    "Food": [
-        "Dark chocolate (higher cocoa %, less packaging)",
-        "Baked snacks instead of fried",
-        "Local brand snacks with paper packaging"
-    ],
-    "Drink": [
-        "Returnable glass bottle drinks",
-        "Powder concentrates",
-        "Water in aluminum cans"
-    ]
-}
-
-
-# OPENAI SETUP (GLOBAL)
-
-OpenAIKey = st.secrets["OpenAIKey"]
-client = OpenAI(api_key=OpenAIKey)
-
-def get_greener_alternatives(current_product_name, summary_df, max_alternatives=5):
-
-    current = summary_df[summary_df["name"] == current_product_name]
-
-    if current.empty:
-        return []
-
-    row = current.iloc[0]
-    category = row["category"]
-    brand = row["brand"]
-    current_score = row["eco_score"]
-
-    # ---------- DATA-DRIVEN ----------
-    better = summary_df[
-        (summary_df["category"] == category) &
-        (summary_df["eco_score"] > current_score) &
-        (summary_df["name"] != current_product_name)
-    ].sort_values("eco_score", ascending=False)
-
-    results = []
-
-    for _, alt in better.head(max_alternatives).iterrows():
-        diff = alt["eco_score"] - current_score
-        results.append({
-            "name": alt["name"],
-            "eco_score": alt["eco_score"],
-            "improvement": f"{diff:.0f} points better eco score",
-            "score_diff": diff
-        })
-
-    return results
-
-
-def image_to_base64(image):
-    buffer = io.BytesIO()
-    image.save(buffer, format="PNG")
-    return base64.b64encode(buffer.getvalue()).decode()
-
-def ocr_image(image):
-    img_b64 = image_to_base64(image)
-
-    response = client.responses.create(
-        model="gpt-4.1-mini",
-        input=[{
-            "role": "user",
-            "content": [
-                {
-                    "type": "input_text",
-                    "text": "Extract ALL visible text from this product packaging."
-                },
-                {
-                    "type": "input_image",
-                    "image_url": f"data:image/png;base64,{img_b64}"
-                }
-            ]
-        }]
-    )
-
-    return response.output_text
-
-def extract_product_name(all_text):
-    response = client.responses.create(
-        model="gpt-4.1-mini",
-        input=f"""
-        From the following packaging text, extract the MOST LIKELY product name.
-        Respond ONLY with the product name.
-
-        TEXT:
-        {all_text}
-        """
-    )
-
-    return response.output_text.strip()
-
-def fuzzy_match_product(name, summary_df):
-    match, score, _ = process.extractOne(
-        name,
-        summary_df['name'].tolist(),
-        scorer=fuzz.token_sort_ratio
+import hashlib
+import hmac
+import json
+import logging
+import os
+import uuid
+
+from ecolens import fragments, llm, tracing
+from ecolens.alternatives import load_index as load_alternatives_index
+from ecolens.claims import check_claims, load_detector as load_claim_detector
+from ecolens.explain import explanation_markdown, prompt_context
+from ecolens.lookup import fuzzy_match_product, get_greener_alternatives, product_options
+from ecolens.profiles import DEFAULT_PROFILE, assign_profile, load_profiles, parse_arms
+from ecolens.receipts import match_receipt, read_receipt_csv, read_receipt_image
+from ecolens.reload import RELOAD_INTERVAL, CatalogueReloader
+from ecolens.scan import SCAN_WORKERS, results_frame, scan_batch
+from ecolens.session import (
+    SESSION_DB,
+    SESSION_IDLE_SECONDS,
+    SessionRegistry,
+    SessionStore,
+    cap_transcript,
+    state_nbytes,
+)
+from ecolens.shared import SharedCatalogue
+from ecolens.throttle import MODEL_RATE, USER_RATE, GatedClient, ModelGate, RateLimitExceeded
+
+# OPENAI SETUP (LAZY)
+# The client (and the openai import) is only created the first time a model
+# is actually called, so pages that just render never pay for it.
+
+@st.cache_resource(show_spinner=False)
+def openai_client():
+    return llm.make_client(st.secrets["OpenAIKey"])
+
+# Shared by every session: identical in-flight requests are made once, and
+# calls are paced per session and per model ($ECOLENS_USER_RATE and
+# $ECOLENS_MODEL_RATE, calls per second)
+@st.cache_resource(show_spinner=False)
+def model_gate():
+    return ModelGate(
+        user_rate=float(os.environ.get("ECOLENS_USER_RATE", USER_RATE)),
+        model_rate=float(os.environ.get("ECOLENS_MODEL_RATE", MODEL_RATE)),
     )
-    return match, score
-
-st.set_page_config(page_title=" EcoLens", page_icon="🌱", layout="wide")
-
-st.markdown("""
-<style>
-@import url('https://fonts.googleapis.com/css2?family=DM+Serif+Display:ital@0;1&family=Plus+Jakarta+Sans:wght@300;400;500;600;700&display=swap');
-
-/* Root variables - Option 5 Palette */
-:root {
-  --primary-green: #5D8A66;
-  --secondary-cream: #F5F1E8;
-  --accent-coral: #E8956B;
-  --text-dark: #3A4A3A;
-  --success-green: #7BA57E;
-  --warning-amber: #F4B860;
-  --error-red: #D97B6C;
-  --card-white: #FFFFFF;
-  --border-light: #E0DED8;
-  --deep-moss: #4d7554;
-}
 
-/* Global Typography */
-h1, h2, h3, h4, h5, h6 {
-  font-family: 'DM Serif Display', serif !important;
-  color: var(--text-dark) !important;
-  letter-spacing: -0.02em !important;
-}
+def model_client():
+    """This session's view of the OpenAI client, routed through the model gate."""
+    return GatedClient(openai_client(), model_gate(), user=session_id())
 
-p, div, span, label, li, input, select {
-  font-family: 'Plus Jakarta Sans', sans-serif !important;
-}
-
-.block-container { 
-  padding-top: 1rem !important; 
-  background: var(--secondary-cream);
-}
-
-/* Sticky header box */
-.sticky-header {
-  position: sticky;
-  top: 0;
-  z-index: 999;
-  background: linear-gradient(180deg, rgba(58, 74, 58, 0.98) 0%, rgba(45, 60, 45, 0.95) 100%);
-  padding: 0.8rem 0 1rem 0;
-  border-bottom: 3px solid var(--primary-green);
-  box-shadow: 0 8px 24px rgba(93, 138, 102, 0.3);
-  backdrop-filter: blur(12px);
+# =============================
+# CHART FIGURE CACHE
+# =============================
+CHART_LAYOUT = {
+    "plot_bgcolor": "rgba(245, 241, 232, 0.3)",
+    "paper_bgcolor": "rgba(0,0,0,0)",
+    "font_family": "Plus Jakarta Sans",
+    "font_color": "#3A4A3A",
 }
 
-/* Button styling with earthy feel */
-.stButton > button {
-  background: linear-gradient(135deg, var(--primary-green) 0%, var(--deep-moss) 100%) !important;
-  color: var(--secondary-cream) !important;
-  border: none !important;
-  border-radius: 16px !important;
-  font-weight: 600 !important;
-  padding: 14px 32px !important;
-  transition: all 0.4s cubic-bezier(0.4, 0, 0.2, 1) !important;
-  font-family: 'Plus Jakarta Sans', sans-serif !important;
-  box-shadow: 0 4px 16px rgba(93, 138, 102, 0.25) !important;
-  font-size: 15px !important;
-  letter-spacing: 0.3px !important;
-}
+def data_fingerprint(df):
+    hashed = pd.util.hash_pandas_object(df, index=True).values
+    digest = hashlib.sha1(hashed.tobytes())
+    digest.update(json.dumps([str(c) for c in df.columns]).encode())
+    return digest.hexdigest()
 
-.stButton > button:hover {
-  background: linear-gradient(135deg, var(--deep-moss) 0%, var(--primary-green) 100%) !important;
-  box-shadow: 0 8px 28px rgba(93, 138, 102, 0.4) !important;
-  transform: translateY(-3px) scale(1.02) !important;
-}
+@st.cache_data(max_entries=128, show_spinner=False)
+def _figure_json(chart_type, fingerprint, _data, spec_json):
+    import plotly.express as px
 
-/* Success messages */
-.success {
-  background: linear-gradient(135deg, #e8f5e9 0%, var(--secondary-cream) 100%) !important;
-  border-left: 5px solid var(--success-green) !important;
-  color: var(--text-dark) !important;
-  border-radius: 14px !important;
-  padding: 18px 22px !important;
-}
+    spec = json.loads(spec_json)
+    builders = {"line": px.line, "bar": px.bar}
+    fig = builders[chart_type](_data, **spec["px"])
+    fig.update_layout(**CHART_LAYOUT, **spec["layout"])
 
-/* Info messages */
-.info {
-  background: linear-gradient(135deg, var(--secondary-cream) 0%, #faf8f3 100%) !important;
-  border-left: 5px solid var(--primary-green) !important;
-  color: var(--text-dark) !important;
-  border-radius: 14px !important;
-  padding: 18px 22px !important;
-}
+    # The default template carries styling for every trace type Plotly knows;
+    # keep only the ones this figure draws so the spec sent to the browser
+    # stays small.
+    used = {trace.type for trace in fig.data}
+    template = fig.layout.template.to_plotly_json()
+    template["data"] = {k: v for k, v in template.get("data", {}).items() if k in used}
+    fig.layout.template = template
 
-/* Warning messages */
-.warning {
-  background: linear-gradient(135deg, #fff4e6 0%, var(--secondary-cream) 100%) !important;
-  border-left: 5px solid var(--warning-amber) !important;
-  color: #6b4423 !important;
-  border-radius: 14px !important;
-  padding: 18px 22px !important;
-}
+    return fig.to_json()
 
-/* Organic dividers */
-.stDivider {
-  margin: 3rem 0 !important;
-  border-color: var(--border-light) !important;
-  opacity: 0.4;
-}
+def cached_figure(chart_type, data, layout=None, **px_kwargs):
+    """Build (or reuse) a styled Plotly figure for ``data``.
 
-/* Smooth transitions */
-* {
-  transition: background-color 0.3s ease, color 0.3s ease, transform 0.3s ease !important;
-}
+    Figures are keyed by a fingerprint of the data plus the chart type and
+    arguments, so an unchanged chart is never rebuilt across reruns.
+    """
+    import plotly.io as pio
 
-/* Custom scrollbar */
-::-webkit-scrollbar {
-  width: 10px;
-}
+    with tracing.span(f"chart.{chart_type}"):
+        spec_json = json.dumps({"px": px_kwargs, "layout": layout or {}}, sort_keys=True)
+        fig_json = _figure_json(chart_type, data_fingerprint(data), data, spec_json)
+        return pio.from_json(fig_json)
 
-::-webkit-scrollbar-track {
-  background: var(--secondary-cream);
-}
+st.set_page_config(page_title=" EcoLens", page_icon="🌱", layout="wide")
 
-::-webkit-scrollbar-thumb {
-  background: var(--primary-green);
-  border-radius: 6px;
-}
+STATIC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "static")
 
-::-webkit-scrollbar-thumb:hover {
-  background: var(--deep-moss);
-}
-</style>
-""", unsafe_allow_html=True)
+# Global stylesheet: published once as a static file and pulled in with a
+# one-line @import, so reruns don't resend the whole <style> block and the
+# browser fetches it once per session.
+with tracing.span("css.inject"):
+    st.markdown(
+        f'<style>@import url("{fragments.theme_css_url(STATIC_DIR)}");</style>',
+        unsafe_allow_html=True
+    )
 
 
 
@@ -265,178 +118,221 @@ p, div, span, label, li, input, select {
 # -----------------------------
 PRODUCT_CSV = "product.csv"
 MATERIAL_CSV = "material.csv"
+ALTERNATIVES_CSV = "alternatives.csv"
+PROFILES_DIR = "profiles"
+CLAIMS_CSV = "claims.csv"
+# Set in multi-worker deployments: attach to the catalogue published by
+# `python -m ecolens publish` instead of scoring a private copy
+SHARED_NAMESPACE = os.environ.get("ECOLENS_SHARED")
 
 # -----------------------------
-# Step 1: Read CSV files
+# Step 1: Read + score CSV files
 # -----------------------------
-products_df = pd.read_csv(PRODUCT_CSV)
-materials_df = pd.read_csv(MATERIAL_CSV)
+# One per process: a background thread reloads the catalogue when the CSVs
+# change and swaps it in, so no rerun waits for a load
+@st.cache_resource(show_spinner=False)
+def catalogue_reloader(product_csv, material_csv, alternatives_csv):
+    interval = float(os.environ.get("ECOLENS_RELOAD_INTERVAL", RELOAD_INTERVAL))
+    return CatalogueReloader(product_csv, material_csv, alternatives_csv, interval)
+
+# One handle per worker process; every session reads the mapped snapshot
+@st.cache_resource(show_spinner=False)
+def shared_catalogue(namespace):
+    return SharedCatalogue(namespace)
+
+@st.cache_data(show_spinner=False)
+def load_alternatives(alternatives_csv, mtimes, profile_fingerprint, _materials_df, _catalogue, _profile):
+    return load_alternatives_index(alternatives_csv, _materials_df, _catalogue, _profile)
+
+# Compiled once per lexicon edit and shared by every session
+@st.cache_resource(show_spinner=False)
+def claim_detector(claims_csv, mtime):
+    return load_claim_detector(claims_csv)
 
 # -----------------------------
-# FLAGS (BEAUTY + FOOD)
+# Step 1b: Scoring profile (caps + weights)
 # -----------------------------
-ALL_FLAGS = [
-    "microplastics",
-    "petroleum",
-    "silicones",
-    "recyclable_packaging",
-    "eco_certified",
-    "ultra_processed",
-    "high_sugar",
-    "palm_oil",
-    "animal_based"
-]
-
-for c in ALL_FLAGS:
-    if c not in products_df.columns:
-        products_df[c] = 0
-
-products_df[ALL_FLAGS] = products_df[ALL_FLAGS].fillna(0).astype(int)
-
-# =============================
-# MATERIAL IMPACT DICTIONARY
-# =============================
-material_impact_dict = {}
-for _, row in materials_df.iterrows():
-    material_impact_dict[row['material']] = {
-        'carbon': row['carbon_kg_per_kg'],
-        'water': row['water_L_per_kg'],
-        'energy': row['energy_MJ_per_kg'],
-        'waste': row['waste_score']
-    }
-
-# =============================
-# INITIALIZE RESULTS
-# =============================
-products_df["total_carbon_kg"] = 0.0
-products_df["total_water_L"] = 0.0
-products_df["total_energy_MJ"] = 0.0
-products_df["total_waste_score"] = 0.0
-
-# =============================
-# PACKAGING IMPACT
-# =============================
-for i, p in products_df.iterrows():
-    carbon = water = energy = 0
-    waste_vals = []
-
-    for j in range(1, 4):
-        mat = p.get(f"material_{j}")
-        wt = p.get(f"weight_{j}_g")
-
-        if pd.isna(mat) or pd.isna(wt):
-            continue
-
-        imp = material_impact_dict.get(mat)
-        if not imp:
-            continue
-
-        kg = wt / 1000
-        carbon += kg * imp["carbon"]
-        water += kg * imp["water"]
-        energy += kg * imp["energy"]
-        waste_vals.append(imp["waste"])
-
-    products_df.at[i,"total_carbon_kg"] = carbon
-    products_df.at[i,"total_water_L"] = water
-    products_df.at[i,"total_energy_MJ"] = energy
-    products_df.at[i,"total_waste_score"] = np.mean(waste_vals) if waste_vals else 0
-
-# =============================
-# NORMALIZATION CAPS
-# =============================
-products_df["carbon_norm"] = (products_df["total_carbon_kg"] / 0.5).clip(0,1)
-products_df["water_norm"]  = (products_df["total_water_L"] / 10).clip(0,1)
-products_df["energy_norm"] = (products_df["total_energy_MJ"] / 20).clip(0,1)
-products_df["waste_norm"]  = (products_df["total_waste_score"] / 5).clip(0,1)
-
-# =============================
-# PACKAGING SCORE (0-100)
-# =============================
-products_df["packaging_score"] = (
-    (1-products_df["carbon_norm"])*0.35 +
-    (1-products_df["water_norm"])*0.25 +
-    (1-products_df["energy_norm"])*0.25 +
-    (1-products_df["waste_norm"])*0.15
-)*100
-
-products_df["packaging_score"] = products_df["packaging_score"].round(1)
-
-# =============================
-# INGREDIENT SCORE (CATEGORY AWARE)
-# =============================
-
-def ingredient_score(row):
-    cat = row["category"].lower()
-
-    # Beauty
-    if cat in ["cream","shampoo","body wash","sunscreen"]:
-        score = 100 - (
-            40*row["microplastics"] +
-            35*row["petroleum"] +
-            25*row["silicones"]
-        )
-
-    # Food & Drinks
+@st.cache_data(show_spinner=False)
+def load_scoring_profiles(profiles_dir, mtimes):
+    """``(profiles, errors)``: a malformed profile file is skipped, not fatal."""
+    errors = []
+    return load_profiles(profiles_dir, errors), errors
+
+# Shared by every session on the same profile: switching profiles only
+# recomputes the packaging/eco score columns, once per profile. A resource,
+# so reruns get the same object back instead of unpickling a copy.
+@st.cache_resource(max_entries=8, show_spinner=False)
+def profile_catalogue(mtimes, profile_fingerprint, _catalogue, _profile):
+    return _catalogue.rescored(_profile)
+
+# Parsed once per value: a malformed $ECOLENS_AB turns the experiment off
+# (logged) instead of failing every page
+@st.cache_resource(show_spinner=False)
+def ab_arms(spec, profile_names):
+    try:
+        arms = {name: w for name, w in parse_arms(spec).items() if name in profile_names}
+        if arms:
+            assign_profile("", arms)  # rejects negative or all-zero weights
+    except ValueError as e:
+        logging.getLogger("ecolens").error("Ignoring ECOLENS_AB=%r: %s", spec, e)
+        return {}
+    return arms
+
+def active_profile(profiles):
+    """?profile=<name>, else an A/B arm from $ECOLENS_AB, else $ECOLENS_PROFILE."""
+    requested = st.query_params.get("profile")
+    if requested in profiles:
+        return profiles[requested]
+    arms = ab_arms(os.environ.get("ECOLENS_AB", ""), tuple(sorted(profiles)))
+    if arms:
+        if "ab_subject" not in st.session_state:
+            st.session_state.ab_subject = uuid.uuid4().hex
+        return profiles[assign_profile(st.session_state.ab_subject, arms)]
+    return profiles.get(os.environ.get("ECOLENS_PROFILE", "default"), DEFAULT_PROFILE)
+
+# The snapshot is taken once per run, so the whole run sees one catalogue
+# version even if a reload swaps in a new one meanwhile. Its version is
+# part of the cache keys below: a swap invalidates everything derived from it.
+with tracing.span("catalogue.load"):
+    if SHARED_NAMESPACE:
+        catalogue_source = shared_catalogue(SHARED_NAMESPACE)
+    else:
+        catalogue_source = catalogue_reloader(PRODUCT_CSV, MATERIAL_CSV, ALTERNATIVES_CSV)
+    snapshot = catalogue_source.current()
+    catalogue_mtimes = (snapshot.version,)
+    materials_df, catalogue = snapshot.materials_df, snapshot.catalogue
+    ingest_report, catalogue_memory = snapshot.ingest_report, snapshot.memory_report
+    profile_mtimes = tuple(
+        os.path.getmtime(os.path.join(PROFILES_DIR, f)) for f in sorted(os.listdir(PROFILES_DIR))
+    ) if os.path.isdir(PROFILES_DIR) else ()
+    scoring_profiles, profile_errors = load_scoring_profiles(PROFILES_DIR, profile_mtimes)
+    scoring_profile = active_profile(scoring_profiles)
+    # The default profile keeps the snapshot's catalogue (shared by every
+    # session, and mapped rather than copied when shared across workers)
+    if not scoring_profile.is_default:
+        catalogue = profile_catalogue(catalogue_mtimes, scoring_profile.fingerprint, catalogue, scoring_profile)
+    # Readers below work on the compact arrays; no full DataFrame is built
+    if scoring_profile.is_default and snapshot.alternatives is not None:
+        alternatives_index = snapshot.alternatives  # prebuilt with the snapshot
     else:
-        score = 100 - (
-            35*row["ultra_processed"] +
-            25*row["high_sugar"] +
-            20*row["palm_oil"] +
-            20*row["animal_based"]
+        alternatives_index = load_alternatives(
+            ALTERNATIVES_CSV,
+            (*catalogue_mtimes, os.path.getmtime(ALTERNATIVES_CSV)),
+            scoring_profile.fingerprint,
+            materials_df,
+            catalogue,
+            scoring_profile
         )
 
-    return max(0, min(100, score))
 
-products_df["ingredient_score"] = products_df.apply(ingredient_score, axis=1)
 
-# =============================
-# BONUS SCORE
-# =============================
-products_df["bonus_score"] = 60 + (
-    20*products_df["recyclable_packaging"] +
-    20*products_df["eco_certified"]
-)
+# -------------------------
+# Navigation state
+# -------------------------
+if "page" not in st.session_state:
+    st.session_state.page = "Home"
 
-products_df["bonus_score"] = products_df["bonus_score"].clip(0,100)
+def go(page_name: str):
+    st.session_state.page = page_name
 
-# =============================
-# FINAL ECOSCORE
-# =============================
-products_df["eco_score"] = (
-    0.50*products_df["packaging_score"] +
-    0.40*products_df["ingredient_score"] +
-    0.10*products_df["bonus_score"]
-).round(1)
+# -------------------------
+# Scan round-trip metrics
+# -------------------------
+SCAN_LOG_SIZE = 20
+
+def start_scan():
+    """``on_change`` of the camera: time the scan until its product is shown."""
+    if st.session_state.get("scan_camera") is None:
+        st.session_state.pop("scan_pending", None)
+        return
+    st.session_state.scan_pending = {
+        "span": tracing.start_span("scan.to_selection"),
+        "script_runs": 0,
+        "model_calls": 0,
+    }
 
-# =============================
-# FINAL SUMMARY
-# =============================
-summary_df = products_df[[
-    "name",
-    "brand",
-    "category",
-    "total_carbon_kg",
-    "total_water_L",
-    "total_energy_MJ",
-    "total_waste_score",
-    "packaging_score",
-    "ingredient_score",
-    "bonus_score",
-    "eco_score",
-    *ALL_FLAGS
-]].copy()
+def finish_scan():
+    """Record the pending scan once its product has been rendered."""
+    scan = st.session_state.pop("scan_pending", None)
+    if scan is None or "product" not in scan:
+        return
+    span = scan["span"]
+    span.attrs.update(script_runs=scan["script_runs"], model_calls=scan["model_calls"])
+    span.end()
+    log = st.session_state.setdefault("scan_log", [])
+    log.append({
+        "product": scan["product"],
+        "script_runs": scan["script_runs"],
+        "model_calls": scan["model_calls"],
+        "latency_ms": round(span.duration_ms, 1),
+    })
+    del log[:-SCAN_LOG_SIZE]
 
+# -------------------------
+# Session data
+# -------------------------
+# Purchases and chat transcripts live in a per-process registry keyed by a
+# session id; idle sessions are spilled to sqlite and restored on return
+@st.cache_resource(show_spinner=False)
+def session_registry():
+    return SessionRegistry(
+        SessionStore(os.environ.get("ECOLENS_SESSION_DB", SESSION_DB)),
+        idle_seconds=float(os.environ.get("ECOLENS_SESSION_IDLE", SESSION_IDLE_SECONDS)),
+    )
 
+def session_id():
+    if "session_id" not in st.session_state:
+        st.session_state.session_id = uuid.uuid4().hex
+    return st.session_state.session_id
+
+def session_data():
+    return session_registry().get(session_id())
+
+def log_purchases(rows):
+    """Log catalogue rows (``summary_df``-shaped) as purchases; returns how many were new."""
+    return session_data().purchases.log(rows)
 
 # -------------------------
-# Navigation state
+# Chat panels
 # -------------------------
-if "page" not in st.session_state:
-    st.session_state.page = "Home"
+@st.fragment
+def chat_panel(messages_key, placeholder, spinner, temperature, page):
+    """Chat transcript + input for the session transcript ``messages_key``.
 
-def go(page_name: str):
-    st.session_state.page = page_name
+    A fragment: sending a message reruns only this panel (the model call
+    and the transcript), not the page around it.
+    """
+    # Looked up on every run: a fragment rerun must not write to a session
+    # that was spilled since the last full run
+    messages = session_data().transcripts[messages_key]
+    with tracing.span("chat.panel", page=page):
+        for msg in messages[1:]:
+            with st.chat_message(msg["role"]):
+                st.markdown(msg["content"])
+
+        question = st.chat_input(placeholder, key=f"{messages_key}_input")
+        if question:
+            messages.append({"role": "user", "content": question})
+            with st.chat_message("user"):
+                st.markdown(question)
+
+            with st.chat_message("assistant"):
+                with st.spinner(spinner):
+                    try:
+                        reply = llm.chat_completion(
+                            model_client(),
+                            messages,
+                            temperature=temperature,
+                            page=page,
+                        )
+                    except RateLimitExceeded as e:
+                        # Drop the unanswered question so it can be resent
+                        messages.pop()
+                        st.warning(f"{e} 🌱")
+                        return
+                    st.markdown(reply)
+            messages.append({"role": "assistant", "content": reply})
+            cap_transcript(messages)
 
 # -------------------------
 # Sticky header (always visible)
@@ -469,6 +365,59 @@ with c4:
 st.markdown("</div>", unsafe_allow_html=True)
 st.write("")  # spacer
 
+# -------------------------
+# Admin timing panel (hidden): off unless $ECOLENS_ADMIN_TOKEN is set, then
+# opened with ?admin=<token>. It can write trace files, so visitors can't.
+# -------------------------
+def admin_enabled():
+    token = os.environ.get("ECOLENS_ADMIN_TOKEN", "")
+    given = st.query_params.get("admin", "")
+    return bool(token) and hmac.compare_digest(given.encode(), token.encode())
+
+if admin_enabled():
+    with st.sidebar:
+        st.markdown("### Rerun timings")
+        st.dataframe(pd.DataFrame(tracing.summary()), hide_index=True, use_container_width=True)
+        if st.button("Export spans (Chrome trace)"):
+            st.caption(f"Wrote {tracing.export_chrome_trace()}")
+        if st.button("Reset timings"):
+            tracing.clear()
+        if st.session_state.get("scan_log"):
+            st.markdown("### Scans (this session)")
+            st.dataframe(pd.DataFrame(st.session_state.scan_log), hide_index=True, use_container_width=True)
+        st.markdown("### Scoring profile")
+        st.caption(f"{scoring_profile.key} · {scoring_profile.fingerprint}")
+        for error in profile_errors:
+            st.warning(f"Skipped profile {error}")
+        st.markdown("### Catalogue ingest")
+        st.caption(
+            f"{ingest_report['rows_accepted']}/{ingest_report['rows_read']} rows accepted · "
+            f"{ingest_report['memory_bytes'] / 1024:.0f} KB in memory"
+        )
+        if ingest_report["reject_reasons"]:
+            st.json(ingest_report["reject_reasons"])
+        if ingest_report["unknown_materials"]:
+            st.caption("Unknown materials (scored as zero impact): "
+                       + ", ".join(sorted(ingest_report["unknown_materials"])))
+        st.markdown("### Catalogue memory")
+        st.dataframe(
+            pd.Series(catalogue_memory["bytes_per_product"], name="bytes / product"),
+            use_container_width=True
+        )
+        st.markdown("### Session memory")
+        session_usage = session_data().memory()
+        session_usage.update({f"state:{key}": state_nbytes(value) for key, value in st.session_state.items()})
+        st.dataframe(pd.Series(session_usage, name="bytes").sort_values(ascending=False),
+                     use_container_width=True)
+        st.json(session_registry().stats())
+        st.markdown("### Model calls")
+        st.json(model_gate().stats())
+        st.markdown("### Catalogue version")
+        st.caption("Shared snapshot" if SHARED_NAMESPACE else "Reloaded from the CSVs on change")
+        st.json(catalogue_source.stats())
+
+page_span = tracing.start_span(f"page.{st.session_state.page}")
+
 # -------------------------
 # HOME
 # -------------------------
@@ -477,9 +426,9 @@ if st.session_state.page == "Home":
     left, right = st.columns([1.2, 1.8], gap="large")
 
     with left:
-        st.markdown("""
+        st.markdown(f"""
             <div style="height:440px; overflow:hidden; border-radius:24px; box-shadow: 0 12px 32px rgba(93, 138, 102, 0.3); position: relative;">
-                <img src="https://images.openai.com/static-rsc-3/L_9-L2VXhvFW5NZZvI6VLjA1QxHDiDeV5vyXsgKqM2ycJVtMFds_HEsJfhXYdziNs9fdDa4f0k4koZsaN3gehTxDddohscLt0wYAfwvMxRE?purpose=fullsize"
+                <img {fragments.home_hero_img(STATIC_DIR)}
                      style="width:100%; height:100%; object-fit:cover; filter: brightness(0.95) saturate(1.1);">
                 <div style="position: absolute; top: 0; left: 0; right: 0; bottom: 0; background: linear-gradient(180deg, transparent 0%, rgba(93, 138, 102, 0.1) 100%);"></div>
             </div>
@@ -496,230 +445,12 @@ if st.session_state.page == "Home":
             unsafe_allow_html=True
         )
 
-    st.markdown("<br>", unsafe_allow_html=True)
-
-    st.markdown('<h2 style="font-size: 36px; margin-bottom: 16px; color: #5D8A66;">The Hidden Cost of Everyday Products</h2>', unsafe_allow_html=True)
-    st.markdown('<p style="font-size: 17px; line-height: 1.7; color: #3A4A3A;">Every year, the world produces over 400 million tonnes of plastic waste, and nearly half of this comes from single-use packaging like bottles, bags, wrappers, and cartons. Only around 9% of all plastic ever produced has been recycled, while the rest ends up in landfills, incinerators, or in the environment.</p>', unsafe_allow_html=True)
-    st.markdown('<p style="font-size: 17px; line-height: 1.7; color: #3A4A3A;">Packaging alone can account for 20-40% of a product\'s total environmental footprint, yet this hidden cost is rarely visible when we shop. Most of the time, consumers only see branding and marketing claims, not the true environmental impact behind a product.</p>', unsafe_allow_html=True)
-
-    st.markdown("<br>", unsafe_allow_html=True)
-
-    st.markdown('<h2 style="font-size: 36px; margin-bottom: 16px; color: #5D8A66;">The Problem</h2>', unsafe_allow_html=True)
-    st.markdown('<p style="font-size: 17px; line-height: 1.7; color: #3A4A3A;">Sustainability labels are vague and poorly regulated, so consumers often rely on marketing language instead of real data. Many of these claims are misleading, allowing greenwashing to go unnoticed. Because people lack the time and expertise to properly assess environmental impact, they make well-intentioned but poor choices. Additionally, there is no standardized way to verify eco-claims, and most existing apps reduce sustainability to simple green or red labels, hiding the real environmental costs of everyday products.</p>', unsafe_allow_html=True)
-
-    st.markdown("<br>", unsafe_allow_html=True)
-
-    st.markdown('<h2 style="font-size: 36px; margin-bottom: 16px; color: #5D8A66;">Small Choices, Big Impact</h2>', unsafe_allow_html=True)
-    st.markdown('<p style="font-size: 17px; line-height: 1.7; color: #3A4A3A;">A single purchase may feel insignificant, but when millions of people repeat small decisions every day, the impact becomes massive. If just 1 million people replaced one single-use plastic bottle per day, over 7,000 tonnes of plastic waste could be prevented each year. EcoLens makes these invisible impacts visible, so your everyday choices can become part of a much bigger change.</p>', unsafe_allow_html=True)
-
-    st.markdown("<br><br>", unsafe_allow_html=True)
+    st.markdown(fragments.home_intro(), unsafe_allow_html=True)
 
-    st.markdown('<h2 style="font-size: 40px; margin-bottom: 28px; color: #5D8A66; text-align: center;">Key Features</h2>', unsafe_allow_html=True)
-
-    components.html("""
-<div style="
-    background: linear-gradient(135deg, #5D8A66 0%, #4d7554 100%);
-    border-radius:24px;
-    padding:50px 42px;
-    margin-top:20px;
-    font-family: 'Plus Jakarta Sans', sans-serif;
-    box-shadow: 0 12px 32px rgba(93, 138, 102, 0.35);
-">
-  <div style="display:flex; gap:38px; align-items:center;">
-
-    <div style="flex:1.2;">
-      <h2 style="margin:0 0 16px 0; font-size:42px; color:#f5f1e8; font-family: 'DM Serif Display', serif; letter-spacing: -0.02em;">
-        GreenScore Tracker
-      </h2>
-
-      <p style="margin:0 0 18px 0; font-size:19px; line-height:1.8; color:#e8f5e9; font-weight: 400;">
-        Scan personal-care products and get a transparent sustainability score with clear reasons.
-      </p>
-
-      <ul style="margin:0; padding-left:24px; font-size:18px; line-height:1.9; color:#e8f5e9; font-weight: 400;">
-        <li style="margin-bottom: 8px;">Product Scan</li>
-        <li style="margin-bottom: 8px;">Score breakdown (ingredients, packaging, claims)</li>
-        <li>Better alternatives for your purpose</li>
-      </ul>
-    </div>
-
-    <div style="flex:1; display:flex; justify-content:flex-end;">
-      <div style="
-          width:540px;
-          height:340px;
-          border-radius:20px;
-          overflow:hidden;
-          box-shadow: 0 14px 40px rgba(0,0,0,0.4);
-          background: rgba(245,241,232,0.08);
-          border: 3px solid rgba(123,165,126,0.25);
-      ">
-        <img src="https://www.iberdrola.com/documents/20125/40513/huella-de-carbono-746x419.jpg/f61f98a2-7c51-27f9-31d2-41b1dafe6bf7?t=1738248418273"
-             style="width:100%; height:100%; object-fit:cover; filter: brightness(0.92) saturate(1.05);">
-      </div>
-    </div>
-
-  </div>
-</div>
-""", height=460)
-
-
-    
-    #-------------------------
-    # AI Chatbot
-    #-------------------------
-
-    components.html("""
-    <div style="
-        background: linear-gradient(135deg, #7BA57E 0%, #6b9570 100%);
-        border-radius:24px;
-        padding:50px 42px;
-        margin-top:28px;
-        font-family: 'Plus Jakarta Sans', sans-serif;
-        box-shadow: 0 12px 32px rgba(93, 138, 102, 0.35);
-    ">
-      <div style="display:flex; gap:38px; align-items:center;">
-    
-        <!-- LEFT IMAGE -->
-        <div style="flex:1; display:flex; justify-content:flex-start;">
-          <div style="
-              width:540px;
-              height:340px;
-              border-radius:20px;
-              overflow:hidden;
-              box-shadow: 0 14px 40px rgba(0,0,0,0.4);
-              background: rgba(245,241,232,0.08);
-              border: 3px solid rgba(123,165,126,0.25);
-          ">
-            <img src="https://beetroot.co/wp-content/uploads/sites/2/2024/12/Cover_AI-chatbots-in-GreenTech.png"
-                 style="width:100%; height:100%; object-fit:cover; filter: brightness(0.92) saturate(1.05);">
-          </div>
-        </div>
-    
-        <!-- RIGHT TEXT -->
-        <div style="flex:1.2;">
-          <h2 style="margin:0 0 16px 0; font-size:42px; color:#f5f1e8; font-family: 'DM Serif Display', serif; letter-spacing: -0.02em;">
-            AI Chatbot
-          </h2>
-    
-          <p style="margin:0 0 18px 0; font-size:19px; line-height:1.8; color:#e8f5e9; font-weight: 400;">
-            Ask questions in plain English and get smart, personalized sustainability advice instantly.
-          </p>
-    
-          <ul style="margin:0; padding-left:24px; font-size:18px; line-height:1.9; color:#e8f5e9; font-weight: 400;">
-            <li style="margin-bottom: 8px;">Ask about ingredients and claims</li>
-            <li style="margin-bottom: 8px;">Get product recommendations</li>
-            <li>Tips for safer / sustainable swaps</li>
-          </ul>
-        </div>
-    
-      </div>
-    </div>
-    """, height=460)
-
-    #---------------------
-    # Impact Score
-    #---------------------
-  
-    components.html("""
-    <div style="
-        background: linear-gradient(135deg, #5D8A66 0%, #4d7554 100%);
-        border-radius:24px;
-        padding:50px 42px;
-        margin-top:28px;
-        font-family: 'Plus Jakarta Sans', sans-serif;
-        box-shadow: 0 12px 32px rgba(93, 138, 102, 0.35);
-    ">
-      <div style="display:flex; gap:38px; align-items:center;">
-    
-        <!-- LEFT TEXT -->
-        <div style="flex:1.2;">
-          <h2 style="margin:0 0 16px 0; font-size:42px; color:#f5f1e8; font-family: 'DM Serif Display', serif; letter-spacing: -0.02em;">
-            Impact Score
-          </h2>
-    
-          <p style="margin:0 0 18px 0; font-size:19px; line-height:1.8; color:#e8f5e9; font-weight: 400;">
-            See the real environmental impact of every purchase in clear, easy-to-understand metrics.
-          </p>
-    
-          <ul style="margin:0; padding-left:24px; font-size:18px; line-height:1.9; color:#e8f5e9; font-weight: 400;">
-            <li style="margin-bottom: 8px;">Trends in Purchases</li>
-            <li style="margin-bottom: 8px;">Impact Log</li>
-            <li style="margin-bottom: 8px;">Compare products side-by-side</li>
-            <li>Visualize your eco progress over time</li>
-          </ul>
-        </div>
-    
-        <!-- RIGHT IMAGE -->
-        <div style="flex:1; display:flex; justify-content:flex-end;">
-          <div style="
-              width:540px;
-              height:340px;
-              border-radius:20px;
-              overflow:hidden;
-              box-shadow: 0 14px 40px rgba(0,0,0,0.4);
-              background: rgba(245,241,232,0.08);
-              border: 3px solid rgba(123,165,126,0.25);
-          ">
-            <img src="https://greenscoreapp.com/wp-content/uploads/2024/09/Empowering-Sustainability-Through-Innovation-image2-Green-Score.webp"
-                 style="width:100%; height:100%; object-fit:cover; filter: brightness(0.92) saturate(1.05);">
-          </div>
-        </div>
-    
-      </div>
-    </div>
-    """, height=460)
-
-    #-------------------------
-    # Your Next Steps
-    #-------------------------
-
-    components.html("""
-    <div style="
-        background: linear-gradient(135deg, #7BA57E 0%, #6b9570 100%);
-        border-radius:24px;
-        padding:50px 42px;
-        margin-top:28px;
-        font-family: 'Plus Jakarta Sans', sans-serif;
-        box-shadow: 0 12px 32px rgba(93, 138, 102, 0.35);
-    ">
-      <div style="display:flex; gap:38px; align-items:center;">
-    
-        <!-- LEFT IMAGE -->
-        <div style="flex:1; display:flex; justify-content:flex-start;">
-          <div style="
-              width:540px;
-              height:340px;
-              border-radius:20px;
-              overflow:hidden;
-              box-shadow: 0 14px 40px rgba(0,0,0,0.4);
-              background: rgba(245,241,232,0.08);
-              border: 3px solid rgba(123,165,126,0.25);
-          ">
-            <img src="https://www.shutterstock.com/image-photo/desk-displays-esg-metrics-sustainable-260nw-2672441077.jpg"
-                 style="width:100%; height:100%; object-fit:cover; filter: brightness(0.92) saturate(1.05);">
-          </div>
-        </div>
-    
-        <!-- RIGHT TEXT -->
-        <div style="flex:1.2;">
-          <h2 style="margin:0 0 16px 0; font-size:42px; color:#f5f1e8; font-family: 'DM Serif Display', serif; letter-spacing: -0.02em;">
-            Your Next Steps
-          </h2>
-    
-          <p style="margin:0 0 18px 0; font-size:19px; line-height:1.8; color:#e8f5e9; font-weight: 400;">
-            Clear, practical steps you can take to meaningfully reduce your environmental impact.
-          </p>
-    
-          <ul style="margin:0; padding-left:24px; font-size:18px; line-height:1.9; color:#e8f5e9; font-weight: 400;">
-            <li style="margin-bottom: 8px;">Better Alternatives</li>
-            <li style="margin-bottom: 8px;">Eco-friendly suggestions</li>
-            <li>Microhabits</li>
-          </ul>
-        </div>
-    
-      </div>
-    </div>
-    """, height=460)
+    # All four feature cards are one pre-rendered document served from
+    # static/, so the browser caches it and reruns only send its URL.
+    with tracing.span("home.features"):
+        components.iframe(fragments.home_features_url(STATIC_DIR), height=1880)
 
 # -------------------------
 # GREEN SCORE PAGE
@@ -728,59 +459,135 @@ elif st.session_state.page == "GreenScore":
     st.button("← Back to Home", on_click=go, args=("Home",))
     st.markdown('<h1 style="font-size: 48px; margin-bottom: 8px; color: #5D8A66;">GreenScore</h1>', unsafe_allow_html=True)
     
-    # Check if user clicked an alternative product
-    if "impact_history" not in st.session_state:
-        st.session_state.impact_history = pd.DataFrame(columns=[
-            "Product", "Category", "Eco Score",
-            "Carbon (kg)", "Water (L)", "Energy (MJ)", "Waste Score"
-        ])
-    if "logged_keys" not in st.session_state:
-        st.session_state.logged_keys = set()
-    
     # -----------------------------
     # Step 7: USER INPUT + DISPLAY
     # -----------------------------
     st.markdown('<h3 style="font-size: 24px; margin-top: 24px; margin-bottom: 16px; color: #3A4A3A;">Scan Product</h3>', unsafe_allow_html=True)
     
-    image_file = st.camera_input("Take a photo of the product")
-    
-    if image_file is None:
-        st.session_state.ocr_processed = False
-    
-    if image_file and not st.session_state.get("ocr_processed", False):
+    # A new photo triggers exactly one script run: the callback only marks
+    # the scan as pending, and the OCR below fills in the selectbox's state
+    # before the selectbox is drawn, so no st.rerun() is needed.
+    image_file = st.camera_input("Take a photo of the product", key="scan_camera", on_change=start_scan)
+
+    scan = st.session_state.get("scan_pending")
+    if scan is not None:
+        scan["script_runs"] += 1
+
+    if image_file and scan is not None and "product" not in scan:
+        from PIL import Image
+
+        client = model_client()
         image = Image.open(image_file)
     
-        with st.spinner("Reading packaging text..."):
-            all_text = ocr_image(image)
+        try:
+            with st.spinner("Reading packaging text..."):
+                all_text = llm.ocr_image(client, image)
     
-        with st.spinner("Identifying product..."):
-            detected_name = extract_product_name(all_text)
-            matched_name, confidence = fuzzy_match_product(detected_name, summary_df)
+            with st.spinner("Identifying product..."):
+                detected_name = llm.extract_product_name(client, all_text)
+                matched_name, confidence = fuzzy_match_product(detected_name, catalogue)
+        except Exception as e:
+            # Drop the pending scan so the next rerun doesn't send the
+            # photo again; the message shows once, for this run only
+            st.session_state.pop("scan_pending", None)
+            scan["span"].attrs.update(error=type(e).__name__)
+            scan["span"].end()
+            if isinstance(e, RateLimitExceeded):
+                st.warning(f"{e} 🌱")
+            else:
+                st.error(f"Couldn't read this photo ({type(e).__name__}). Try taking it again.")
+        else:
+            scan["model_calls"] += 2
+
+            # Greenwashing check on the same OCR text: local, no extra model call
+            with tracing.span("claims.detect"):
+                detector = claim_detector(CLAIMS_CSV, os.path.getmtime(CLAIMS_CSV))
+                st.session_state.scan_claims = {
+                    "product": matched_name,
+                    "claims": detector.detect(all_text, exclude=(detected_name, matched_name)),
+                }
     
-        st.success(f"Detected: {matched_name}")
-        st.session_state.selected_product = matched_name
-        
-        # FORCE dropdown to update
-        st.session_state.product_selectbox = matched_name
-        
-        # Mark OCR as done
-        st.session_state.ocr_processed = True
-        
-        st.rerun()
+            st.success(f"Detected: {matched_name}")
+            scan["product"] = matched_name
+            st.session_state.selected_product = matched_name
+            st.session_state.product_selectbox = matched_name
+
+    # -----------------------------
+    # BATCH SCAN (several photos or a shelf photo)
+    # -----------------------------
+    with st.expander("📷 Batch scan: several products at once"):
+        batch_files = st.file_uploader(
+            "Upload product or shelf photos",
+            type=["png", "jpg", "jpeg", "webp"],
+            accept_multiple_files=True,
+            key="batch_scan_files"
+        )
+        if batch_files and st.button("Scan all", use_container_width=True):
+            from PIL import Image
+
+            workers = int(os.environ.get("ECOLENS_SCAN_WORKERS", SCAN_WORKERS))
+            with st.spinner(f"Scanning {len(batch_files)} photo(s)..."):
+                results = scan_batch(
+                    model_client(),
+                    [(f.name, Image.open(f)) for f in batch_files],
+                    catalogue,
+                    detector=claim_detector(CLAIMS_CSV, os.path.getmtime(CLAIMS_CSV)),
+                    workers=workers
+                )
+            st.session_state.batch_scan = results_frame(results, catalogue)
 
+        batch = st.session_state.get("batch_scan")
+        if batch is not None:
+            st.dataframe(batch, hide_index=True, use_container_width=True)
+            matched = batch["product"].dropna().unique()
+            if len(matched) and st.button(f"✅ Log all {len(matched)} matched products as purchased",
+                                          use_container_width=True):
+                added = log_purchases(catalogue.select(matched))
+                st.success(f"🎉 Logged {added} product(s); {len(matched) - added} were already logged.")
+
+    # -----------------------------
+    # RECEIPT IMPORT (photo or CSV export)
+    # -----------------------------
+    with st.expander("🧾 Import a receipt"):
+        receipt_file = st.file_uploader(
+            "Upload a receipt photo or CSV export",
+            type=["png", "jpg", "jpeg", "webp", "csv"],
+            key="receipt_file"
+        )
+        if receipt_file and st.button("Read receipt", use_container_width=True):
+            try:
+                if receipt_file.name.lower().endswith(".csv"):
+                    items = read_receipt_csv(receipt_file)
+                else:
+                    from PIL import Image
+
+                    with st.spinner("Reading receipt..."):
+                        items = read_receipt_image(model_client(), Image.open(receipt_file))
+                st.session_state.receipt_items = match_receipt(items, catalogue)
+            except (ValueError, RateLimitExceeded) as e:
+                st.error(str(e))
+
+        receipt = st.session_state.get("receipt_items")
+        if receipt is not None:
+            st.dataframe(receipt, hide_index=True, use_container_width=True)
+            matched = receipt["product"].dropna().unique()
+            st.caption(f"{len(matched)} of {len(receipt)} line items matched a catalogue product.")
+            if len(matched) and st.button(f"✅ Log {len(matched)} receipt products as purchased",
+                                          use_container_width=True):
+                added = log_purchases(catalogue.select(matched))
+                st.success(f"🎉 Logged {added} product(s); {len(matched) - added} were already logged.")
 
-    
     # -----------------------------
     # PRODUCT SEARCH (SINGLE SOURCE OF TRUTH)
     # -----------------------------
-    product_options = sorted(summary_df["name"].unique())
+    search_options = product_options(catalogue)
     if "product_selectbox" not in st.session_state:
         st.session_state.product_selectbox = None
 
     
     product_input = st.selectbox(
     "🔍 Search for a product",
-    options=product_options,
+    options=search_options,
     index=None,
     key="product_selectbox",
     placeholder="Start typing to search..."
@@ -805,7 +612,7 @@ elif st.session_state.page == "GreenScore":
     # -----------------------------
     if "selected_product" in st.session_state:
         product_name = st.session_state.selected_product
-        result = summary_df[summary_df["name"] == product_name]
+        result = catalogue.select([product_name])
     
         if result.empty:
             st.error("Product not found in database.")
@@ -1057,25 +864,33 @@ elif st.session_state.page == "GreenScore":
                     </div>
                 """, unsafe_allow_html=True)
     
+            # ---------- WHY THIS SCORE (from the stored breakdown, no model call) ----------
+            explanation = catalogue.explain(product_name, scoring_profile)
+            if explanation is not None:
+                with st.expander("Why this score?"):
+                    st.markdown(explanation_markdown(explanation))
+
+            # ---------- PACKAGING CLAIMS (from the last scan) ----------
+            scan_claims = st.session_state.get("scan_claims")
+            if scan_claims and scan_claims["product"] == product_name:
+                st.markdown("### Packaging Claims")
+                checked = check_claims(scan_claims["claims"], r)
+                if checked:
+                    verdict_icons = {"contradicted": "❌", "misleading": "⚠️", "vague": "❔", "supported": "✅"}
+                    st.markdown("\n".join(
+                        f"- {verdict_icons[c['verdict']]} **“{c['phrase']}”**: {c['verdict']} ({c['reason']})"
+                        for c in checked
+                    ))
+                else:
+                    st.caption("No sustainability claims found in the scanned packaging text.")
+
             st.markdown("<br>", unsafe_allow_html=True)
 
             
             st.subheader("🛒 Purchase Logging")
             
             if st.button("✅ Log this product as purchased", use_container_width=True):
-                log_key = f"{product_input}_{r['eco_score']}"
-            
-                if log_key not in st.session_state.logged_keys:
-                    st.session_state.impact_history.loc[len(st.session_state.impact_history)] = {
-                        "Product": product_input,
-                        "Category": r["category"],
-                        "Eco Score": r["eco_score"],
-                        "Carbon (kg)": r["total_carbon_kg"],
-                        "Water (L)": r["total_water_L"],
-                        "Energy (MJ)": r["total_energy_MJ"],
-                        "Waste Score": r["total_waste_score"]
-                    }
-                    st.session_state.logged_keys.add(log_key)
+                if log_purchases(result.head(1)):
                     st.success("🎉 Product logged! Your Impact Dashboard has been updated.")
                 else:
                     st.info("This product is already logged as purchased.")
@@ -1089,7 +904,7 @@ elif st.session_state.page == "GreenScore":
             st.subheader("Greener Alternatives")
             st.caption("Click any product to view its full eco score")
             
-            alternatives = get_greener_alternatives(product_input, summary_df, max_alternatives=5)
+            alternatives = get_greener_alternatives(product_input, catalogue, max_alternatives=5)
             
             # ✅ CASE 1: NO greener alternatives
             if not alternatives:
@@ -1157,20 +972,18 @@ elif st.session_state.page == "GreenScore":
                 "how to make better purchase choices."
             )
 
-            from openai import OpenAI
-            client = OpenAI(api_key=st.secrets["OpenAIKey"])
-
             # -----------------------------
             # INIT / RESET PRODUCT CHAT MEMORY
             # -----------------------------
+            transcripts = session_data().transcripts
             if (
-                "product_ai_messages" not in st.session_state
+                "product_ai_messages" not in transcripts
                 or st.session_state.get("product_chat_product") != product_input
             ):
                 st.session_state.product_chat_product = product_input
                 
                 # Use the actual selected product data (r) instead of hardcoded first product
-                st.session_state.product_ai_messages = [
+                transcripts["product_ai_messages"] = [
                     {
                         "role": "system",
                         "content": (
@@ -1186,76 +999,39 @@ elif st.session_state.page == "GreenScore":
                             "- Focus only on purchase-related advice\n"
                             "- No lifestyle tips\n"
                             "- Be specific to THIS product\n"
-                            "- Do not invent data\n\n"
+                            "- Do not invent data\n"
+                            "- To explain the score, use the SCORE BREAKDOWN: eco score = "
+                            "sum of parts (score x weight); packaging points per impact "
+                            "against its cap; each material's % share of each impact; "
+                            "signed points per ingredient/bonus flag\n\n"
                             f"PRODUCT CONTEXT:\n"
                             f"Name: {r['name']}\n"
                             f"Category: {r['category']}\n"
                             f"Eco Score: {r['eco_score']} / 100\n"
-                            f"Carbon: {r['total_carbon_kg']} kg CO₂e\n"
-                            f"Water: {r['total_water_L']} L\n"
-                            f"Energy: {r['total_energy_MJ']} MJ\n"
-                            f"Waste Score: {r['total_waste_score']}\n"
                             f"Microplastics: {bool(int(r['microplastics']))}\n"
                             f"Silicones: {bool(int(r['silicones']))}\n"
-                            f"Petroleum-derived: {bool(int(r['petroleum']))}"
+                            f"Petroleum-derived: {bool(int(r['petroleum']))}\n\n"
+                            f"SCORE BREAKDOWN (JSON):\n"
+                            f"{prompt_context(explanation) if explanation else 'unavailable'}"
                         ),
                     }
                 ]
 
-            # -----------------------------
-            # DISPLAY CHAT
-            # -----------------------------
-            for msg in st.session_state.product_ai_messages[1:]:
-                with st.chat_message(msg["role"]):
-                    st.markdown(msg["content"])
-
-            # -----------------------------
-            # USER QUESTION INPUT
-            # -----------------------------
-            product_question = st.chat_input(
-                "Ask about ingredients, impacts, or better alternatives for this product…"
+            chat_panel(
+                "product_ai_messages",
+                "Ask about ingredients, impacts, or better alternatives for this product…",
+                "Thinking about this product… 🌍",
+                temperature=0.4,
+                page="GreenScore",
             )
 
-            if product_question:
-                st.session_state.product_ai_messages.append(
-                    {"role": "user", "content": product_question}
-                )
-
-                with st.chat_message("user"):
-                    st.markdown(product_question)
-
-                # -----------------------------
-                # AI RESPONSE
-                # -----------------------------
-                with st.chat_message("assistant"):
-                    with st.spinner("Thinking about this product… 🌍"):
-                        response = client.chat.completions.create(
-                            model="gpt-4o-mini",
-                            temperature=0.4,
-                            messages=st.session_state.product_ai_messages,
-                        )
-
-                        ai_reply = response.choices[0].message.content
-                        st.markdown(ai_reply)
-
-                st.session_state.product_ai_messages.append(
-                    {"role": "assistant", "content": ai_reply}
-                )
-
-
-            
+    finish_scan()
 
 # -------------------------
 # CHATBOT PAGE
 # -------------------------
 
 elif st.session_state.page == "Chatbot":
-    import streamlit as st
-    from openai import OpenAI
-    # -----------------------------
-    # INIT OPENAI CLIENT
-    # -----------------------------
-    client = OpenAI(api_key=st.secrets["OpenAIKey"])
     # -----------------------------
     # PAGE SETUP
     # -----------------------------
@@ -1264,8 +1040,9 @@ elif st.session_state.page == "Chatbot":
     # -----------------------------
     # CHAT MEMORY
     # -----------------------------
-    if "messages" not in st.session_state:
-        st.session_state.messages = [
+    transcripts = session_data().transcripts
+    if "messages" not in transcripts:
+        transcripts["messages"] = [
             {
                 "role": "system",
                 "content": (
@@ -1287,54 +1064,19 @@ elif st.session_state.page == "Chatbot":
                 )
             }
         ]
-    # -----------------------------
-    # DISPLAY CHAT
-    # -----------------------------
-    for msg in st.session_state.messages[1:]:
-        with st.chat_message(msg["role"]):
-            st.markdown(msg["content"])
-    # -----------------------------
-    # USER INPUT
-    # -----------------------------
-    user_input = st.chat_input("Ask something eco-related...")
-    if user_input:
-        # show user message
-        st.session_state.messages.append(
-            {"role": "user", "content": user_input}
-        )
-        with st.chat_message("user"):
-            st.markdown(user_input)
-        # -----------------------------
-        # OPENAI RESPONSE
-        # -----------------------------
-        with st.chat_message("assistant"):
-            with st.spinner("Thinking... 🌍"):
-                response = client.chat.completions.create(
-                    model="gpt-4o-mini",
-                    messages=st.session_state.messages,
-                    temperature=0.6
-                )
-                assistant_reply = response.choices[0].message.content
-                st.markdown(assistant_reply)
-        st.session_state.messages.append(
-            {"role": "assistant", "content": assistant_reply}
-        )
-
-
-
-
-
+    chat_panel(
+        "messages",
+        "Ask something eco-related...",
+        "Thinking... 🌍",
+        temperature=0.6,
+        page="Chatbot",
+    )
 
 # -------------------------
 # TOTAL IMPACT PAGE
 # -------------------------
 elif st.session_state.page == "Impact Dashboard":
 
-    import pandas as pd
-    import plotly.express as px
-    from openai import OpenAI
-    import streamlit as st
-
     # -----------------------------
     # NAV
     # -----------------------------
@@ -1342,11 +1084,6 @@ elif st.session_state.page == "Impact Dashboard":
     st.markdown('<h1 style="font-size: 48px; margin-bottom: 8px; color: #5D8A66;">🌍 Your Sustainability Impact</h1>', unsafe_allow_html=True)
     st.caption("A living story of how your choices shape the planet")
 
-    # -----------------------------
-    # OPENAI CLIENT
-    # -----------------------------
-    client = OpenAI(api_key=st.secrets["OpenAIKey"])
-
     def explain_with_ai(title, data, products):
         prompt = f"""
 You are an AI sustainability analyst embedded inside a purchase-impact dashboard.
@@ -1385,22 +1122,27 @@ Rules:
 - Assume a curious student user
 """
 
-        response = client.chat.completions.create(
-            model="gpt-4o-mini",
-            messages=[{"role": "user", "content": prompt}],
-            temperature=0.35
-        )
-
-        return response.choices[0].message.content
+        try:
+            return llm.chat_completion(
+                model_client(),
+                [{"role": "user", "content": prompt}],
+                temperature=0.35,
+                page="Impact Dashboard",
+                title=title,
+            )
+        except RateLimitExceeded as e:
+            return f"{e} 🌱"
 
     # -----------------------------
     # REQUIRE HISTORY
     # -----------------------------
-    if "impact_history" not in st.session_state or st.session_state.impact_history.empty:
+    purchases = session_data().purchases
+    if not len(purchases):
         st.info("Analyse products to start building your impact story")
+        page_span.end()
         st.stop()
 
-    history = st.session_state.impact_history.copy()
+    history = purchases.frame()
     st.divider()
 
     # =============================
@@ -1442,22 +1184,16 @@ Rules:
     # =============================
     st.markdown("## Your EcoScore Journey")
 
-    trend_fig = px.line(
+    trend_fig = cached_figure(
+        "line",
         history.reset_index(),
-        x=history.reset_index().index,
+        x="index",
         y="Eco Score",
         markers=True,
         color_discrete_sequence=["#5D8A66"]
     )
-    
-    trend_fig.update_layout(
-        plot_bgcolor='rgba(245, 241, 232, 0.3)',
-        paper_bgcolor='rgba(0,0,0,0)',
-        font_family="Plus Jakarta Sans",
-        font_color="#3A4A3A"
-    )
 
-    st.plotly_chart(trend_fig, use_container_width=True)
+    st.plotly_chart(trend_fig, use_container_width=True, key="trend_chart")
 
     if st.button("🤖 Let AI explain this EcoScore trend"):
         with st.spinner("AI analysing your progress"):
@@ -1493,23 +1229,17 @@ Rules:
 
     impact_avg.columns = ["Impact Type", "Average Value"]
 
-    impact_fig = px.bar(
+    impact_fig = cached_figure(
+        "bar",
         impact_avg,
+        layout={"showlegend": False},
         x="Impact Type",
         y="Average Value",
         color="Impact Type",
         color_discrete_sequence=["#5D8A66", "#7BA57E", "#9cb380", "#E8956B"]
     )
-    
-    impact_fig.update_layout(
-        plot_bgcolor='rgba(245, 241, 232, 0.3)',
-        paper_bgcolor='rgba(0,0,0,0)',
-        font_family="Plus Jakarta Sans",
-        font_color="#3A4A3A",
-        showlegend=False
-    )
 
-    st.plotly_chart(impact_fig, use_container_width=True)
+    st.plotly_chart(impact_fig, use_container_width=True, key="impact_chart")
 
     if st.button("Let AI explain this impact breakdown"):
         with st.spinner("Understanding your impact"):
@@ -1538,13 +1268,11 @@ Rules:
     # Step 1 — Choose category first (from full database)
     compare_category = st.selectbox(
         "Select a category to compare within",
-        sorted(summary_df["category"].unique())
+        catalogue.category_list()
     )
 
     # Step 2 — Show all products from that category in the full database
-    category_products = summary_df[
-        summary_df["category"] == compare_category
-    ]["name"].unique()
+    category_products = catalogue.category_names(compare_category)
 
     compare_products = st.multiselect(
         "Select products to compare",
@@ -1553,8 +1281,8 @@ Rules:
     )
 
     if len(compare_products) >= 2:
-        # Get data from the full summary_df instead of history
-        compare_df = summary_df[summary_df["name"].isin(compare_products)].copy()
+        # Get data from the full catalogue instead of history
+        compare_df = catalogue.select(compare_products)
         
         # Rename columns to match the impact display format
         compare_df = compare_df.rename(columns={
@@ -1572,22 +1300,16 @@ Rules:
             max_val = normalized[col].max()
             normalized[col] = normalized[col] / max_val if max_val > 0 else 0
 
-        stacked_fig = px.bar(
+        stacked_fig = cached_figure(
+            "bar",
             normalized,
             x="Product",
             y=impact_cols,
             barmode="stack",
             color_discrete_sequence=["#5D8A66", "#7BA57E", "#9cb380", "#E8956B"]
         )
-        
-        stacked_fig.update_layout(
-            plot_bgcolor='rgba(245, 241, 232, 0.3)',
-            paper_bgcolor='rgba(0,0,0,0)',
-            font_family="Plus Jakarta Sans",
-            font_color="#3A4A3A"
-        )
 
-        st.plotly_chart(stacked_fig, use_container_width=True)
+        st.plotly_chart(stacked_fig, use_container_width=True, key="compare_chart")
 
         # AI explanation
         if st.button("Let AI explain this product comparison"):
@@ -1620,10 +1342,7 @@ Rules:
     st.dataframe(history[::-1], use_container_width=True)
 
     if st.button("Clear Impact History"):
-        st.session_state.impact_history = st.session_state.impact_history.iloc[0:0]
-
-        if "logged_keys" in st.session_state:
-            st.session_state.logged_keys.clear()
+        purchases.clear()
 
         st.success("Impact history cleared 🌱")
         st.rerun()
@@ -1648,218 +1367,19 @@ elif st.session_state.page == "NextSteps":
 
     category = st.selectbox(
         "Select a product category",
-        [
-            "",
-            "Shampoo",
-            "Cream",
-            "Sunscreen",
-            "Body Wash",
-            "Soft Drink",
-            "Instant Noodles",
-            "Chips",
-            "Chocolate",
-            "Biscuits",
-            "Candy",
-            "Snack"
-        ]
+        ["", *sorted(alternatives_index)]
     )
 
-
-    BEST_SUBS = {
-    
-        # ----------------
-        # PERSONAL CARE
-        # ----------------
-        "Shampoo": [
-            "Ethique Shampoo Bar",
-            "Earth Rhythm Shampoo Bar",
-            "Bare Anatomy Concentrated Shampoo"
-        ],
-    
-        "Cream": [
-            "Minimalist Marula Oil Moisturizer",
-            "Earth Rhythm Phyto Clear Moisturizer",
-            "Plum Green Tea Moisturizer"
-        ],
-    
-        "Sunscreen": [
-            "Raw Beauty Wellness Sunscreen Stick",
-            "Minimalist SPF 50 (50g)",
-            "Dot & Key Sunscreen Stick"
-        ],
-    
-        "Body Wash": [
-            "Ethique Solid Body Wash Bar",
-            "Earth Rhythm Body Wash Bar",
-            "Plum BodyLovin Body Wash Bar"
-        ],
-    
-        # ----------------
-        # FOOD & DRINK
-        # ----------------
-        "Soft Drink": [
-            "Returnable glass bottle cola",
-            "Powdered drink concentrates",
-            "Sparkling water in aluminum can"
-        ],
-    
-        "Instant Noodles": [
-            "Whole wheat noodles in paper packaging",
-            "Rice noodles in cardboard box",
-            "Fresh noodles from local brand"
-        ],
-    
-        "Chips": [
-            "Baked chips",
-            "Roasted makhana",
-            "Popcorn in paper packaging"
-        ],
-    
-        "Chocolate": [
-            "Dark chocolate (70%+ cocoa)",
-            "Chocolate in paper wrapper",
-            "Fair-trade chocolate bar"
-        ],
-    
-        "Biscuits": [
-            "Oat biscuits in paper packaging",
-            "Digestive biscuits cardboard box",
-            "Local bakery cookies"
-        ],
-    
-        "Candy": [
-            "Loose candies from bulk store",
-            "Jaggery-based sweets",
-            "Fruit leathers"
-        ],
-    
-        "Snack": [
-            "Roasted chana",
-            "Trail mix in paper pouch",
-            "Roasted peanuts"
-        ]
-    }
-
-
     if category != "":
-        c1, c2, c3 = st.columns(3)
-
-        for i, prod in enumerate(BEST_SUBS[category]):
-            with [c1, c2, c3][i]:
-                st.markdown(f"""
-                <div style="
-                    background: linear-gradient(135deg, #5D8A66 0%, #4d7554 100%);
-                    border-radius:20px;
-                    padding:28px 22px;
-                    text-align:center;
-                    box-shadow:0 8px 24px rgba(93, 138, 102, 0.3);
-                    height:190px;
-                    display:flex;
-                    flex-direction:column;
-                    justify-content:center;
-                    transition: transform 0.3s ease;
-                " onmouseover="this.style.transform='translateY(-8px)';" onmouseout="this.style.transform='translateY(0)';">
-                    <h4 style="color:#F5F1E8; margin-bottom:14px; font-size: 1.15em; font-weight: 700; line-height: 1.3;">{prod}</h4>
-                    <p style="color:rgba(245,241,232,0.85); font-size:15px; line-height: 1.5;">
-                    Lower packaging & ingredient impact
-                    </p>
-                </div>
-                """, unsafe_allow_html=True)
+        st.markdown(fragments.alternative_cards(alternatives_index[category]), unsafe_allow_html=True)
 
     st.markdown("<br><br>", unsafe_allow_html=True)
 
     # =================================
     # SECTION 2 — IF YOU ALREADY BOUGHT
+    # SECTION 3 — DAILY MICRO HABITS
     # =================================
 
-    st.markdown('<h2 style="font-size: 32px; margin-bottom: 18px; color: #5D8A66;">If You Already Bought a Regular Product</h2>', unsafe_allow_html=True)
-    
-    c1, c2, c3 = st.columns(3)
-    
-    boxes_content = [
-        {
-            "title": "Use Intentionally",
-            "items": [
-                "Use only the recommended amount",
-                "Avoid unnecessary double cleansing",
-                "Don't stockpile backups",
-                "Finish before opening a new product"
-            ]
-        },
-        {
-            "title": "Extend Product Life",
-            "items": [
-                "Store away from heat & sunlight",
-                "Use pumps/spatulas to avoid contamination",
-                "Choose refills next time",
-                "Share unopened extras"
-            ]
-        },
-        {
-            "title": "Dispose Responsibly",
-            "items": [
-                "Empty completely",
-                "Rinse packaging",
-                "Check local recycling rules",
-                "Reuse containers for storage"
-            ]
-        }
-    ]
-    
-    for col, content in zip([c1, c2, c3], boxes_content):
-        with col:
-            items_html = "".join([f"<li style='margin-bottom: 10px;'>{item}</li>" for item in content['items']])
-            col.markdown(f"""
-            <div style="
-                background: linear-gradient(135deg, #5D8A6618 0%, #5D8A6610 100%);
-                border-radius:18px;
-                padding:28px 24px;
-                height:320px;
-                box-shadow:0 6px 20px rgba(93, 138, 102, 0.15);
-                border: 2px solid #5D8A6630;
-            ">
-                <h4 style="color:#3A4A3A; font-size: 1.3em; margin-bottom: 16px; font-weight: 700;">{content['title']}</h4>
-                <ul style="color:#3A4A3A; line-height:1.7; font-size: 0.95em; padding-left: 20px;">
-                    {items_html}
-                </ul>
-            </div>
-            """, unsafe_allow_html=True)
-    
-
-    st.markdown("<br><br>", unsafe_allow_html=True)
-
-    # ============================
-    # SECTION 3 — DAILY MICRO HABITS
-    # ============================
+    st.markdown(fragments.next_steps_tips(), unsafe_allow_html=True)
 
-    st.markdown('<h2 style="font-size: 32px; margin-bottom: 18px; color: #5D8A66;">Everyday Micro-Habits</h2>', unsafe_allow_html=True)
-    
-    c1, c2, c3 = st.columns(3)
-    
-    habits = [
-        "Choose refill packs",
-        "Prefer bars over liquids",
-        "Buy only what you need",
-        "Pick paper or aluminum packaging",
-        "Carry your own bottle",
-        "Support eco-certified brands"
-    ]
-    
-    for i, h in enumerate(habits):
-        with [c1, c2, c3][i % 3]:
-            st.markdown(f"""
-            <div style="
-                background: linear-gradient(135deg, #7BA57E 0%, #6b9570 100%);
-                color:#F5F1E8;
-                border-radius:16px;
-                padding:20px 18px;
-                text-align:center;
-                margin-bottom:16px;
-                box-shadow:0 6px 16px rgba(123, 165, 126, 0.25);
-                font-weight:600;
-                font-size: 1.05em;
-                transition: all 0.3s ease;
-            " onmouseover="this.style.transform='scale(1.05)'; this.style.boxShadow='0 8px 24px rgba(123, 165, 126, 0.35)';" onmouseout="this.style.transform='scale(1)'; this.style.boxShadow='0 6px 16px rgba(123, 165, 126, 0.25)';">
-                {h}
-            </div>
-            """, unsafe_allow_html=True)
+page_span.end()
@@ -0,0 +1,196 @@
+"""Load test for the HTTP scoring API (``python -m ecolens serve``).
+
+    python -m benchmarks.bench_api --rows 20000 --connections 32 --duration 10
+    python -m benchmarks.bench_api --url http://127.0.0.1:8765 --input product.csv
+
+Without ``--url`` a synthetic catalogue of ``--rows`` products is written to
+a temporary CSV and served from a subprocess on a free port. The client
+opens ``--connections`` keep-alive connections and sends a mix of lookups,
+alternatives, fuzzy searches, ETag revalidations and small bulk-scoring
+requests for ``--duration`` seconds. It reports throughput and p50/p99
+latency, overall and per endpoint.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import signal
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from urllib.parse import quote, urlsplit
+
+import numpy as np
+import pandas as pd
+
+from . import synthetic
+
+# (kind, share of requests)
+MIX = [("product", 0.50), ("alternatives", 0.20), ("search", 0.20),
+       ("revalidate", 0.08), ("score", 0.02)]
+BULK_ROWS = 50
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_server(input_path, port):
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "ecolens", "serve", input_path, "--port", str(port),
+         "-m", os.path.join(root, "material.csv")],
+        cwd=root, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    deadline = time.monotonic() + 120
+    while time.monotonic() < deadline:
+        try:
+            socket.create_connection(("127.0.0.1", port), timeout=0.2).close()
+            return proc
+        except OSError:
+            if proc.poll() is not None:
+                raise RuntimeError("the API server exited during startup")
+            time.sleep(0.1)
+    proc.kill()
+    raise RuntimeError("the API server did not start in time")
+
+
+async def request(reader, writer, host, method, target, headers=None, body=b""):
+    lines = [f"{method} {target} HTTP/1.1", f"Host: {host}", f"Content-Length: {len(body)}"]
+    lines += [f"{k}: {v}" for k, v in (headers or {}).items()]
+    writer.write(("\r\n".join(lines) + "\r\n\r\n").encode("latin-1") + body)
+    await writer.drain()
+
+    status = int((await reader.readline()).split()[1])
+    response_headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b""):
+            break
+        key, _, value = line.decode("latin-1").partition(":")
+        response_headers[key.strip().lower()] = value.strip()
+    payload = await reader.readexactly(int(response_headers.get("content-length", 0)))
+    return status, response_headers, payload
+
+
+class Workload:
+    def __init__(self, products_df, seed=0):
+        self.rng = random.Random(seed)
+        self.names = products_df["name"].astype(str).tolist()
+        self.rows = json.loads(products_df.head(5000).to_json(orient="records"))
+        self.kinds = [kind for kind, _ in MIX]
+        self.weights = [share for _, share in MIX]
+        self.etags = {}
+
+    def next(self):
+        """``(kind, method, target, headers, body)`` for the next request."""
+        kind = self.rng.choices(self.kinds, self.weights)[0]
+        name = quote(self.rng.choice(self.names))
+        if kind == "product":
+            return kind, "GET", f"/product?name={name}", {}, b""
+        if kind == "alternatives":
+            return kind, "GET", f"/alternatives?name={name}&k=5", {}, b""
+        if kind == "search":
+            word = self.rng.choice(self.names).split()[-1][:6]
+            return kind, "GET", f"/search?q={quote(word)}&limit=10", {}, b""
+        if kind == "revalidate" and self.etags:
+            target, etag = self.rng.choice(list(self.etags.items()))
+            return kind, "GET", target, {"If-None-Match": etag}, b""
+        if kind == "score":
+            start = self.rng.randrange(max(1, len(self.rows) - BULK_ROWS))
+            body = json.dumps({"products": self.rows[start:start + BULK_ROWS]}).encode()
+            return kind, "POST", "/score", {"Content-Type": "application/json"}, body
+        return "product", "GET", f"/product?name={name}", {}, b""
+
+
+async def client(url, workload, deadline, samples, statuses):
+    parts = urlsplit(url)
+    reader, writer = await asyncio.open_connection(parts.hostname, parts.port)
+    try:
+        while time.perf_counter() < deadline:
+            kind, method, target, headers, body = workload.next()
+            start = time.perf_counter()
+            status, response_headers, _ = await request(reader, writer, parts.netloc,
+                                                        method, target, headers, body)
+            samples.setdefault(kind, []).append(time.perf_counter() - start)
+            statuses[status] = statuses.get(status, 0) + 1
+            if method == "GET" and status == 200 and "etag" in response_headers:
+                if len(workload.etags) < 1000:
+                    workload.etags[target] = response_headers["etag"]
+    finally:
+        writer.close()
+
+
+def latency_stats(values):
+    ms = np.asarray(values) * 1000
+    return {
+        "requests": len(ms),
+        "p50_ms": round(float(np.percentile(ms, 50)), 3),
+        "p99_ms": round(float(np.percentile(ms, 99)), 3),
+        "max_ms": round(float(ms.max()), 3),
+    }
+
+
+async def run(url, workload, connections, duration):
+    samples, statuses = {}, {}
+    start = time.perf_counter()
+    await asyncio.gather(*(
+        client(url, workload, start + duration, samples, statuses) for _ in range(connections)
+    ))
+    elapsed = time.perf_counter() - start
+    everything = [v for values in samples.values() for v in values]
+    return {
+        "connections": connections,
+        "seconds": round(elapsed, 2),
+        "requests_per_s": round(len(everything) / elapsed, 1),
+        "overall": latency_stats(everything),
+        "endpoints": {kind: latency_stats(values) for kind, values in sorted(samples.items())},
+        "statuses": {str(k): v for k, v in sorted(statuses.items())},
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--url", help="Load-test a running server instead of starting one")
+    parser.add_argument("--input", help="Product CSV (served, or the names to query with --url)")
+    parser.add_argument("--rows", type=int, default=20_000,
+                        help="Synthetic catalogue size when --input is not given")
+    parser.add_argument("--connections", type=int, default=32)
+    parser.add_argument("--duration", type=float, default=10.0, help="Seconds of load")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        if args.input:
+            input_path = args.input
+            products_df = pd.read_csv(input_path)
+        else:
+            input_path = os.path.join(tmp, "products.csv")
+            products_df = synthetic.products(args.rows)
+            products_df.to_csv(input_path, index=False)
+
+        proc = None
+        url = args.url
+        if url is None:
+            port = free_port()
+            proc = start_server(input_path, port)
+            url = f"http://127.0.0.1:{port}"
+        try:
+            report = asyncio.run(run(url, Workload(products_df), args.connections, args.duration))
+        finally:
+            if proc is not None:
+                # SIGINT lets the server shut its scoring workers down too
+                proc.send_signal(signal.SIGINT)
+                proc.wait()
+
+    report = {"products": len(products_df), **report}
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
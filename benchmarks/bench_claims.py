@@ -0,0 +1,57 @@
+"""Greenwashing claim detection cost per scan.
+
+    python -m benchmarks.bench_claims --chars 500 2000 8000
+
+Builds packaging-like text of each length (filler words with a few claims
+mixed in) and reports compile time and microseconds per ``detect`` call.
+"""
+
+import argparse
+import json
+import time
+
+import numpy as np
+
+from ecolens.claims import load_detector
+
+FILLER = ("ingredients water sugar colour caramel net weight best before store "
+          "in a cool dry place manufactured by distributed for nutrition facts").split()
+CLAIMS = ["eco-friendly", "100% natural", "recyclable", "no palm oil", "vegan", "green"]
+
+
+def packaging_text(chars, seed=0):
+    rng = np.random.default_rng(seed)
+    words = []
+    while sum(len(w) + 1 for w in words) < chars:
+        words.append(CLAIMS[rng.integers(len(CLAIMS))] if rng.random() < 0.03
+                     else FILLER[rng.integers(len(FILLER))])
+    return " ".join(words)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--chars", type=int, nargs="+", default=[500, 2000, 8000])
+    parser.add_argument("--lexicon", default="claims.csv")
+    parser.add_argument("--repeat", type=int, default=500)
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    detector = load_detector(args.lexicon)
+    compile_ms = (time.perf_counter() - start) * 1000
+
+    runs = []
+    for chars in args.chars:
+        text = packaging_text(chars)
+        start = time.perf_counter()
+        for _ in range(args.repeat):
+            claims = detector.detect(text)
+        elapsed = (time.perf_counter() - start) / args.repeat
+        runs.append({"chars": len(text), "claims": len(claims),
+                     "us_per_scan": round(elapsed * 1e6, 1)})
+
+    print(json.dumps({"phrases": len(detector), "compile_ms": round(compile_ms, 2),
+                      "scans": runs}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
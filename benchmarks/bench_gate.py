@@ -0,0 +1,124 @@
+"""Model-call coalescing and rate limiting under bursty traffic.
+
+    python -m benchmarks.bench_gate --users 40 --requests 5 --prompts 20
+
+Simulates ``--users`` sessions that each send ``--requests`` model requests
+at once. Prompts are drawn from ``--prompts`` popular ones (Zipf-like:
+many users ask for the same dashboard explanation or scan the same
+product). The simulated provider answers in ``--latency`` seconds. Beyond
+``--provider-rps`` calls in a second it throttles, and the client retries
+after ``--retry-after`` seconds, as an SDK with backoff would. The run is
+done twice, with the plain client and through a
+:class:`ecolens.throttle.ModelGate`. For each, the report gives provider
+calls, throttled calls, and p50/p99 request latency.
+"""
+
+import argparse
+import json
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+
+import numpy as np
+
+from ecolens.throttle import GatedClient, ModelGate, RateLimitExceeded
+
+
+class Provider:
+    """Fake model endpoint with a per-second call budget."""
+
+    def __init__(self, latency, rps, retry_after):
+        self.latency = latency
+        self.rps = rps
+        self.retry_after = retry_after
+        self.calls = 0
+        self.throttled = 0
+        self._recent = deque()
+        self._lock = threading.Lock()
+
+    def create(self, **kwargs):
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                while self._recent and now - self._recent[0] > 1.0:
+                    self._recent.popleft()
+                allowed = len(self._recent) < self.rps
+                if allowed:
+                    self._recent.append(now)
+                    self.calls += 1
+                else:
+                    self.throttled += 1
+            if allowed:
+                time.sleep(self.latency)
+                return SimpleNamespace(output_text="ok")
+            time.sleep(self.retry_after)
+
+    def client(self):
+        endpoint = SimpleNamespace(create=self.create)
+        return SimpleNamespace(responses=endpoint, chat=SimpleNamespace(completions=endpoint))
+
+
+def run(args, gated):
+    provider = Provider(args.latency, args.provider_rps, args.retry_after)
+    # A bucket admits burst + rate calls in any one second: keep that within
+    # the provider's budget
+    gate = ModelGate(user_rate=args.user_rate, model_rate=args.provider_rps * 0.8,
+                     model_burst=max(1, int(args.provider_rps * 0.2))) if gated else None
+    rng = np.random.default_rng(0)
+    weights = 1 / np.arange(1, args.prompts + 1)
+    prompts = rng.choice(args.prompts, size=(args.users, args.requests), p=weights / weights.sum())
+
+    def session(user):
+        raw = provider.client()
+        client = GatedClient(raw, gate, user=f"user{user}") if gated else raw
+        latencies, rejected = [], 0
+        for prompt in prompts[user]:
+            start = time.perf_counter()
+            try:
+                client.responses.create(model="gpt-4o-mini", input=f"prompt {prompt}")
+            except RateLimitExceeded:
+                rejected += 1
+                continue
+            latencies.append(time.perf_counter() - start)
+        return latencies, rejected
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.users) as pool:
+        results = list(pool.map(session, range(args.users)))
+    elapsed = time.perf_counter() - start
+    ms = np.concatenate([r[0] for r in results]) * 1000
+    report = {
+        "seconds": round(elapsed, 2),
+        "provider_calls": provider.calls,
+        "throttled": provider.throttled,
+        "rejected": sum(r[1] for r in results),
+        "p50_ms": round(float(np.percentile(ms, 50)), 1),
+        "p99_ms": round(float(np.percentile(ms, 99)), 1),
+    }
+    if gate is not None:
+        report["gate"] = gate.stats()
+    return report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, default=40)
+    parser.add_argument("--requests", type=int, default=5, help="Requests per user")
+    parser.add_argument("--prompts", type=int, default=20, help="Distinct prompts to draw from")
+    parser.add_argument("--latency", type=float, default=0.2, help="Provider seconds per call")
+    parser.add_argument("--provider-rps", type=float, default=20, help="Calls/s before throttling")
+    parser.add_argument("--retry-after", type=float, default=1.0, help="Backoff after a throttle")
+    parser.add_argument("--user-rate", type=float, default=1.0, help="Gate calls/s per user")
+    args = parser.parse_args(argv)
+
+    print(json.dumps({
+        "requests": args.users * args.requests,
+        "ungated": run(args, gated=False),
+        "gated": run(args, gated=True),
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
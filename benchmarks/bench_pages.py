@@ -0,0 +1,72 @@
+"""Warm rerun time and element payload size per page.
+
+    python -m benchmarks.bench_pages
+
+Renders every page through Streamlit's AppTest harness, then reruns it
+``--repeat`` times. Reports the median rerun time and the serialized size
+of all elements the page sends to the browser, which approximates the
+websocket payload per rerun.
+"""
+
+import argparse
+import json
+import logging
+import os
+import statistics
+import time
+
+PAGES = ["Home", "GreenScore", "Chatbot", "Impact Dashboard", "NextSteps"]
+
+APP = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "app.py")
+
+
+def _walk(node):
+    yield node
+    for child in getattr(node, "children", {}).values():
+        yield from _walk(child)
+
+
+def payload_bytes(at):
+    total = 0
+    for node in _walk(at._tree):
+        proto = getattr(node, "proto", None)
+        if proto is not None and hasattr(proto, "ByteSize"):
+            total += proto.ByteSize()
+    return total
+
+
+def measure(page, repeat):
+    from streamlit.testing.v1 import AppTest
+
+    at = AppTest.from_file(APP, default_timeout=120)
+    at.secrets["OpenAIKey"] = "sk-benchmark"
+    at.session_state.page = page
+    at.run()
+
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        at.run()
+        times.append((time.perf_counter() - start) * 1000)
+
+    return {
+        "page": page,
+        "rerun_ms_median": round(statistics.median(times), 1),
+        "payload_bytes": payload_bytes(at),
+        "errors": [str(e.value) for e in at.exception],
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--pages", nargs="+", default=PAGES)
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args(argv)
+
+    logging.disable(logging.WARNING)
+    os.chdir(os.path.dirname(APP))
+    print(json.dumps([measure(page, args.repeat) for page in args.pages], indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""Throughput of serial vs. partitioned multi-process scoring.
+
+    python -m benchmarks.bench_parallel --rows 2000000 --workers 1 2 4 8
+
+Prints one JSON object with rows/s per worker count and the speedup over a
+single worker. Outputs are compared byte-for-byte to the serial result to
+check the merge is deterministic.
+"""
+
+import argparse
+import filecmp
+import json
+import os
+import tempfile
+import time
+
+from ecolens.batch import score_file
+from ecolens.parallel import default_workers, score_file_parallel
+
+from . import synthetic
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--workers", type=int, nargs="+")
+    parser.add_argument("--partition-mb", type=float, default=16)
+    args = parser.parse_args(argv)
+
+    cores = default_workers()
+    worker_counts = args.workers or sorted({1, 2, cores // 2 or 1, cores})
+    materials_df = synthetic.materials()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        source = synthetic.write_products(os.path.join(tmp, "products.csv"), args.rows)
+        baseline_out = os.path.join(tmp, "serial.csv")
+
+        start = time.perf_counter()
+        score_file(source, baseline_out, materials_df)
+        serial_s = time.perf_counter() - start
+
+        runs = []
+        for workers in worker_counts:
+            out = os.path.join(tmp, f"parallel_{workers}.csv")
+            start = time.perf_counter()
+            score_file_parallel(source, out, materials_df, workers=workers,
+                                partition_bytes=int(args.partition_mb * 1024 * 1024))
+            elapsed = time.perf_counter() - start
+            runs.append({
+                "workers": workers,
+                "seconds": round(elapsed, 3),
+                "rows_per_s": round(args.rows / elapsed),
+                "identical_to_serial": filecmp.cmp(baseline_out, out, shallow=False),
+            })
+
+    single = next((r["seconds"] for r in runs if r["workers"] == 1), serial_s)
+    for run in runs:
+        run["speedup"] = round(single / run["seconds"], 2)
+        run["efficiency"] = round(run["speedup"] / run["workers"], 2)
+
+    print(json.dumps({
+        "rows": args.rows,
+        "cores": cores,
+        "serial_seconds": round(serial_s, 3),
+        "serial_rows_per_s": round(args.rows / serial_s),
+        "parallel": runs,
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
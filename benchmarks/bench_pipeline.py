@@ -0,0 +1,158 @@
+"""Timings for the scoring pipeline and catalogue lookup paths.
+
+    python -m benchmarks.bench_pipeline --sizes 10000 100000 1000000 -o results.json
+    python -m benchmarks.bench_pipeline --baseline benchmarks/baseline.json
+
+Lookups are timed twice, side by side: on a ``summary_df`` DataFrame and,
+as the ``catalogue_*`` cases, on the :class:`~ecolens.compact.CompactCatalogue`
+the app serves them from. Each case reports the best of ``--repeat`` runs in
+milliseconds. With
+``--baseline`` the results are compared to a stored run and the command
+exits non-zero when any case is slower than ``--tolerance`` allows.
+``benchmarks/baseline.json`` was recorded with the default sizes on the
+x86_64 machine named in it; timings don't transfer between machines, so
+regenerate it with ``-o`` before comparing on other hardware.
+"""
+
+import argparse
+import json
+import platform
+import sys
+import time
+
+import numpy as np
+
+from ecolens.compact import compact_summary
+from ecolens.lookup import fuzzy_match_product, get_greener_alternatives, product_options
+from ecolens.profiles import ScoringProfile
+from ecolens.scoring import (
+    bonus_score,
+    eco_score,
+    ingredient_score,
+    packaging_impact,
+    packaging_score,
+    prepare_flags,
+    score_products,
+    summarize,
+)
+
+from . import synthetic
+
+DEFAULT_SIZES = [10_000, 100_000, 1_000_000]
+LOOKUPS = 20
+# Non-default profile, so rescoring is not short-circuited
+ALT_PROFILE = ScoringProfile("bench", "1", (0.3, 10, 20, 5), (0.55, 0.15, 0.15, 0.15), (0.5, 0.4, 0.1))
+
+
+def best_of(fn, repeat):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return min(times) * 1000
+
+
+def run_size(n, repeat):
+    materials_df = synthetic.materials()
+    products_df = prepare_flags(synthetic.products(n))
+    summary_df = summarize(score_products(products_df, materials_df))
+    catalogue = compact_summary(summary_df)
+
+    impacts = packaging_impact(products_df, materials_df)
+    packaging = packaging_score(impacts.to_numpy())
+    ingredient = ingredient_score(products_df)
+    bonus = bonus_score(products_df)
+
+    rng = np.random.default_rng(1)
+    names = summary_df["name"].to_numpy()[rng.integers(0, n, LOOKUPS)]
+
+    def alternatives():
+        for name in names:
+            get_greener_alternatives(name, summary_df)
+
+    def fuzzy():
+        for name in names[:5]:
+            fuzzy_match_product(name.lower(), summary_df)
+
+    # The app's paths: the same lookups on the compact catalogue
+    catalogue.ranking()  # built once per catalogue version, like the app
+
+    def catalogue_alternatives():
+        for name in names:
+            catalogue.greener(name)
+
+    def catalogue_fuzzy():
+        for name in names[:5]:
+            fuzzy_match_product(name.lower(), catalogue)
+
+    def catalogue_select():
+        for name in names:
+            catalogue.select([name])
+
+    cases = {
+        "packaging_impact": lambda: packaging_impact(products_df, materials_df),
+        "ingredient_score": lambda: ingredient_score(products_df),
+        "eco_score_combine": lambda: eco_score(packaging, ingredient, bonus),
+        "score_products": lambda: score_products(products_df, materials_df),
+        "profile_rescore": lambda: catalogue.rescored(ALT_PROFILE),
+        f"get_greener_alternatives_x{LOOKUPS}": alternatives,
+        "fuzzy_match_product_x5": fuzzy,
+        "product_options": lambda: product_options(summary_df),
+        f"catalogue_greener_x{LOOKUPS}": catalogue_alternatives,
+        "catalogue_fuzzy_match_x5": catalogue_fuzzy,
+        "catalogue_product_options": lambda: product_options(catalogue),
+        f"catalogue_select_x{LOOKUPS}": catalogue_select,
+    }
+    return {name: round(best_of(fn, repeat), 3) for name, fn in cases.items()}
+
+
+def compare(results, baseline, tolerance):
+    """Return ``[(size, case, baseline_ms, now_ms)]`` for regressed cases."""
+    regressions = []
+    for size, cases in results["results"].items():
+        for case, now in cases.items():
+            before = baseline.get("results", {}).get(size, {}).get(case)
+            if before is not None and now > before * (1 + tolerance):
+                regressions.append((size, case, before, now))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES,
+                        help="Catalogue sizes (up to 5000000)")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("-o", "--output", help="Write results JSON here (default: stdout)")
+    parser.add_argument("--baseline", help="Compare against this results JSON")
+    parser.add_argument("--tolerance", type=float, default=0.25,
+                        help="Allowed slowdown vs. baseline (0.25 = 25%%)")
+    args = parser.parse_args(argv)
+
+    results = {
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "repeat": args.repeat,
+        "results": {str(n): run_size(n, args.repeat) for n in args.sizes},
+    }
+
+    text = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.tolerance)
+        for size, case, before, now in regressions:
+            print(f"REGRESSION {case} @ {size}: {before:.3f} ms -> {now:.3f} ms", file=sys.stderr)
+        if regressions:
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,68 @@
+"""Cold-start cost of each app page.
+
+    python -m benchmarks.bench_startup
+
+Every page is rendered once in a fresh interpreter (via Streamlit's
+AppTest harness), so the timing includes all imports the page triggers.
+The report lists the first-run time per page and which heavy optional
+modules that page pulled in.
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+PAGES = ["Home", "GreenScore", "Chatbot", "Impact Dashboard", "NextSteps"]
+HEAVY_MODULES = ["plotly", "openai", "PIL", "rapidfuzz", "requests"]
+
+APP = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "app.py")
+
+_PROBE = """
+import json, sys, time
+from streamlit.testing.v1 import AppTest
+
+heavy = {heavy!r}
+before = {{m for m in heavy if m in sys.modules}}
+at = AppTest.from_file({app!r}, default_timeout=120)
+at.secrets["OpenAIKey"] = "sk-benchmark"
+at.session_state.page = {page!r}
+start = time.perf_counter()
+at.run()
+elapsed = time.perf_counter() - start
+print(json.dumps({{
+    "page": {page!r},
+    "first_run_ms": round(elapsed * 1000, 1),
+    "heavy_imports": sorted(m for m in heavy if m in sys.modules and m not in before),
+    "errors": [str(e.value) for e in at.exception],
+}}))
+"""
+
+
+def probe(page):
+    code = _PROBE.format(heavy=HEAVY_MODULES, app=APP, page=page)
+    out = subprocess.run(
+        [sys.executable, "-c", code],
+        capture_output=True, text=True, check=True, cwd=os.path.dirname(APP),
+    )
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--pages", nargs="+", default=PAGES)
+    parser.add_argument("--repeat", type=int, default=3,
+                        help="Fresh interpreters per page; the best run is kept")
+    args = parser.parse_args(argv)
+
+    report = []
+    for page in args.pages:
+        runs = [probe(page) for _ in range(args.repeat)]
+        report.append(min(runs, key=lambda r: r["first_run_ms"]))
+
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
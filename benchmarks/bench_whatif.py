@@ -0,0 +1,71 @@
+"""What-if simulator: bulk broadcast vs. one scenario at a time.
+
+    python -m benchmarks.bench_whatif --rows 20000 --scenarios 2000
+
+Sweeps weight deltas x material swaps over one category of a synthetic
+catalogue, times :meth:`Simulator.bulk` against a loop of
+:meth:`Simulator.apply` (on a sample of the scenarios) and checks both give
+the same scores and ranks.
+"""
+
+import argparse
+import json
+import time
+
+import numpy as np
+
+from ecolens.simulate import Simulator
+
+from . import synthetic
+
+SWAPS = ["PET", "HDPE", "Aluminum", "Cardboard", "Paperboard"]
+
+
+def scenarios(n):
+    deltas = np.linspace(-20, 20, max(1, n // len(SWAPS)))
+    return [
+        {"weight_delta_g": float(delta), "swap": {"PET": material}}
+        for delta in deltas for material in SWAPS
+    ][:n]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=20_000)
+    parser.add_argument("--scenarios", type=int, default=2_000)
+    parser.add_argument("--category", default="Soft Drink")
+    parser.add_argument("--loop-sample", type=int, default=50,
+                        help="Scenarios to time one by one (extrapolated)")
+    args = parser.parse_args(argv)
+
+    sim = Simulator(synthetic.products(args.rows), synthetic.materials())
+    sweep = scenarios(args.scenarios)
+
+    start = time.perf_counter()
+    result = sim.bulk(sweep, category=args.category)
+    bulk_s = time.perf_counter() - start
+
+    sample = sweep[:args.loop_sample]
+    start = time.perf_counter()
+    single = [sim.apply(scenario, category=args.category) for scenario in sample]
+    loop_s = (time.perf_counter() - start) / len(sample) * len(sweep)
+
+    identical = all(
+        np.array_equal(df["simulated_eco_score"].to_numpy(), result["eco_score"][i])
+        and np.array_equal(df["simulated_rank"].to_numpy(), result["rank"][i])
+        for i, df in enumerate(single)
+    )
+    print(json.dumps({
+        "rows": args.rows,
+        "products_in_category": len(result["rows"]),
+        "scenarios": len(sweep),
+        "bulk_seconds": round(bulk_s, 3),
+        "loop_seconds_estimated": round(loop_s, 3),
+        "speedup": round(loop_s / bulk_s, 1),
+        "cells_per_s": round(result["eco_score"].size / bulk_s),
+        "identical": identical,
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+"""Synthetic catalogues shaped like ``product.csv`` / ``material.csv``."""
+
+import numpy as np
+import pandas as pd
+
+from ecolens.scoring import ALL_FLAGS
+
+CATEGORIES = [
+    "Cream", "Shampoo", "Body Wash", "Sunscreen",
+    "Soft Drink", "Instant Noodles", "Chips", "Chocolate",
+    "Biscuits", "Candy", "Snack",
+]
+
+# Mostly known materials, plus PP (not in material.csv) and blanks, like the
+# real catalogue
+SLOT_MATERIALS = [
+    "PET", "HDPE", "Aluminum", "Cardboard", "LDPE",
+    "Plastic Film", "Paperboard", "Plastic Pouch", "PP", None,
+]
+
+
+def materials(path="material.csv"):
+    return pd.read_csv(path)
+
+
+def products(n, seed=0):
+    """Return ``n`` random products with realistic column shapes."""
+    rng = np.random.default_rng(seed)
+    brands = np.array([f"Brand {i}" for i in range(max(1, n // 50))])
+
+    df = pd.DataFrame({
+        "name": [f"Product {i} {c}" for i, c in enumerate(rng.choice(CATEGORIES, n))],
+        "brand": rng.choice(brands, n),
+        "category": rng.choice(CATEGORIES, n),
+        "material_1": rng.choice(SLOT_MATERIALS[:-1], n),
+        "weight_1_g": rng.integers(2, 80, n),
+        "material_2": rng.choice(SLOT_MATERIALS, n),
+        "weight_2_g": rng.integers(0, 40, n),
+    })
+    df.loc[df["material_2"].isna(), "weight_2_g"] = 0
+    for flag in ALL_FLAGS:
+        df[flag] = (rng.random(n) < 0.3).astype(int)
+    return df
+
+
+def write_products(path, n, seed=0, chunk=500_000):
+    """Write ``n`` synthetic products to ``path`` without holding them all."""
+    written = 0
+    while written < n:
+        size = min(chunk, n - written)
+        part = products(size, seed=seed + written)
+        part["name"] = [f"Product {written + i}" for i in range(size)]
+        part.to_csv(path, mode="w" if written == 0 else "a", header=written == 0, index=False)
+        written += size
+    return path
@@ -0,0 +1,36 @@
+"""Headless EcoLens scoring library.
+
+Importing this package does not touch Streamlit, secrets or OpenAI; the
+Streamlit app in ``app.py`` is one consumer of it, the CLI
+(``python -m ecolens``) another.
+"""
+
+from .batch import iter_scored_chunks, score_file
+from .compact import CompactCatalogue, compact_summary
+from .profiles import DEFAULT_PROFILE, ScoringProfile, load_profile
+from .simulate import Simulator
+from .scoring import (
+    ALL_FLAGS,
+    IMPACT_COLUMNS,
+    SUMMARY_COLUMNS,
+    material_impact_dict,
+    score_products,
+    summarize,
+)
+
+__all__ = [
+    "ALL_FLAGS",
+    "CompactCatalogue",
+    "DEFAULT_PROFILE",
+    "IMPACT_COLUMNS",
+    "SUMMARY_COLUMNS",
+    "ScoringProfile",
+    "Simulator",
+    "compact_summary",
+    "iter_scored_chunks",
+    "load_profile",
+    "material_impact_dict",
+    "score_file",
+    "score_products",
+    "summarize",
+]
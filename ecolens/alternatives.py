@@ -0,0 +1,49 @@
+"""Curated greener alternatives, scored with the same pipeline as products.
+
+``alternatives.csv`` uses the ``product.csv`` schema, so every suggestion
+gets a real eco score. :func:`build_index` links each one to the catalogue
+by comparing it with the average eco score of its category in
+``summary_df``, and groups the results by category for O(1) lookups.
+"""
+
+import pandas as pd
+
+from .compact import CompactCatalogue
+from .scoring import score_products, summarize
+
+
+def score_alternatives(alternatives_df, materials_df, profile=None):
+    return summarize(score_products(alternatives_df, materials_df, profile))
+
+
+def build_index(scored_alternatives, summary_df):
+    """Return ``{category: (alternative, ...)}``, best eco score first.
+
+    ``summary_df`` may also be a :class:`~ecolens.compact.CompactCatalogue`.
+
+    Each alternative is a dict with ``name``, ``brand``, ``eco_score``,
+    ``category_avg`` (catalogue average, or ``None`` when the category has
+    no catalogue products) and ``improvement`` (points above that average).
+    """
+    if isinstance(summary_df, CompactCatalogue):
+        category_avg = summary_df.category_means()
+    else:
+        category_avg = summary_df.groupby("category")["eco_score"].mean()
+
+    ranked = scored_alternatives.sort_values(["category", "eco_score"], ascending=[True, False])
+    index = {}
+    for row in ranked.itertuples(index=False):
+        avg = category_avg.get(row.category)
+        avg = None if avg is None or pd.isna(avg) else round(float(avg), 1)
+        index.setdefault(row.category, []).append({
+            "name": row.name,
+            "brand": row.brand,
+            "eco_score": float(row.eco_score),
+            "category_avg": avg,
+            "improvement": None if avg is None else round(float(row.eco_score) - avg, 1),
+        })
+    return {category: tuple(alts) for category, alts in index.items()}
+
+
+def load_index(path, materials_df, summary_df, profile=None):
+    return build_index(score_alternatives(pd.read_csv(path), materials_df, profile), summary_df)
@@ -0,0 +1,425 @@
+"""HTTP scoring API: EcoLens scores for other apps.
+
+    python -m ecolens serve product.csv --port 8765
+
+Endpoints (all JSON):
+
+    GET  /health
+    GET  /product?name=Coca+Cola+1L          scores, impacts and flags
+    GET  /alternatives?name=...&k=5          greener products in its category
+    GET  /search?q=doritos&limit=10          fuzzy name search
+    POST /score   {"products": [rows]}       score product.csv-shaped rows
+
+The server is plain asyncio (HTTP/1.1 with keep-alive), so it needs nothing
+beyond the scoring dependencies. Lookups are answered from indexes built
+once at startup (:class:`ScoringIndex`) and GET responses are cached by
+URL. Every GET response carries an ``ETag``, and a matching
+``If-None-Match`` gets an empty ``304``. Bulk scoring runs in worker
+processes so lookups keep flowing while it does.
+"""
+
+import asyncio
+import hashlib
+import json
+import sys
+import traceback
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from http import HTTPStatus
+from urllib.parse import parse_qs, urlsplit
+
+import numpy as np
+import pandas as pd
+
+from .compact import compact_summary
+from .ingest import read_products
+from .scoring import ALL_FLAGS, score_products, summarize
+
+DEFAULT_PORT = 8765
+MAX_BULK_ROWS = 10_000
+MAX_BODY_BYTES = 8 << 20
+MAX_HEADERS = 100
+# Answers for requests whose body is not read
+_REQUEST_ERRORS = {
+    HTTPStatus.BAD_REQUEST: "invalid Content-Length",
+    HTTPStatus.REQUEST_HEADER_FIELDS_TOO_LARGE: f"more than {MAX_HEADERS} headers",
+    HTTPStatus.REQUEST_ENTITY_TOO_LARGE: f"body over {MAX_BODY_BYTES} bytes",
+}
+RESPONSE_CACHE_SIZE = 4096
+SCORE_WORKERS = 1
+DEFAULT_ALTERNATIVES = 5
+MAX_ALTERNATIVES = 50
+DEFAULT_SEARCH_LIMIT = 10
+MAX_SEARCH_LIMIT = 100
+SEARCH_MIN_SCORE = 50
+
+
+def _json(obj):
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode()
+
+
+def _etag(body):
+    return '"' + hashlib.sha1(body).hexdigest()[:16] + '"'
+
+
+def _records(summary_df):
+    """JSON-ready dicts for ``summarize``-shaped rows."""
+    records = summary_df.astype({c: object for c in ("brand", "category")}).to_dict("records")
+    for record in records:
+        for flag in ALL_FLAGS:
+            record[flag] = int(record[flag])
+        if not isinstance(record["brand"], str):
+            record["brand"] = None
+    return records
+
+
+def _int_param(query, name, default, maximum):
+    value = query.get(name, [str(default)])[0]
+    try:
+        value = int(value)
+    except ValueError:
+        raise ValueError(f"{name} must be an integer") from None
+    if not 1 <= value <= maximum:
+        raise ValueError(f"{name} must be between 1 and {maximum}")
+    return value
+
+
+def _text_param(query, name):
+    value = query.get(name, [""])[0].strip()
+    if not value:
+        raise ValueError(f"missing query parameter {name!r}")
+    return value
+
+
+class ScoringIndex:
+    """Read-only lookup structures over a scored catalogue.
+
+    ``catalogue`` is a :class:`ecolens.compact.CompactCatalogue`;
+    ``alternatives`` the optional curated index from
+    :func:`ecolens.alternatives.load_index`.
+    """
+
+    def __init__(self, catalogue, materials_df, alternatives=None, profile=None):
+        from rapidfuzz import utils
+
+        frame = catalogue.frame()
+        self.catalogue = catalogue
+        self.materials_df = materials_df
+        self.alternatives = alternatives or {}
+        self.profile = profile
+
+        self.records = _records(frame)
+        self._exact = {}
+        self._folded = {}
+        for i, record in enumerate(self.records):
+            self._exact.setdefault(record["name"], i)
+            self._folded.setdefault(record["name"].casefold(), i)
+
+        # Per category: row numbers, best eco score first
+        self.eco = frame["eco_score"].to_numpy()
+        codes = catalogue.category_codes
+        order = np.lexsort((-self.eco, codes))
+        bounds = np.flatnonzero(np.diff(codes[order])) + 1
+        self._ranked = {
+            int(codes[rows[0]]): rows for rows in np.split(order, bounds) if len(rows)
+        }
+
+        self._search_choices = [utils.default_process(r["name"]) for r in self.records]
+
+    def __len__(self):
+        return len(self.records)
+
+    def find(self, name):
+        """Row number of ``name`` (exact, then case-insensitive)."""
+        i = self._exact.get(name)
+        if i is None:
+            i = self._folded.get(name.casefold())
+        if i is None:
+            raise LookupError(f"unknown product: {name!r}")
+        return i
+
+    def product(self, name):
+        return self.records[self.find(name)]
+
+    def greener(self, name, k=DEFAULT_ALTERNATIVES):
+        """Top ``k`` catalogue products in ``name``'s category that score higher."""
+        i = self.find(name)
+        ranked = self._ranked[int(self.catalogue.category_codes[i])]
+        better = ranked[self.eco[ranked] > self.eco[i]][:k]
+        record = self.records[i]
+        return {
+            "product": record["name"],
+            "category": record["category"],
+            "eco_score": record["eco_score"],
+            "alternatives": [
+                {
+                    "name": self.records[j]["name"],
+                    "brand": self.records[j]["brand"],
+                    "eco_score": self.records[j]["eco_score"],
+                    "improvement": round(self.records[j]["eco_score"] - record["eco_score"], 1),
+                }
+                for j in better
+            ],
+            "curated": list(self.alternatives.get(record["category"], ())[:k]),
+        }
+
+    def search(self, query, limit=DEFAULT_SEARCH_LIMIT):
+        from rapidfuzz import fuzz, process, utils
+
+        hits = process.extract(
+            utils.default_process(query), self._search_choices,
+            scorer=fuzz.WRatio, limit=limit, score_cutoff=SEARCH_MIN_SCORE
+        )
+        return [
+            {
+                "name": self.records[i]["name"],
+                "category": self.records[i]["category"],
+                "eco_score": self.records[i]["eco_score"],
+                "match": round(score, 1),
+            }
+            for _, score, i in hits
+        ]
+
+    def score(self, rows):
+        return score_rows(rows, self.materials_df, self.profile)
+
+
+def score_rows(rows, materials_df, profile=None):
+    """Validate and score product.csv-shaped ``rows`` (a list of dicts).
+
+    Returns ``{"scored": [...], "rejected": [...]}``; both carry each row's
+    ``index`` in ``rows``.
+    """
+    from .batch import score_raw_chunk
+
+    if not isinstance(rows, list) or not all(isinstance(r, dict) for r in rows):
+        raise ValueError('expected {"products": [objects]}')
+    if len(rows) > MAX_BULK_ROWS:
+        raise ValueError(f"at most {MAX_BULK_ROWS} products per request")
+    if not rows:
+        return {"scored": [], "rejected": []}
+
+    # All-string cells, as read_raw_chunks produces (missing keys -> None)
+    raw = pd.DataFrame(rows).astype(object)
+    raw = raw.map(lambda v: None if v is None or v != v else str(v))
+    scored, rejected = score_raw_chunk(raw, materials_df, profile=profile)
+    records = _records(scored)
+    for position, record in zip(scored.index, records):
+        record["index"] = int(position)
+    return {
+        "scored": records,
+        "rejected": [
+            {"index": int(position), "reason": reason}
+            for position, reason in rejected["reject_reason"].items()
+        ],
+    }
+
+
+# Bulk scoring runs in worker processes: on a thread, its many small pandas
+# steps would queue behind the event loop for the GIL and a 40 ms request
+# could take a second under load. Set once per worker by _init_worker.
+_MATERIALS = None
+_PROFILE = None
+
+
+def _init_worker(materials_df, profile):
+    global _MATERIALS, _PROFILE
+    _MATERIALS, _PROFILE = materials_df, profile
+
+
+def _score_request(body):
+    """``POST /score`` body -> ``(status, payload)``, in a worker process."""
+    try:
+        payload = json.loads(body or b"{}")
+        rows = payload.get("products") if isinstance(payload, dict) else None
+        return HTTPStatus.OK, _json(score_rows(rows, _MATERIALS, _PROFILE))
+    except ValueError as e:
+        return HTTPStatus.BAD_REQUEST, _json({"error": str(e)})
+
+
+def load_scoring_index(product_path, materials_df, alternatives_path=None, profile=None):
+    """Score ``product_path`` and build a :class:`ScoringIndex` over it."""
+    from .alternatives import load_index
+
+    products_df, _, _ = read_products(product_path, list(materials_df["material"]))
+    summary = summarize(score_products(products_df, materials_df, profile))
+    catalogue = compact_summary(summary)
+    alternatives = None
+    if alternatives_path:
+        alternatives = load_index(alternatives_path, materials_df, catalogue, profile)
+    return ScoringIndex(catalogue, materials_df, alternatives, profile)
+
+
+# -----------------------------
+# HTTP
+# -----------------------------
+class ScoringServer:
+    """Minimal asyncio HTTP/1.1 front end for a :class:`ScoringIndex`."""
+
+    def __init__(self, index, cache_size=RESPONSE_CACHE_SIZE, score_workers=SCORE_WORKERS):
+        self.index = index
+        self.cache_size = cache_size
+        self.score_workers = score_workers
+        self._pool = None
+        self._cache = OrderedDict()
+        self._routes = {
+            "/health": self._health,
+            "/product": lambda q: self.index.product(_text_param(q, "name")),
+            "/alternatives": lambda q: self.index.greener(
+                _text_param(q, "name"), _int_param(q, "k", DEFAULT_ALTERNATIVES, MAX_ALTERNATIVES)
+            ),
+            "/search": lambda q: self.index.search(
+                _text_param(q, "q"), _int_param(q, "limit", DEFAULT_SEARCH_LIMIT, MAX_SEARCH_LIMIT)
+            ),
+        }
+
+    def _health(self, query):
+        profile = self.index.profile
+        return {"status": "ok", "products": len(self.index),
+                "profile": profile.key if profile else "default@1"}
+
+    def get(self, target):
+        """``(status, body, etag)`` for a GET, cached per target."""
+        cached = self._cache.get(target)
+        if cached is not None:
+            self._cache.move_to_end(target)
+            return cached
+
+        url = urlsplit(target)
+        handler = self._routes.get(url.path)
+        if handler is None:
+            return self._error(HTTPStatus.NOT_FOUND, f"no route {url.path}")
+        try:
+            body = _json(handler(parse_qs(url.query)))
+            response = (HTTPStatus.OK, body, _etag(body))
+        except LookupError as e:
+            response = self._error(HTTPStatus.NOT_FOUND, str(e.args[0]))
+        except ValueError as e:
+            return self._error(HTTPStatus.BAD_REQUEST, str(e))
+
+        self._cache[target] = response
+        if len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+        return response
+
+    @staticmethod
+    def _error(status, message):
+        body = _json({"error": message})
+        return status, body, _etag(body)
+
+    async def handle(self, reader, writer):
+        loop = asyncio.get_running_loop()
+        try:
+            while True:
+                request = await self._read_request(reader)
+                if request is None:
+                    break
+                method, target, headers, body, keep_alive = request
+
+                try:
+                    if isinstance(body, HTTPStatus):
+                        status, payload, etag = self._error(body, _REQUEST_ERRORS[body])
+                    elif method == "GET":
+                        status, payload, etag = self.get(target)
+                    elif method == "POST" and urlsplit(target).path == "/score":
+                        status, payload = await loop.run_in_executor(self._pool, _score_request, body)
+                        etag = None
+                    else:
+                        status, payload, etag = self._error(HTTPStatus.METHOD_NOT_ALLOWED,
+                                                            f"{method} {urlsplit(target).path}")
+                except Exception:
+                    # Answer instead of dropping the socket, then close it
+                    traceback.print_exc(file=sys.stderr)
+                    status, payload, etag = self._error(HTTPStatus.INTERNAL_SERVER_ERROR,
+                                                        "internal error")
+                    keep_alive = False
+
+                if etag is not None and headers.get("if-none-match") == etag:
+                    status, payload = HTTPStatus.NOT_MODIFIED, b""
+                self._write(writer, status, payload, etag, keep_alive)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def _read_request(self, reader):
+        """``(method, target, headers, body, keep_alive)``, ``None`` at EOF.
+
+        ``body`` is the :class:`HTTPStatus` to answer with instead when it
+        can't be read: 413 over ``MAX_BODY_BYTES``, 400 for a negative or
+        non-numeric Content-Length, 431 for more than ``MAX_HEADERS``
+        headers.
+        """
+        try:
+            line = await reader.readline()
+            if not line.strip():
+                return None
+            method, target, version = line.decode("latin-1").split()
+            headers = {}
+            for _ in range(MAX_HEADERS + 1):
+                header = await reader.readline()
+                if header in (b"\r\n", b"\n", b""):
+                    break
+                key, _, value = header.decode("latin-1").partition(":")
+                headers[key.strip().lower()] = value.strip()
+            else:
+                # The rest of the header block is unread, so the connection closes
+                return method.upper(), target, headers, HTTPStatus.REQUEST_HEADER_FIELDS_TOO_LARGE, False
+        except ValueError:
+            return None
+        try:
+            length = int(headers.get("content-length", 0))
+        except ValueError:
+            length = -1
+        # Either way the body is left unread, so the connection closes
+        if length < 0:
+            return method.upper(), target, headers, HTTPStatus.BAD_REQUEST, False
+        if length > MAX_BODY_BYTES:
+            return method.upper(), target, headers, HTTPStatus.REQUEST_ENTITY_TOO_LARGE, False
+        body = await reader.readexactly(length) if length else b""
+        connection = headers.get("connection", "").lower()
+        keep_alive = connection != "close" if version == "HTTP/1.1" else connection == "keep-alive"
+        return method.upper(), target, headers, body, keep_alive
+
+    @staticmethod
+    def _write(writer, status, payload, etag, keep_alive):
+        lines = [
+            f"HTTP/1.1 {status.value} {status.phrase}",
+            f"Content-Length: {len(payload)}",
+            "Connection: " + ("keep-alive" if keep_alive else "close"),
+        ]
+        if status != HTTPStatus.NOT_MODIFIED:
+            lines.append("Content-Type: application/json; charset=utf-8")
+        if etag is not None:
+            lines += [f"ETag: {etag}", "Cache-Control: no-cache"]
+        writer.write(("\r\n".join(lines) + "\r\n\r\n").encode("latin-1") + payload)
+
+    async def serve(self, host="127.0.0.1", port=DEFAULT_PORT, ready=None):
+        self._pool = ProcessPoolExecutor(
+            max_workers=self.score_workers,
+            initializer=_init_worker,
+            initargs=(self.index.materials_df, self.index.profile),
+        )
+        # Start the workers now rather than on the first POST /score
+        await asyncio.get_running_loop().run_in_executor(self._pool, _score_request, b'{"products": []}')
+        server = await asyncio.start_server(self.handle, host, port)
+        bound = server.sockets[0].getsockname()
+        print(f"Serving {len(self.index)} products on http://{bound[0]}:{bound[1]}", file=sys.stderr)
+        if ready is not None:
+            ready(bound)
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            self._pool.shutdown(cancel_futures=True)
+
+
+def serve(index, host="127.0.0.1", port=DEFAULT_PORT, score_workers=SCORE_WORKERS):
+    """Run the API until interrupted."""
+    try:
+        asyncio.run(ScoringServer(index, score_workers=score_workers).serve(host, port))
+    except KeyboardInterrupt:
+        pass
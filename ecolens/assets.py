@@ -0,0 +1,127 @@
+"""Local image pipeline for the Home page.
+
+``build_assets()`` downloads the remote images the app uses, writes
+resized WebP variants into ``static/img`` and records them in
+``static/img/manifest.json``. ``img_attrs()`` turns a manifest entry into
+``<img>`` attributes (``src``/``srcset``/``sizes``/``loading``); when the
+assets haven't been built it falls back to the original remote URL, so a
+fresh checkout still renders.
+"""
+
+import io
+import json
+import os
+import urllib.request
+from html import escape
+
+REMOTE_IMAGES = {
+    "hero": "https://images.openai.com/static-rsc-3/L_9-L2VXhvFW5NZZvI6VLjA1QxHDiDeV5vyXsgKqM2ycJVtMFds_HEsJfhXYdziNs9fdDa4f0k4koZsaN3gehTxDddohscLt0wYAfwvMxRE?purpose=fullsize",
+    "greenscore": "https://www.iberdrola.com/documents/20125/40513/huella-de-carbono-746x419.jpg/f61f98a2-7c51-27f9-31d2-41b1dafe6bf7?t=1738248418273",
+    "chatbot": "https://beetroot.co/wp-content/uploads/sites/2/2024/12/Cover_AI-chatbots-in-GreenTech.png",
+    "impact": "https://greenscoreapp.com/wp-content/uploads/2024/09/Empowering-Sustainability-Through-Innovation-image2-Green-Score.webp",
+    "next_steps": "https://www.shutterstock.com/image-photo/desk-displays-esg-metrics-sustainable-260nw-2672441077.jpg",
+}
+
+WIDTHS = (480, 960, 1440)
+WEBP_QUALITY = 80
+MANIFEST = "manifest.json"
+
+
+def image_dir(static_dir):
+    return os.path.join(static_dir, "img")
+
+
+def manifest_mtime(static_dir):
+    """Modification time of the manifest (``None`` before the first build).
+
+    ``build-assets`` rewrites the manifest on every run, so this is a cheap
+    version stamp for anything cached from the assets.
+    """
+    try:
+        return os.stat(os.path.join(image_dir(static_dir), MANIFEST)).st_mtime_ns
+    except OSError:
+        return None
+
+
+def load_manifest(static_dir):
+    try:
+        with open(os.path.join(image_dir(static_dir), MANIFEST), encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _download(url, timeout=30):
+    request = urllib.request.Request(url, headers={"User-Agent": "EcoLens asset build"})
+    with urllib.request.urlopen(request, timeout=timeout) as response:
+        return response.read()
+
+
+def build_image(key, data, out_dir, widths=WIDTHS):
+    """Write WebP variants of the image bytes ``data``; return manifest entry."""
+    from PIL import Image
+
+    image = Image.open(io.BytesIO(data))
+    image = image.convert("RGBA" if image.mode in ("RGBA", "LA", "P") else "RGB")
+
+    targets = [w for w in widths if w < image.width] or [image.width]
+    if image.width <= widths[-1] and image.width not in targets:
+        targets.append(image.width)
+
+    variants = []
+    for width in sorted(targets):
+        height = round(image.height * width / image.width)
+        filename = f"{key}-{width}.webp"
+        image.resize((width, height), Image.LANCZOS).save(
+            os.path.join(out_dir, filename), "WEBP", quality=WEBP_QUALITY, method=6
+        )
+        variants.append({"file": filename, "width": width})
+
+    return {"width": image.width, "height": image.height, "variants": variants}
+
+
+def build_assets(static_dir, images=None, log=print):
+    """Vendor ``images`` (default: ``REMOTE_IMAGES``) into ``static/img``.
+
+    Images that fail to download keep their previous manifest entry (or
+    none, so the app keeps using the remote URL). Returns the manifest.
+    """
+    images = images or REMOTE_IMAGES
+    out_dir = image_dir(static_dir)
+    os.makedirs(out_dir, exist_ok=True)
+
+    manifest = load_manifest(static_dir)
+    for key, url in images.items():
+        try:
+            manifest[key] = build_image(key, _download(url), out_dir)
+        except Exception as exc:
+            log(f"skipped {key}: {exc}")
+            continue
+        manifest[key]["source"] = url
+        sizes = ", ".join(str(v["width"]) for v in manifest[key]["variants"])
+        log(f"built {key}: {sizes}")
+
+    with open(os.path.join(out_dir, MANIFEST), "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    return manifest
+
+
+def img_attrs(key, static_dir, base_url, sizes="100vw", lazy=True):
+    """``<img>`` attributes for ``key``, preferring the local WebP variants.
+
+    ``base_url`` is the URL of ``static/img`` as seen from the document the
+    tag ends up in (e.g. ``app/static/img`` for the main page).
+    """
+    entry = load_manifest(static_dir).get(key)
+    loading = 'loading="lazy" decoding="async"' if lazy else 'fetchpriority="high" decoding="async"'
+
+    if not entry:
+        return f'src="{escape(REMOTE_IMAGES[key])}" {loading}'
+
+    variants = entry["variants"]
+    srcset = ", ".join(f'{base_url}/{v["file"]} {v["width"]}w' for v in variants)
+    default = variants[len(variants) // 2]["file"]
+    return (
+        f'src="{base_url}/{default}" srcset="{srcset}" sizes="{sizes}" '
+        f'width="{entry["width"]}" height="{entry["height"]}" {loading}'
+    )
@@ -0,0 +1,133 @@
+"""Chunked scoring of product files too large to hold in memory."""
+
+import os
+
+from .ingest import read_raw_chunks, validate_chunk
+from .scoring import ALL_FLAGS, SUMMARY_COLUMNS, score_products, summarize
+
+DEFAULT_CHUNKSIZE = 100_000
+
+
+def output_format(path, fmt=None):
+    """Resolve ``fmt`` (``"csv"`` / ``"parquet"``), inferring it from ``path``."""
+    if fmt:
+        return fmt
+    ext = os.path.splitext(path)[1].lower()
+    return "parquet" if ext in (".parquet", ".pq") else "csv"
+
+
+def score_raw_chunk(raw, materials_df, unknown_materials="keep", profile=None):
+    """Validate and score one all-string chunk -> ``(scored, rejected)``."""
+    clean, rejected, _ = validate_chunk(raw, list(materials_df["material"]), unknown_materials)
+    return summarize(score_products(clean, materials_df, profile)), rejected
+
+
+def iter_scored_chunks(product_path, materials_df, chunksize=DEFAULT_CHUNKSIZE,
+                       unknown_materials="keep", profile=None):
+    """Yield ``(scored, rejected)`` chunks of ``product_path`` in file order.
+
+    Rows failing schema validation (see :mod:`ecolens.ingest`) are left out
+    of ``scored`` and returned in ``rejected`` with a ``reject_reason``.
+    """
+    for raw in read_raw_chunks(product_path, chunksize):
+        yield score_raw_chunk(raw, materials_df, unknown_materials, profile)
+
+
+def _pyarrow():
+    try:
+        import pyarrow
+    except ImportError:
+        raise RuntimeError("Parquet output needs pyarrow (pip install pyarrow)") from None
+    return pyarrow
+
+
+def summary_schema():
+    """Arrow schema of ``summarize`` output, so every Parquet chunk gets the same types."""
+    pa = _pyarrow()
+    types = {"name": pa.string(), "brand": pa.string(), "category": pa.string(),
+             "ingredient_score": pa.int64(), "bonus_score": pa.int64()}
+    types.update({flag: pa.int8() for flag in ALL_FLAGS})
+    return pa.schema([(column, types.get(column, pa.float64())) for column in SUMMARY_COLUMNS])
+
+
+class ChunkWriter:
+    """Append DataFrame chunks to a CSV or Parquet file.
+
+    Parquet chunks are cast to ``schema`` (default: the first chunk's), so
+    a chunk whose inferred types differ, e.g. an all-null ``brand`` or
+    categoricals with other codes, still lands in the same file.
+    """
+
+    def __init__(self, path, fmt=None, schema=None):
+        self.path = path
+        self.fmt = output_format(path, fmt)
+        self.rows = 0
+        self._parquet = None
+        self._schema = schema
+
+        if self.fmt == "parquet":
+            _pyarrow()
+        elif self.fmt != "csv":
+            raise ValueError(f"Unknown output format: {self.fmt!r}")
+
+    def write(self, df):
+        if self.fmt == "csv":
+            df.to_csv(self.path, mode="w" if self.rows == 0 else "a",
+                      header=self.rows == 0, index=False)
+        else:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+
+            table = pa.Table.from_pandas(df, preserve_index=False)
+            if self._schema is None:
+                self._schema = table.schema
+            table = table.cast(self._schema)
+            if self._parquet is None:
+                self._parquet = pq.ParquetWriter(self.path, self._schema)
+            self._parquet.write_table(table)
+        self.rows += len(df)
+
+    def close(self):
+        if self._parquet is not None:
+            self._parquet.close()
+            self._parquet = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def score_file(product_path, output_path, materials_df,
+               chunksize=DEFAULT_CHUNKSIZE, fmt=None, workers=1,
+               quarantine_path=None, unknown_materials="keep", profile=None):
+    """Stream-score ``product_path`` into ``output_path``.
+
+    Only one chunk is held in memory at a time. With ``workers > 1`` the
+    file is partitioned and scored across a process pool instead (see
+    :mod:`ecolens.parallel`). Rejected rows are appended to
+    ``quarantine_path`` when given, and ``profile`` (a
+    :class:`ecolens.profiles.ScoringProfile`) overrides the default caps and
+    weights. Returns ``(rows_written, rows_rejected)``.
+    """
+    if workers != 1:
+        from .parallel import iter_scored_partitions
+
+        chunks = iter_scored_partitions(product_path, materials_df, workers=workers or None,
+                                        unknown_materials=unknown_materials, profile=profile)
+    else:
+        chunks = iter_scored_chunks(product_path, materials_df, chunksize, unknown_materials, profile)
+
+    rejected_rows = 0
+    fmt = output_format(output_path, fmt)
+    schema = summary_schema() if fmt == "parquet" else None
+    with ChunkWriter(output_path, fmt, schema) as writer:
+        for scored, rejected in chunks:
+            if len(scored):
+                writer.write(scored)
+            if len(rejected) and quarantine_path is not None:
+                rejected.to_csv(quarantine_path, mode="w" if rejected_rows == 0 else "a",
+                                header=rejected_rows == 0, index=False)
+            rejected_rows += len(rejected)
+    return writer.rows, rejected_rows
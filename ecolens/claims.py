@@ -0,0 +1,196 @@
+"""Greenwashing check: find sustainability claims in packaging text.
+
+``claims.csv`` lists phrases (``phrase``), the claim they make (``claim``)
+and, for specific claims, the flag values that back them up (``requires``,
+e.g. ``recyclable_packaging=1``). Claims without ``requires`` are vague
+("natural", "eco-friendly").
+
+:class:`ClaimDetector` compiles every phrase into one Aho-Corasick automaton
+(pure Python, built once), so a scan's OCR text is matched in a single pass
+with no model call. A phrase negated within its clause ("not recyclable",
+"non-organic") is not a claim. :func:`check_claims` then compares the claims
+with the product's flags and eco score.
+"""
+
+import re
+from collections import deque
+
+import pandas as pd
+
+from .scoring import ALL_FLAGS
+
+# Vague claims on products below this eco score are reported as misleading
+# (the GreenScore page calls 60+ "Good")
+VAGUE_CLAIM_MIN_SCORE = 60
+
+_NON_WORD = re.compile(r"[^a-z0-9%]+")
+_CLAUSE_BREAK = re.compile(r"[.,;:!?()\n]+")
+# A claim right after one of these words ("not recyclable", "non-organic",
+# "isn't vegan", "free of natural ...") is not a claim. Looked for within
+# NEGATION_WINDOW words before the phrase, inside the same clause.
+NEGATORS = {"not", "non", "no", "never", "without", "isn", "aren", "wasn", "don", "doesn", "cannot"}
+NEGATION_WINDOW = 3
+
+
+def normalize(text):
+    """Lowercase, turn punctuation/whitespace runs into one space, pad with spaces.
+
+    Padding makes every pattern match on whole words only.
+    """
+    return f" {_NON_WORD.sub(' ', text.lower()).strip()} "
+
+
+def _clauses(text):
+    """:func:`normalize` each clause of ``text``, joined by ``|`` (which no phrase contains)."""
+    return " | ".join(normalize(part) for part in _CLAUSE_BREAK.split(text))
+
+
+def negated(text, start, window=NEGATION_WINDOW):
+    """Whether the phrase at ``start`` of clause-split ``text`` follows a negator."""
+    before = text[max(0, start - 80):start].split()
+    if "|" in before:
+        before = before[len(before) - before[::-1].index("|"):]
+    before = before[-window:]
+    return any(word in NEGATORS for word in before) or "free of" in " ".join(before)
+
+
+class AhoCorasick:
+    """Multi-pattern string matcher: one pass over the text for all patterns."""
+
+    def __init__(self, patterns):
+        self.patterns = list(patterns)
+        goto = [{}]
+        output = [[]]
+        for index, pattern in enumerate(self.patterns):
+            state = 0
+            for char in pattern:
+                nxt = goto[state].get(char)
+                if nxt is None:
+                    nxt = len(goto)
+                    goto[state][char] = nxt
+                    goto.append({})
+                    output.append([])
+                state = nxt
+            output[state].append(index)
+
+        # Breadth-first failure links; outputs inherit their fallback's
+        fail = [0] * len(goto)
+        queue = deque(goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, nxt in goto[state].items():
+                queue.append(nxt)
+                f = fail[state]
+                while f and char not in goto[f]:
+                    f = fail[f]
+                fail[nxt] = goto[f].get(char, 0)
+                output[nxt] = output[nxt] + output[fail[nxt]]
+
+        self._goto = goto
+        self._fail = fail
+        self._output = output
+
+    def find_all(self, text):
+        """Yield ``(end, pattern_index)`` for every match; ``end`` is exclusive."""
+        goto, fail, output = self._goto, self._fail, self._output
+        state = 0
+        for i, char in enumerate(text):
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            for index in output[state]:
+                yield i + 1, index
+
+
+def _parse_requires(spec):
+    requires = {}
+    for part in filter(None, (p.strip() for p in str(spec).split(";"))):
+        flag, _, value = part.partition("=")
+        if flag not in ALL_FLAGS or value not in ("0", "1"):
+            raise ValueError(f"claims lexicon: bad requirement {part!r}")
+        requires[flag] = int(value)
+    return requires
+
+
+class ClaimDetector:
+    """Compiled claim lexicon; see the module docstring."""
+
+    def __init__(self, lexicon_df):
+        phrases = {}
+        for row in lexicon_df.itertuples(index=False):
+            requires = row.requires if isinstance(row.requires, str) else ""
+            phrases.setdefault(normalize(row.phrase), (row.phrase, row.claim, _parse_requires(requires)))
+        self._entries = list(phrases.values())
+        self._matcher = AhoCorasick(phrases)
+
+    def __len__(self):
+        return len(self._entries)
+
+    def detect(self, text, exclude=()):
+        """Claims found in ``text``, once per claim, in order of appearance.
+
+        Each is a dict with ``claim``, the matched ``phrase`` and
+        ``requires`` (empty for vague claims). Overlapping phrases for the
+        same claim ("all natural", "natural") are reported once, using the
+        earliest and then longest match. Occurrences of the names in
+        ``exclude`` (the product's own name, e.g. "Green Tea") are not
+        searched, and negated phrases ("not recyclable", "non-organic")
+        are skipped.
+        """
+        text = _clauses(text)
+        for name in exclude:
+            name = _clauses(name or "")
+            if name.strip(" |"):
+                # A separator no phrase contains, so no match spans the gap
+                text = text.replace(name, " | ")
+        patterns = self._matcher.patterns
+        matches = sorted(
+            (end - len(patterns[index]), -len(patterns[index]), index)
+            for end, index in self._matcher.find_all(text)
+        )
+        found = {}
+        for start, _, index in matches:
+            if negated(text, start):
+                continue
+            phrase, claim, requires = self._entries[index]
+            if claim not in found:
+                found[claim] = {"claim": claim, "phrase": phrase, "requires": requires}
+        return list(found.values())
+
+
+def load_detector(path):
+    return ClaimDetector(pd.read_csv(path, dtype=str))
+
+
+def check_claims(claims, row, min_score=VAGUE_CLAIM_MIN_SCORE):
+    """Cross-check detected ``claims`` against a product's ``summary_df`` row.
+
+    Adds a ``verdict`` and a ``reason`` to each claim:
+
+    * ``"contradicted"``: a specific claim whose flags disagree with our data,
+    * ``"supported"``: a specific claim our data backs up,
+    * ``"misleading"``: a vague claim on a product scoring below ``min_score``,
+    * ``"vague"``: a vague claim on a product that scores reasonably well.
+    """
+    score = float(row["eco_score"])
+    checked = []
+    for claim in claims:
+        requires = claim["requires"]
+        if requires:
+            wrong = [flag for flag, value in requires.items() if int(row[flag]) != value]
+            if wrong:
+                verdict = "contradicted"
+                reason = "our data: " + ", ".join(
+                    f"{flag.replace('_', ' ')} {'present' if int(row[flag]) else 'absent'}"
+                    for flag in wrong
+                )
+            else:
+                verdict, reason = "supported", "matches our product data"
+        elif score < min_score:
+            verdict = "misleading"
+            reason = f"vague claim on a product scoring {score:g}/100"
+        else:
+            verdict = "vague"
+            reason = f"not verifiable, though the product scores {score:g}/100"
+        checked.append({**claim, "verdict": verdict, "reason": reason})
+    return checked
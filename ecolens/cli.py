@@ -0,0 +1,310 @@
+"""Command line entry point: ``python -m ecolens ...``."""
+
+import argparse
+import json
+import sys
+import time
+
+import pandas as pd
+
+from .batch import DEFAULT_CHUNKSIZE, score_file
+from .ingest import UNKNOWN_MATERIAL_POLICIES
+
+
+def _load_profile(path):
+    if not path:
+        return None
+    from .profiles import load_profile
+
+    return load_profile(path)
+
+
+def _score(args):
+    materials_df = pd.read_csv(args.materials)
+    profile = _load_profile(args.profile)
+    start = time.perf_counter()
+    rows, rejected = score_file(
+        args.input,
+        args.output,
+        materials_df,
+        chunksize=args.chunksize,
+        fmt=args.format,
+        workers=args.workers,
+        quarantine_path=args.quarantine,
+        unknown_materials=args.unknown_materials,
+        profile=profile,
+    )
+    elapsed = time.perf_counter() - start
+    print(f"Scored {rows} products in {elapsed:.2f}s -> {args.output}", file=sys.stderr)
+    if rejected:
+        where = f" -> {args.quarantine}" if args.quarantine else ""
+        print(f"Rejected {rejected} invalid rows{where}", file=sys.stderr)
+
+
+def _ingest(args):
+    from .ingest import read_products
+
+    materials_df = pd.read_csv(args.materials)
+    _, _, report = read_products(
+        args.input,
+        list(materials_df["material"]),
+        chunksize=args.chunksize,
+        unknown_materials=args.unknown_materials,
+        quarantine_path=args.quarantine,
+    )
+    json.dump(report, sys.stdout, indent=2)
+    print()
+    if args.strict and report["rows_quarantined"]:
+        raise ValueError(f"{report['rows_quarantined']} rows failed validation")
+
+
+def _pairs(values, convert=str):
+    pairs = {}
+    for value in values:
+        key, sep, item = value.partition("=")
+        if not sep:
+            raise ValueError(f"expected KEY=VALUE, got {value!r}")
+        pairs[key.strip()] = convert(item.strip())
+    return pairs
+
+
+def _whatif(args):
+    from .ingest import read_products
+    from .simulate import Simulator
+
+    materials_df = pd.read_csv(args.materials)
+    products_df, _, _ = read_products(args.input, list(materials_df["material"]))
+    sim = Simulator(products_df, materials_df, _load_profile(args.profile))
+    names = args.product or None
+
+    if args.scenarios:
+        with open(args.scenarios, encoding="utf-8") as f:
+            scenarios = json.load(f)
+        start = time.perf_counter()
+        result = sim.bulk(scenarios, names, args.category)
+        elapsed = time.perf_counter() - start
+        delta = result["delta"]
+        table = pd.DataFrame({
+            "scenario": range(len(scenarios)),
+            "mean_delta": delta.mean(axis=1).round(2),
+            "min_delta": delta.min(axis=1),
+            "max_delta": delta.max(axis=1),
+            "moved_up": (result["rank_change"] > 0).sum(axis=1),
+            "moved_down": (result["rank_change"] < 0).sum(axis=1),
+        })
+        print(f"Scored {delta.size} scenario x product cells in {elapsed:.3f}s", file=sys.stderr)
+    else:
+        scenario = {
+            "swap": _pairs(args.swap),
+            "weight_delta_g": args.weight_delta,
+            "flags": _pairs(args.flag, int),
+        }
+        table = sim.apply(scenario, names, args.category)
+    print(table.to_string(index=False))
+
+
+def _explain(args):
+    from .compact import compact_summary
+    from .explain import explanation_markdown, score_breakdown
+    from .ingest import read_products
+    from .scoring import score_products, summarize
+
+    materials_df = pd.read_csv(args.materials)
+    profile = _load_profile(args.profile)
+    products_df, _, _ = read_products(args.input, list(materials_df["material"]))
+    scored = score_products(products_df, materials_df, profile)
+    catalogue = compact_summary(summarize(scored), score_breakdown(scored, materials_df, profile))
+    explanation = catalogue.explain(args.product, profile)
+    if explanation is None:
+        raise ValueError(f"unknown product: {args.product!r}")
+    if args.json:
+        json.dump(explanation, sys.stdout, indent=2, ensure_ascii=False)
+        print()
+    else:
+        print(explanation_markdown(explanation))
+
+
+def _build_assets(args):
+    from .assets import build_assets
+
+    manifest = build_assets(args.static_dir, log=lambda msg: print(msg, file=sys.stderr))
+    if not manifest:
+        raise RuntimeError("no assets could be built")
+
+
+def _memory(args):
+    from .compact import compact_summary, memory_report
+    from .explain import score_breakdown
+    from .ingest import read_products
+    from .scoring import score_products, summarize
+
+    materials_df = pd.read_csv(args.materials)
+    products_df, _, _ = read_products(args.input, list(materials_df["material"]))
+    scored = score_products(products_df, materials_df)
+    summary = summarize(scored)
+    catalogue = compact_summary(summary, score_breakdown(scored, materials_df))
+    json.dump(memory_report(summary, catalogue), sys.stdout, indent=2)
+    print()
+
+
+def _serve(args):
+    from .api import load_scoring_index, serve
+
+    materials_df = pd.read_csv(args.materials)
+    start = time.perf_counter()
+    index = load_scoring_index(args.input, materials_df, args.alternatives, _load_profile(args.profile))
+    print(f"Built indexes in {time.perf_counter() - start:.2f}s", file=sys.stderr)
+    serve(index, args.host, args.port, args.score_workers)
+
+
+def _publish(args):
+    import os
+
+    from .alternatives import load_index
+    from .compact import load_catalogue
+    from .shared import publish
+
+    def publish_once():
+        start = time.perf_counter()
+        profile = _load_profile(args.profile)
+        materials_df, catalogue, ingest_report, memory = load_catalogue(
+            args.input, args.materials, profile
+        )
+        alternatives = None
+        if args.alternatives:
+            alternatives = load_index(args.alternatives, materials_df, catalogue, profile)
+        manifest = publish(
+            catalogue, args.namespace, args.dir,
+            alternatives=alternatives,
+            materials=materials_df.to_dict("records"),
+            ingest_report=ingest_report,
+            memory_report=memory,
+        )
+        print(f"Published {args.namespace} v{manifest['version']}: {manifest['products']} products, "
+              f"{manifest['bytes'] / 1e6:.1f} MB in {time.perf_counter() - start:.2f}s",
+              file=sys.stderr)
+
+    def stamp():
+        paths = (args.input, args.materials, args.alternatives)
+        return tuple(os.stat(path).st_mtime_ns for path in paths if path)
+
+    seen = stamp()
+    publish_once()
+    while args.watch:
+        time.sleep(args.watch)
+        try:
+            current = stamp()
+        except FileNotFoundError:
+            continue  # mid-replace; try again next tick
+        if current != seen:
+            seen = current
+            publish_once()
+
+
+def _add_validation_args(parser):
+    parser.add_argument("--quarantine", metavar="CSV",
+                        help="Write rows that fail validation here, with a reject_reason")
+    parser.add_argument("--unknown-materials", choices=UNKNOWN_MATERIAL_POLICIES, default="keep",
+                        help="Keep rows naming materials missing from the materials file "
+                             "(scored as zero impact) or quarantine them")
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="ecolens", description="EcoLens scoring tools")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    score = sub.add_parser("score", help="Score a product.csv-shaped file")
+    score.add_argument("input", help="Product CSV to score")
+    score.add_argument("-o", "--output", required=True, help="Output .csv or .parquet file")
+    score.add_argument("-m", "--materials", default="material.csv", help="Material impact CSV")
+    score.add_argument("--chunksize", type=int, default=DEFAULT_CHUNKSIZE,
+                       help="Rows per chunk (bounds memory use)")
+    score.add_argument("--format", choices=["csv", "parquet"],
+                       help="Output format (default: from the output extension)")
+    score.add_argument("-j", "--workers", type=int, default=1,
+                       help="Score partitions across N processes (0 = all cores)")
+    score.add_argument("--profile", metavar="FILE",
+                       help="Scoring profile (.json/.yaml) with caps and weights")
+    _add_validation_args(score)
+    score.set_defaults(func=_score)
+
+    ingest = sub.add_parser("ingest", help="Validate a product file and print an ingest report")
+    ingest.add_argument("input", help="Product CSV to validate")
+    ingest.add_argument("-m", "--materials", default="material.csv", help="Material impact CSV")
+    ingest.add_argument("--chunksize", type=int, default=DEFAULT_CHUNKSIZE,
+                        help="Rows per chunk (bounds memory use)")
+    ingest.add_argument("--strict", action="store_true",
+                        help="Exit non-zero if any row was quarantined")
+    _add_validation_args(ingest)
+    ingest.set_defaults(func=_ingest)
+
+    whatif = sub.add_parser("whatif", help="Simulate material/weight/flag changes")
+    whatif.add_argument("input", help="Product CSV")
+    whatif.add_argument("-m", "--materials", default="material.csv", help="Material impact CSV")
+    whatif.add_argument("--product", action="append", default=[],
+                        help="Product name to change (repeatable)")
+    whatif.add_argument("--category", help="Change every product in this category")
+    whatif.add_argument("--swap", action="append", default=[], metavar="OLD=NEW",
+                        help="Replace a packaging material (repeatable); both must be in the material table")
+    whatif.add_argument("--weight-delta", type=float, default=0, metavar="GRAMS",
+                        help="Grams added to (or, if negative, removed from) the heaviest material")
+    whatif.add_argument("--flag", action="append", default=[], metavar="FLAG=0|1",
+                        help="Set a flag (repeatable)")
+    whatif.add_argument("--scenarios", metavar="JSON",
+                        help="List of scenario objects to evaluate in bulk instead")
+    whatif.add_argument("--profile", metavar="FILE", help="Scoring profile (.json/.yaml)")
+    whatif.set_defaults(func=_whatif)
+
+    explain = sub.add_parser("explain", help="Explain one product's eco score")
+    explain.add_argument("input", help="Product CSV")
+    explain.add_argument("product", help="Exact product name")
+    explain.add_argument("-m", "--materials", default="material.csv", help="Material impact CSV")
+    explain.add_argument("--profile", metavar="FILE", help="Scoring profile (.json/.yaml)")
+    explain.add_argument("--json", action="store_true", help="Print the structured breakdown")
+    explain.set_defaults(func=_explain)
+
+    memory = sub.add_parser("memory", help="Report catalogue bytes per product, legacy vs. compact")
+    memory.add_argument("input", help="Product CSV to load")
+    memory.add_argument("-m", "--materials", default="material.csv", help="Material impact CSV")
+    memory.set_defaults(func=_memory)
+
+    serve = sub.add_parser("serve", help="Serve scores over a JSON HTTP API")
+    serve.add_argument("input", help="Product CSV to serve")
+    serve.add_argument("-m", "--materials", default="material.csv", help="Material impact CSV")
+    serve.add_argument("--alternatives", metavar="CSV",
+                       help="Curated alternatives (alternatives.csv) to include in /alternatives")
+    serve.add_argument("--profile", metavar="FILE", help="Scoring profile (.json/.yaml)")
+    serve.add_argument("--host", default="127.0.0.1", help="Address to bind")
+    serve.add_argument("--port", type=int, default=8765, help="Port to listen on")
+    serve.add_argument("--score-workers", type=int, default=1,
+                       help="Processes for POST /score (bulk scoring)")
+    serve.set_defaults(func=_serve)
+
+    publish = sub.add_parser("publish", help="Publish the scored catalogue for app workers to share")
+    publish.add_argument("input", help="Product CSV")
+    publish.add_argument("-m", "--materials", default="material.csv", help="Material impact CSV")
+    publish.add_argument("--alternatives", default="alternatives.csv",
+                         help="Curated alternatives CSV to index into the snapshot ('' to skip)")
+    publish.add_argument("--namespace", default="ecolens",
+                         help="Name the workers attach to ($ECOLENS_SHARED)")
+    publish.add_argument("--dir", help="Snapshot directory (default: $ECOLENS_SHARED_DIR or /dev/shm)")
+    publish.add_argument("--profile", metavar="FILE", help="Scoring profile (.json/.yaml)")
+    publish.add_argument("--watch", type=float, default=0, metavar="SECONDS",
+                         help="Keep running and republish when the input files change")
+    publish.set_defaults(func=_publish)
+
+    build = sub.add_parser("build-assets", help="Vendor Home page images as resized WebP files")
+    build.add_argument("--static-dir", default="static", help="The app's static/ folder")
+    build.set_defaults(func=_build_assets)
+
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    try:
+        args.func(args)
+    except (OSError, RuntimeError, ValueError) as exc:
+        print(f"ecolens: error: {exc}", file=sys.stderr)
+        return 1
+    return 0
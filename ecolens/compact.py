@@ -0,0 +1,340 @@
+"""Compact in-memory representation of the scored catalogue.
+
+``summarize`` returns a plain DataFrame: object names/brands/categories,
+float64 metrics and nine int64 0/1 flag columns, i.e. well over 100 bytes
+per product before the strings themselves. :class:`CompactCatalogue` keeps
+the same information as
+
+* ``names``: interned name strings, in pandas' default string storage
+  (Arrow-backed buffers when pyarrow is available, the interned objects
+  themselves otherwise),
+* ``brand_codes`` / ``category_codes``: small-int codes into ``brands`` /
+  ``categories``,
+* ``metrics``: one ``(N, len(METRIC_COLUMNS))`` float32 matrix,
+* ``flag_mask``: one ``uint16`` bit mask per product (bit ``i`` is
+  ``ALL_FLAGS[i]``).
+
+The app's readers work on those arrays directly: :meth:`CompactCatalogue.select`
+and :meth:`~CompactCatalogue.rows` build ``summary_df``-shaped rows only for
+the products asked for, and greener alternatives come from a per-category
+ranking of row numbers. :meth:`CompactCatalogue.frame` still builds the
+full ``SUMMARY_COLUMNS`` DataFrame for batch consumers, but it is built per
+call and never kept on the catalogue, so a long-running process holds only
+the compact arrays.
+"""
+
+import sys
+
+import numpy as np
+import pandas as pd
+
+from .scoring import ALL_FLAGS, IMPACT_COLUMNS, SUMMARY_COLUMNS
+
+METRIC_COLUMNS = [
+    *IMPACT_COLUMNS,
+    "packaging_score",
+    "ingredient_score",
+    "bonus_score",
+    "eco_score",
+]
+METRIC_DTYPE = np.float32
+FLAG_MASK_DTYPE = np.uint16
+FLAG_BITS = {flag: 1 << i for i, flag in enumerate(ALL_FLAGS)}
+
+
+def pack_flags(summary_df):
+    """Bit-pack the ``ALL_FLAGS`` columns of ``summary_df`` into one mask per row."""
+    mask = np.zeros(len(summary_df), dtype=FLAG_MASK_DTYPE)
+    for flag, bit in FLAG_BITS.items():
+        if flag in summary_df.columns:
+            set_ = summary_df[flag].fillna(0).to_numpy() != 0
+            mask[set_] |= FLAG_MASK_DTYPE(bit)
+    return mask
+
+
+def widen(values):
+    """float32 -> float64, rounded to float32's 7 significant digits.
+
+    Keeps values such as 0.1877 or 57.4 printing as they did before instead
+    of as 0.18770000338554382.
+    """
+    wide = np.asarray(values, dtype=np.float64)
+    with np.errstate(divide="ignore"):
+        digits = 7 - np.ceil(np.log10(np.abs(wide)))
+    scale = 10.0 ** np.where(np.isfinite(digits), digits, 0)
+    return np.round(wide * scale) / scale
+
+
+def _codes(series):
+    categorical = pd.Categorical(series)
+    return categorical.codes, categorical.categories
+
+
+class CompactCatalogue:
+    """Column arrays for the scored catalogue; see the module docstring."""
+
+    def __init__(self, names, brand_codes, brands, category_codes, categories,
+                 metrics, flag_mask, breakdown=None, ranking=None):
+        self.names = names
+        self.brand_codes = brand_codes
+        self.brands = brands
+        self.category_codes = category_codes
+        self.categories = categories
+        self.metrics = metrics
+        self.flag_mask = flag_mask
+        self.breakdown = breakdown
+        # (row numbers by category, best eco score first; start of each
+        # category in them), built on first use unless passed in
+        self._ranking = ranking
+
+    @classmethod
+    def from_frame(cls, summary_df, breakdown=None):
+        """Build a catalogue from a ``summarize``-shaped DataFrame.
+
+        ``breakdown`` is an optional :class:`ecolens.explain.Breakdown` for
+        the same rows.
+        """
+        names = pd.Series([sys.intern(str(name)) for name in summary_df["name"]]).array
+        brand_codes, brands = _codes(summary_df["brand"])
+        category_codes, categories = _codes(summary_df["category"])
+        metrics = np.ascontiguousarray(summary_df[METRIC_COLUMNS].to_numpy(dtype=METRIC_DTYPE))
+        return cls(names, brand_codes, brands, category_codes, categories,
+                   metrics, pack_flags(summary_df), breakdown)
+
+    def __len__(self):
+        return len(self.names)
+
+    # -----------------------------
+    # Column access
+    # -----------------------------
+    def metric(self, column):
+        return self.metrics[:, METRIC_COLUMNS.index(column)]
+
+    def has_flag(self, flag):
+        """Boolean array: which products carry ``flag``."""
+        return (self.flag_mask & FLAG_MASK_DTYPE(FLAG_BITS[flag])) != 0
+
+    def name_series(self):
+        """Product names as a Series over the shared name storage (no copy)."""
+        return pd.Series(self.names, copy=False)
+
+    def category_list(self):
+        """Sorted categories that have at least one product."""
+        codes = np.unique(self.category_codes)
+        return sorted(str(c) for c in self.categories[codes[codes >= 0]])
+
+    def category_names(self, category):
+        """Distinct product names in ``category``."""
+        try:
+            code = self.categories.get_loc(category)
+        except KeyError:
+            return []
+        return self.name_series()[self.category_codes == code].unique().tolist()
+
+    def category_means(self, column="eco_score"):
+        """Per-category mean of metric ``column``, indexed by category."""
+        codes = self.category_codes
+        known = codes >= 0
+        n = len(self.categories)
+        counts = np.bincount(codes[known], minlength=n)
+        sums = np.bincount(codes[known], weights=self.metric(column)[known], minlength=n)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return pd.Series(widen(sums / counts), index=self.categories)
+
+    def rescored(self, profile):
+        """Copy of the catalogue with ``packaging_score``/``eco_score`` for ``profile``.
+
+        Only the metric matrix is copied; names, codes and flags are shared.
+        Scores are recomputed from the float32 impacts, so a handful of
+        products sitting exactly on a rounding boundary can differ by 0.1
+        from a full re-run; the default profile returns ``self`` unchanged.
+        """
+        from .profiles import rescore
+
+        if profile.is_default:
+            return self
+
+        metrics = self.metrics.copy()
+        impacts = widen(metrics[:, :len(IMPACT_COLUMNS)])
+        packaging, eco = rescore(
+            impacts,
+            self.metric("ingredient_score"),
+            self.metric("bonus_score"),
+            profile,
+        )
+        metrics[:, METRIC_COLUMNS.index("packaging_score")] = packaging
+        metrics[:, METRIC_COLUMNS.index("eco_score")] = eco
+        breakdown = None if self.breakdown is None else self.breakdown.rescored(impacts, profile)
+        return CompactCatalogue(self.names, self.brand_codes, self.brands, self.category_codes,
+                                self.categories, metrics, self.flag_mask, breakdown)
+
+    def explain(self, name, profile=None):
+        """Structured score explanation for product ``name`` (needs ``breakdown``)."""
+        from .explain import explain
+
+        i = self.position(name)
+        if i is None or self.breakdown is None:
+            return None
+        return explain(self.rows([i]).iloc[0], self.breakdown, i, profile)
+
+    def position(self, name):
+        """Row number of product ``name`` (first match), or ``None``."""
+        hits = np.flatnonzero((self.name_series() == name).to_numpy(dtype=bool, na_value=False))
+        return int(hits[0]) if len(hits) else None
+
+    # -----------------------------
+    # Ranking
+    # -----------------------------
+    def ranking(self):
+        """``(order, starts)``: row numbers sorted by category, best eco score
+        first, and where each category code's run starts in ``order``
+        (``len(categories) + 1`` entries)."""
+        if self._ranking is None:
+            eco = self.metric("eco_score")
+            order = np.lexsort((-eco, self.category_codes)).astype(np.int32)
+            starts = np.searchsorted(self.category_codes[order], np.arange(len(self.categories) + 1))
+            self._ranking = (order, starts.astype(np.int64))
+        return self._ranking
+
+    def greener(self, name, k=5):
+        """Top ``k`` products in ``name``'s category that score higher.
+
+        Same records as :func:`ecolens.lookup.get_greener_alternatives`.
+        """
+        i = self.position(name)
+        if i is None or self.category_codes[i] < 0:
+            return []
+        order, starts = self.ranking()
+        code = self.category_codes[i]
+        ranked = order[starts[code]:starts[code + 1]]
+        eco = self.metric("eco_score")
+        better = ranked[eco[ranked] > eco[i]]
+        names = self.names[better]
+        better = better[np.asarray(names != name, dtype=bool)][:k]
+        current = float(widen(eco[i]))
+        results = []
+        for j, score in zip(better, widen(eco[better])):
+            diff = score - current
+            results.append({
+                "name": self.names[j],
+                "eco_score": score,
+                "improvement": f"{diff:.0f} points better eco score",
+                "score_diff": diff,
+            })
+        return results
+
+    # -----------------------------
+    # Adapter
+    # -----------------------------
+    def rows(self, positions=None):
+        """``summary_df``-compatible DataFrame of the rows at ``positions``.
+
+        Brand/category are categoricals over the shared codes, metrics are
+        widened back to float64 (see :func:`widen`) so row access and
+        formatting behave as before, and flags are unpacked to one byte
+        each. Only the requested rows are converted; the index holds their
+        row numbers.
+        """
+        if positions is None:
+            index = None
+            def take(values):
+                return values
+        else:
+            index = np.asarray(positions, dtype=np.intp)
+            def take(values):
+                return values[index]
+        columns = {
+            "name": pd.Series(take(self.names), index=index, copy=False),
+            "brand": pd.Categorical.from_codes(take(self.brand_codes), self.brands),
+            "category": pd.Categorical.from_codes(take(self.category_codes), self.categories),
+        }
+        metrics = widen(take(self.metrics))
+        for k, column in enumerate(METRIC_COLUMNS):
+            columns[column] = metrics[:, k]
+        flag_mask = take(self.flag_mask)
+        for flag in ALL_FLAGS:
+            columns[flag] = ((flag_mask & FLAG_MASK_DTYPE(FLAG_BITS[flag])) != 0).astype(np.uint8)
+        return pd.DataFrame(columns, index=index, copy=False)[SUMMARY_COLUMNS]
+
+    def select(self, names):
+        """Rows (see :meth:`rows`) of every product named in ``names``."""
+        mask = self.name_series().isin(list(names)).to_numpy(dtype=bool)
+        return self.rows(np.flatnonzero(mask))
+
+    def frame(self):
+        """The whole catalogue as a ``summary_df``-compatible DataFrame.
+
+        Built on every call and not kept: it costs about as much memory as
+        the plain ``summary_df``, so long-lived readers should use
+        :meth:`select`, :meth:`greener` and the arrays instead.
+        """
+        return self.rows()
+
+    def nbytes(self):
+        """Deep size of the compact arrays (strings included)."""
+        strings = sum(
+            int(pd.Series(values, copy=False).memory_usage(deep=True, index=False))
+            for values in (self.names, self.brands, self.categories)
+        )
+        numeric = (self.brand_codes, self.category_codes, self.metrics, self.flag_mask)
+        breakdown = self.breakdown.nbytes() if self.breakdown is not None else 0
+        return strings + sum(a.nbytes for a in numeric) + breakdown
+
+
+def compact_summary(summary_df, breakdown=None):
+    return CompactCatalogue.from_frame(summary_df, breakdown)
+
+
+def load_catalogue(product_path, material_path, profile=None):
+    """Ingest, score and compact a catalogue from its CSV files.
+
+    Returns ``(materials_df, catalogue, ingest_report, memory_report)``;
+    the catalogue carries its score breakdown.
+    """
+    from .explain import score_breakdown
+    from .ingest import read_products
+    from .scoring import score_products, summarize
+
+    materials_df = pd.read_csv(material_path)
+    products_df, _, ingest_report = read_products(product_path, list(materials_df["material"]))
+    scored = score_products(products_df, materials_df, profile)
+    summary = summarize(scored)
+    catalogue = compact_summary(summary, score_breakdown(scored, materials_df, profile))
+    return materials_df, catalogue, ingest_report, memory_report(summary, catalogue)
+
+
+def legacy_frame(summary_df):
+    """``summary_df`` with the original dtypes: object strings, float64, int64 flags."""
+    legacy = summary_df[SUMMARY_COLUMNS].astype({c: object for c in ("name", "brand", "category")})
+    legacy[METRIC_COLUMNS] = legacy[METRIC_COLUMNS].astype(np.float64)
+    legacy[ALL_FLAGS] = legacy[ALL_FLAGS].fillna(0).astype(np.int64)
+    return legacy
+
+
+def memory_report(summary_df, catalogue=None):
+    """Bytes per product of the catalogue in each representation.
+
+    ``legacy`` is ``summary_df`` with object/float64/int64 columns (what the
+    app used to cache), ``summary_df`` the frame as passed in, ``compact``
+    :meth:`CompactCatalogue.nbytes` and ``compact_with_adapter`` that plus
+    the widened metric and unpacked flag columns :meth:`CompactCatalogue.frame`
+    adds while it is alive. ``breakdown`` is the part of ``compact`` taken by
+    the score explanation arrays.
+    """
+    catalogue = catalogue if catalogue is not None else compact_summary(summary_df)
+    frame = catalogue.frame()
+    compact = catalogue.nbytes()
+    adapter = int(frame[METRIC_COLUMNS + ALL_FLAGS].memory_usage(index=False).sum())
+    sizes = {
+        "legacy": int(legacy_frame(summary_df).memory_usage(deep=True).sum()),
+        "summary_df": int(summary_df.memory_usage(deep=True).sum()),
+        "compact": compact,
+        "compact_with_adapter": compact + adapter,
+        "breakdown": catalogue.breakdown.nbytes() if catalogue.breakdown is not None else 0,
+    }
+    n = max(len(summary_df), 1)
+    return {
+        "products": len(summary_df),
+        "bytes": sizes,
+        "bytes_per_product": {k: round(v / n, 1) for k, v in sizes.items()},
+    }
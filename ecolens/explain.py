@@ -0,0 +1,194 @@
+"""Per-product score breakdowns: why a product got its eco score.
+
+:func:`score_breakdown` takes the output of
+:func:`ecolens.scoring.score_products` and keeps, per product,
+
+* ``material_codes``: the packaging material in each slot (``int16``),
+* ``slot_shares``: each slot's percentage of the product's carbon, water,
+  energy and waste (``uint8``, ``(N, MATERIAL_SLOTS, 4)``),
+* ``component_points``: the packaging-score points each impact earned
+  (``float32``, ``(N, 4)``),
+* ``flag_points``: the signed points each flag moved the ingredient or bonus
+  score by (``int8``, ``(N, len(ALL_FLAGS))``),
+
+about 40 bytes per product. :func:`explain` turns one row plus the scores
+into a plain dict, :func:`explanation_markdown` into a fixed-wording
+explanation for the UI and :func:`prompt_context` into compact JSON for the
+chatbot prompt.
+"""
+
+import json
+
+import numpy as np
+
+from .profiles import DEFAULT_PROFILE
+from .scoring import (
+    ALL_FLAGS,
+    BEAUTY_PENALTIES,
+    BONUS_POINTS,
+    FOOD_PENALTIES,
+    IMPACT_COLUMNS,
+    IMPACT_KEYS,
+    flag_matrix,
+    is_beauty,
+    material_slots,
+    material_table,
+    normalize_impacts,
+    slot_impacts,
+)
+
+IMPACT_UNITS = {"carbon": "kg CO₂e", "water": "L", "energy": "MJ", "waste": ""}
+FLAG_LABELS = {flag: flag.replace("_", " ") for flag in ALL_FLAGS}
+
+
+def component_points(impacts, profile=None):
+    """Packaging-score points per impact from an ``(N, 4)`` impact array."""
+    profile = profile or DEFAULT_PROFILE
+    norm = normalize_impacts(impacts, profile.caps)
+    return ((1 - norm) * np.asarray(profile.packaging_weights) * 100).astype(np.float32)
+
+
+class Breakdown:
+    """Compact per-product contribution arrays; see the module docstring."""
+
+    def __init__(self, vocabulary, material_codes, slot_shares, component_points, flag_points):
+        self.vocabulary = tuple(vocabulary)
+        self.material_codes = material_codes
+        self.slot_shares = slot_shares
+        self.component_points = component_points
+        self.flag_points = flag_points
+
+    def rescored(self, impacts, profile):
+        """Copy with ``component_points`` for ``profile`` (other arrays shared)."""
+        return Breakdown(self.vocabulary, self.material_codes, self.slot_shares,
+                         component_points(impacts, profile), self.flag_points)
+
+    def nbytes(self):
+        return sum(a.nbytes for a in (self.material_codes, self.slot_shares,
+                                      self.component_points, self.flag_points))
+
+
+def score_breakdown(scored_df, materials_df, profile=None):
+    """Contribution breakdown for every row of ``score_products`` output."""
+    vocabulary, table = material_table(materials_df)
+    codes, weights = material_slots(scored_df, vocabulary)
+
+    slots, valid = slot_impacts(codes, weights, table)
+    totals = slots.sum(axis=1, keepdims=True)
+    shares = np.divide(slots * 100, totals, out=np.zeros_like(slots), where=totals > 0)
+
+    flags = flag_matrix(scored_df)
+    beauty = is_beauty(scored_df)[:, None]
+    penalties = np.where(
+        beauty,
+        [BEAUTY_PENALTIES.get(f, 0) for f in ALL_FLAGS],
+        [FOOD_PENALTIES.get(f, 0) for f in ALL_FLAGS],
+    )
+    bonus = np.array([BONUS_POINTS.get(f, 0) for f in ALL_FLAGS])
+    flag_points = flags * (bonus - penalties)
+
+    # Slots with a weight but no known material (e.g. PP) keep code -2
+    listed = ~np.isnan(weights) & (weights > 0)
+    material_codes = np.where(valid, codes, np.where(listed, -2, -1)).astype(np.int16)
+
+    return Breakdown(
+        vocabulary,
+        material_codes,
+        np.rint(shares).astype(np.uint8),
+        component_points(scored_df[IMPACT_COLUMNS].to_numpy(), profile),
+        flag_points.astype(np.int8),
+    )
+
+
+def explain(row, breakdown, i, profile=None):
+    """Structured explanation of product ``i``.
+
+    ``row`` is the product's ``summary_df`` row (anything indexable by
+    column name), ``breakdown`` the catalogue's :class:`Breakdown`.
+    """
+    profile = profile or DEFAULT_PROFILE
+    w_packaging, w_ingredient, w_bonus = profile.eco_weights
+    parts = [
+        ("packaging", float(row["packaging_score"]), w_packaging),
+        ("ingredients", float(row["ingredient_score"]), w_ingredient),
+        ("bonus", float(row["bonus_score"]), w_bonus),
+    ]
+    impact_values = [row["total_carbon_kg"], row["total_water_L"],
+                     row["total_energy_MJ"], row["total_waste_score"]]
+
+    materials, unlisted = [], 0
+    for j, code in enumerate(breakdown.material_codes[i]):
+        if code >= 0:
+            materials.append({
+                "material": breakdown.vocabulary[code],
+                "share_pct": dict(zip(IMPACT_KEYS, breakdown.slot_shares[i, j].tolist())),
+            })
+        elif code == -2:
+            unlisted += 1
+
+    return {
+        "name": row["name"],
+        "category": row["category"],
+        "eco_score": float(row["eco_score"]),
+        "profile": profile.key,
+        "parts": [
+            {"part": name, "score": score, "weight": weight, "points": round(score * weight, 1)}
+            for name, score, weight in parts
+        ],
+        "packaging": [
+            {
+                "impact": key,
+                "value": round(float(value), 4),
+                "unit": IMPACT_UNITS[key],
+                "cap": cap,
+                "weight": weight,
+                "points": round(float(points), 1),
+                "max_points": round(weight * 100, 1),
+            }
+            for key, value, cap, weight, points in zip(
+                IMPACT_KEYS, impact_values, profile.caps, profile.packaging_weights,
+                breakdown.component_points[i]
+            )
+        ],
+        "materials": materials,
+        "unlisted_materials": unlisted,
+        "flags": [
+            {"flag": flag, "points": int(points)}
+            for flag, points in zip(ALL_FLAGS, breakdown.flag_points[i]) if points
+        ],
+    }
+
+
+def explanation_markdown(explanation):
+    """Deterministic Markdown explanation of an :func:`explain` result."""
+    parts = " + ".join(
+        f"{p['part']} {p['score']:g} × {p['weight']:g}" for p in explanation["parts"]
+    )
+    lines = [f"**Eco score {explanation['eco_score']:g}** = {parts}", ""]
+
+    lines.append("**Packaging**")
+    for c in explanation["packaging"]:
+        unit = f" {c['unit']}" if c["unit"] else ""
+        lines.append(
+            f"- {c['impact'].capitalize()}: {c['value']:g}{unit} (cap {c['cap']:g}) "
+            f"→ {c['points']:g} of {c['max_points']:g} points"
+        )
+    for m in explanation["materials"]:
+        shares = ", ".join(f"{v}% of {k}" for k, v in m["share_pct"].items() if v)
+        lines.append(f"- {m['material']}: {shares or 'no measurable impact'}")
+    if explanation["unlisted_materials"]:
+        lines.append(f"- {explanation['unlisted_materials']} material(s) not in our "
+                     "material table, counted as zero impact")
+
+    lines += ["", "**Ingredients and bonuses**"]
+    if explanation["flags"]:
+        for f in explanation["flags"]:
+            lines.append(f"- {FLAG_LABELS[f['flag']].capitalize()}: {f['points']:+d} points")
+    else:
+        lines.append("- No ingredient penalties or bonuses")
+    return "\n".join(lines)
+
+
+def prompt_context(explanation):
+    """Compact JSON of the breakdown for a model prompt."""
+    return json.dumps(explanation, ensure_ascii=False, separators=(",", ":"))
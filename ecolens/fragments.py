@@ -0,0 +1,135 @@
+"""Pre-rendered HTML fragments for the static parts of the app.
+
+Templates live in ``ecolens/templates`` and are read and rendered once per
+process. Full-page fragments (the Home feature cards, the global stylesheet)
+are published into the app's ``static/`` folder under a content-hashed file name and embedded as an
+iframe ``src``: the browser fetches and caches the document once, and each
+rerun only sends the URL over the websocket instead of the whole HTML.
+"""
+
+import functools
+import hashlib
+import html
+import os
+from string import Template
+
+from . import assets
+
+TEMPLATE_DIR = os.path.join(os.path.dirname(__file__), "templates")
+
+# Relative URL prefix Streamlit uses for files in the app's static/ folder
+STATIC_URL = "app/static"
+
+_GRID = '<div style="display:grid; grid-template-columns:repeat(3, minmax(0, 1fr)); gap:1rem;">'
+
+
+@functools.lru_cache(maxsize=None)
+def template(name):
+    with open(os.path.join(TEMPLATE_DIR, name), encoding="utf-8") as f:
+        return Template(f.read())
+
+
+def render(name, /, **values):
+    return template(name).substitute(values)
+
+
+def publish(name, content, static_dir):
+    """Write ``content`` to ``static_dir/fragments`` and return its URL.
+
+    The file name carries a hash of the content, so the URL changes whenever
+    the fragment does and a cached copy is never stale. Writing is skipped
+    when the file already exists.
+    """
+    digest = hashlib.sha1(content.encode("utf-8")).hexdigest()[:12]
+    stem, ext = os.path.splitext(name)
+    filename = f"{stem}-{digest}{ext}"
+
+    out_dir = os.path.join(static_dir, "fragments")
+    path = os.path.join(out_dir, filename)
+    if not os.path.exists(path):
+        os.makedirs(out_dir, exist_ok=True)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write(content)
+        os.replace(tmp, path)
+
+    return f"{STATIC_URL}/fragments/{filename}"
+
+
+# -------------------------
+# THEME
+# -------------------------
+@functools.lru_cache(maxsize=None)
+def theme_css_url(static_dir):
+    return publish("theme.css", render("theme.css"), static_dir)
+
+
+# -------------------------
+# HOME
+# -------------------------
+@functools.lru_cache(maxsize=None)
+def home_intro():
+    return render("home_intro.html")
+
+
+# Image fragments are cached per manifest version, so assets built while
+# the app runs are picked up on the next rerun
+def home_hero_img(static_dir):
+    return _home_hero_img(static_dir, assets.manifest_mtime(static_dir))
+
+
+@functools.lru_cache(maxsize=16)
+def _home_hero_img(static_dir, manifest_mtime):
+    return assets.img_attrs(
+        "hero", static_dir, f"{STATIC_URL}/img",
+        sizes="(max-width: 640px) 100vw, 40vw", lazy=False
+    )
+
+
+def home_features_url(static_dir):
+    return _home_features_url(static_dir, assets.manifest_mtime(static_dir))
+
+
+@functools.lru_cache(maxsize=16)
+def _home_features_url(static_dir, manifest_mtime):
+    # The document is served from static/fragments/, so images are ../img
+    images = {
+        f"{key}_img": assets.img_attrs(key, static_dir, "../img", sizes="540px")
+        for key in ("greenscore", "chatbot", "impact", "next_steps")
+    }
+    return publish("home_features.html", render("home_features.html", **images), static_dir)
+
+
+# -------------------------
+# NEXT STEPS
+# -------------------------
+def _alternative_blurb(alt):
+    if alt["improvement"] is None:
+        return f"Eco score {alt['eco_score']:.1f}"
+    return f"Eco score {alt['eco_score']:.1f} · {alt['improvement']:+.1f} vs. category average"
+
+
+def alternative_cards(alternatives):
+    """Three-column grid of cards for a category's alternatives.
+
+    ``alternatives`` is one category's tuple from
+    :func:`ecolens.alternatives.build_index`. The HTML is cached per distinct
+    set of cards.
+    """
+    return _alternative_cards(tuple(
+        (alt["name"], _alternative_blurb(alt)) for alt in alternatives
+    ))
+
+
+@functools.lru_cache(maxsize=256)
+def _alternative_cards(cards):
+    body = "\n".join(
+        render("next_steps_card.html", name=html.escape(name), blurb=html.escape(blurb))
+        for name, blurb in cards
+    )
+    return f"{_GRID}\n{body}\n</div>"
+
+
+@functools.lru_cache(maxsize=None)
+def next_steps_tips():
+    return render("next_steps_tips.html")
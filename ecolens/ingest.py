@@ -0,0 +1,157 @@
+"""Schema-validated, streaming catalogue ingestion.
+
+Product files are read in chunks as raw strings and checked against an
+explicit schema before anything is typed:
+
+* ``name`` and ``category`` must be present,
+* ``weight_*_g`` must be non-negative numbers, and a listed material needs
+  a weight,
+* flags must be 0/1 (blank means 0),
+* materials are checked against the material table's vocabulary.
+
+Valid rows are converted to compact dtypes (``int8`` flags, ``float32``
+weights, categorical brand/category/materials); invalid rows are set aside
+with a ``reject_reason`` column so they can be written to a quarantine file.
+"""
+
+from collections import Counter
+
+import pandas as pd
+from pandas.api.types import union_categoricals
+
+from .scoring import ALL_FLAGS, MATERIAL_SLOTS
+
+FLAG_DTYPE = "int8"
+WEIGHT_DTYPE = "float32"
+REQUIRED_COLUMNS = ["name", "category"]
+UNKNOWN_MATERIAL_POLICIES = ("keep", "quarantine")
+
+DEFAULT_CHUNKSIZE = 100_000
+
+
+def read_raw_chunks(path, chunksize=DEFAULT_CHUNKSIZE):
+    """Iterate over ``path`` as all-string chunks (no dtype inference)."""
+    return pd.read_csv(path, chunksize=chunksize, dtype=str, skip_blank_lines=True)
+
+
+def _strip(series):
+    series = series.str.strip()
+    return series.mask(series == "")
+
+
+def validate_chunk(raw, vocabulary, unknown_materials="keep"):
+    """Validate one raw chunk.
+
+    Returns ``(clean, rejected, unknown)``: the typed valid rows, the
+    invalid rows (original strings plus ``reject_reason``) and a
+    ``Counter`` of materials missing from ``vocabulary``. With
+    ``unknown_materials="keep"`` rows with unknown materials are accepted
+    and the material is dropped from the slot (scoring ignores it either
+    way); with ``"quarantine"`` the row is rejected.
+    """
+    if unknown_materials not in UNKNOWN_MATERIAL_POLICIES:
+        raise ValueError(f"unknown_materials must be one of {UNKNOWN_MATERIAL_POLICIES}")
+    missing = [c for c in REQUIRED_COLUMNS if c not in raw.columns]
+    if missing:
+        raise ValueError(f"product file is missing required columns: {', '.join(missing)}")
+
+    reasons = pd.Series("", index=raw.index, dtype=object)
+
+    def reject(mask, reason):
+        reasons[mask & (reasons == "")] = reason
+
+    clean = pd.DataFrame(index=raw.index)
+    clean["name"] = _strip(raw["name"])
+    clean["brand"] = _strip(raw["brand"]) if "brand" in raw.columns else None
+    clean["category"] = _strip(raw["category"])
+    for col in REQUIRED_COLUMNS:
+        reject(clean[col].isna(), f"missing {col}")
+
+    unknown = Counter()
+    known = set(vocabulary)
+    for j in range(1, MATERIAL_SLOTS + 1):
+        mat_col, wt_col = f"material_{j}", f"weight_{j}_g"
+        if mat_col not in raw.columns and wt_col not in raw.columns:
+            continue
+        mat = _strip(raw[mat_col]) if mat_col in raw.columns else pd.Series(None, index=raw.index, dtype=object)
+        wt_raw = _strip(raw[wt_col]) if wt_col in raw.columns else pd.Series(None, index=raw.index, dtype=object)
+        wt = pd.to_numeric(wt_raw, errors="coerce")
+
+        reject(wt_raw.notna() & (wt.isna() | (wt < 0)), f"invalid {wt_col}")
+        reject(mat.notna() & wt_raw.isna(), f"{mat_col} without weight")
+
+        is_unknown = mat.notna() & ~mat.isin(known)
+        if is_unknown.any():
+            unknown.update(mat[is_unknown & (reasons == "")])
+            if unknown_materials == "quarantine":
+                reject(is_unknown, f"unknown material in {mat_col}")
+
+        clean[mat_col] = pd.Categorical(mat.where(~is_unknown), categories=vocabulary)
+        clean[wt_col] = wt.astype(WEIGHT_DTYPE)
+
+    for flag in ALL_FLAGS:
+        if flag not in raw.columns:
+            clean[flag] = 0
+            continue
+        # Blank (or whitespace-only) means 0
+        flag_raw = _strip(raw[flag])
+        value = pd.to_numeric(flag_raw, errors="coerce")
+        reject(flag_raw.notna() & ~value.isin([0, 1]), f"invalid {flag}")
+        clean[flag] = value.where(value.isin([0, 1]), 0)
+
+    ok = reasons == ""
+    clean = clean[ok].copy()
+    clean[ALL_FLAGS] = clean[ALL_FLAGS].astype(FLAG_DTYPE)
+    clean["brand"] = clean["brand"].astype("category")
+    clean["category"] = clean["category"].astype("category")
+
+    rejected = raw[~ok].assign(reject_reason=reasons[~ok])
+    return clean, rejected, unknown
+
+
+def _concat(chunks):
+    """Concatenate clean chunks, unifying the per-chunk categories."""
+    for col in ("brand", "category"):
+        categories = union_categoricals([c[col] for c in chunks]).categories
+        for c in chunks:
+            c[col] = c[col].cat.set_categories(categories)
+    return pd.concat(chunks, ignore_index=True)
+
+
+def read_products(path, vocabulary, chunksize=DEFAULT_CHUNKSIZE,
+                  unknown_materials="keep", quarantine_path=None):
+    """Ingest a whole product file.
+
+    Returns ``(products_df, rejected_df, report)``. ``report`` counts rows
+    read/accepted/quarantined, reject reasons and unknown materials, plus
+    the deep memory size of the result. When ``quarantine_path`` is given
+    the rejected rows are also written there as CSV.
+    """
+    clean_chunks, rejected_chunks = [], []
+    unknown = Counter()
+    for raw in read_raw_chunks(path, chunksize):
+        clean, rejected, chunk_unknown = validate_chunk(raw, vocabulary, unknown_materials)
+        clean_chunks.append(clean)
+        if len(rejected):
+            rejected_chunks.append(rejected)
+        unknown.update(chunk_unknown)
+
+    if not clean_chunks:
+        empty = pd.DataFrame(columns=REQUIRED_COLUMNS, dtype=str)
+        clean_chunks.append(validate_chunk(empty, vocabulary)[0])
+    products_df = _concat(clean_chunks)
+    rejected_df = (pd.concat(rejected_chunks, ignore_index=True) if rejected_chunks
+                   else pd.DataFrame(columns=["reject_reason"]))
+
+    if quarantine_path is not None:
+        rejected_df.to_csv(quarantine_path, index=False)
+
+    report = {
+        "rows_read": len(products_df) + len(rejected_df),
+        "rows_accepted": len(products_df),
+        "rows_quarantined": len(rejected_df),
+        "reject_reasons": dict(Counter(rejected_df["reject_reason"])),
+        "unknown_materials": dict(unknown),
+        "memory_bytes": int(products_df.memory_usage(deep=True).sum()),
+    }
+    return products_df, rejected_df, report
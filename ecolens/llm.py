@@ -0,0 +1,95 @@
+"""OpenAI calls used by the scan flow, chat panels and dashboard.
+
+Every function takes the client explicitly; ``openai`` itself is only
+imported by :func:`make_client`, so importing this module is cheap.
+"""
+
+import base64
+import io
+
+from . import tracing
+
+VISION_MODEL = "gpt-4.1-mini"
+CHAT_MODEL = "gpt-4o-mini"
+
+
+def make_client(api_key):
+    from openai import OpenAI
+
+    return OpenAI(api_key=api_key)
+
+
+def image_to_base64(image):
+    buffer = io.BytesIO()
+    image.save(buffer, format="PNG")
+    return base64.b64encode(buffer.getvalue()).decode()
+
+
+@tracing.traced("model.ocr_image")
+def ocr_image(client, image):
+    img_b64 = image_to_base64(image)
+
+    response = client.responses.create(
+        model=VISION_MODEL,
+        input=[{
+            "role": "user",
+            "content": [
+                {
+                    "type": "input_text",
+                    "text": "Extract ALL visible text from this product packaging."
+                },
+                {
+                    "type": "input_image",
+                    "image_url": f"data:image/png;base64,{img_b64}"
+                }
+            ]
+        }]
+    )
+
+    return response.output_text
+
+
+@tracing.traced("model.extract_product_name")
+def extract_product_name(client, all_text):
+    response = client.responses.create(
+        model=VISION_MODEL,
+        input=f"""
+        From the following packaging text, extract the MOST LIKELY product name.
+        Respond ONLY with the product name.
+
+        TEXT:
+        {all_text}
+        """
+    )
+
+    return response.output_text.strip()
+
+
+@tracing.traced("model.extract_product_names")
+def extract_product_names(client, all_text):
+    """Every distinct product named in ``all_text`` (e.g. from a shelf photo)."""
+    response = client.responses.create(
+        model=VISION_MODEL,
+        input=f"""
+        The following text was read from a photo that may show several products.
+        List the name of EVERY distinct product, one per line.
+        Respond ONLY with the product names.
+
+        TEXT:
+        {all_text}
+        """
+    )
+
+    names = (line.strip(" -*\t") for line in response.output_text.splitlines())
+    return list(dict.fromkeys(name for name in names if name))
+
+
+def chat_completion(client, messages, temperature, **span_attrs):
+    """Run a chat completion and return the reply text."""
+    with tracing.span("model.chat", **span_attrs):
+        response = client.chat.completions.create(
+            model=CHAT_MODEL,
+            messages=messages,
+            temperature=temperature
+        )
+    return response.choices[0].message.content
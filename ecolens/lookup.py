@@ -0,0 +1,98 @@
+"""Catalogue lookups used by the product search and alternatives views.
+
+Each function takes either a ``summary_df`` or a
+:class:`~ecolens.compact.CompactCatalogue`; the catalogue is read through its
+arrays without building the full DataFrame.
+"""
+
+from .compact import CompactCatalogue
+
+
+def _name_series(summary_df):
+    if isinstance(summary_df, CompactCatalogue):
+        return summary_df.name_series()
+    return summary_df["name"]
+
+
+def get_greener_alternatives(current_product_name, summary_df, max_alternatives=5):
+    if isinstance(summary_df, CompactCatalogue):
+        return summary_df.greener(current_product_name, max_alternatives)
+
+    current = summary_df[summary_df["name"] == current_product_name]
+
+    if current.empty:
+        return []
+
+    row = current.iloc[0]
+    category = row["category"]
+    current_score = row["eco_score"]
+
+    # ---------- DATA-DRIVEN ----------
+    better = summary_df[
+        (summary_df["category"] == category) &
+        (summary_df["eco_score"] > current_score) &
+        (summary_df["name"] != current_product_name)
+    ].sort_values("eco_score", ascending=False)
+
+    results = []
+
+    for _, alt in better.head(max_alternatives).iterrows():
+        diff = alt["eco_score"] - current_score
+        results.append({
+            "name": alt["name"],
+            "eco_score": alt["eco_score"],
+            "improvement": f"{diff:.0f} points better eco score",
+            "score_diff": diff
+        })
+
+    return results
+
+
+def fuzzy_match_product(name, summary_df):
+    from rapidfuzz import process, fuzz
+
+    match, score, _ = process.extractOne(
+        name,
+        _name_series(summary_df).tolist(),
+        scorer=fuzz.token_sort_ratio
+    )
+    return match, score
+
+
+def match_products(names, summary_df):
+    """Best catalogue match for every name in ``names`` in one call.
+
+    Vectorised form of :func:`fuzzy_match_product`: rapidfuzz scores the
+    whole ``names x catalogue`` matrix at once. Case and punctuation are
+    ignored, since receipts and OCR text rarely match the catalogue's
+    casing. Returns ``(matches, scores)`` lists.
+    """
+    import numpy as np
+    from rapidfuzz import fuzz, process, utils
+
+    if not len(names):
+        return [], []
+    choices = _name_series(summary_df).tolist()
+    scores = process.cdist(
+        list(names), choices,
+        scorer=fuzz.token_sort_ratio,
+        processor=utils.default_process,
+        workers=-1
+    )
+    best = scores.argmax(axis=1)
+    return [choices[i] for i in best], scores[np.arange(len(best)), best].tolist()
+
+
+def product_options(summary_df):
+    """Sorted unique product names for the search selectbox."""
+    return sorted(_name_series(summary_df).unique())
+
+
+def product_scores(names, summary_df):
+    """``name``, ``category`` and ``eco_score`` of each product in ``names`` (first row per name)."""
+    names = [n for n in names if n is not None]
+    if isinstance(summary_df, CompactCatalogue):
+        rows = summary_df.select(names)
+    else:
+        rows = summary_df[summary_df["name"].isin(names)]
+    return rows[["name", "category", "eco_score"]].drop_duplicates("name")
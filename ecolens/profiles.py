@@ -0,0 +1,184 @@
+"""Scoring profiles: normalisation caps and score weights as data.
+
+A profile is a small JSON (or YAML, with PyYAML installed) file::
+
+    {
+      "schema_version": 1,
+      "name": "default",
+      "version": "1",
+      "normalization_caps": {"carbon": 0.5, "water": 10, "energy": 20, "waste": 5},
+      "packaging_weights": {"carbon": 0.35, "water": 0.25, "energy": 0.25, "waste": 0.15},
+      "eco_weights": {"packaging": 0.5, "ingredient": 0.4, "bonus": 0.1}
+    }
+
+Only ``packaging_score`` and ``eco_score`` depend on a profile, so
+:func:`rescore` recomputes just those two columns from the stored impacts and
+sub-scores instead of re-running the pipeline. :func:`assign_profile` splits
+users between profiles for A/B tests.
+"""
+
+import hashlib
+import json
+import os
+
+import numpy as np
+
+from .scoring import (
+    ECO_WEIGHTS,
+    IMPACT_KEYS,
+    NORMALIZATION_CAPS,
+    PACKAGING_WEIGHTS,
+    eco_score,
+    packaging_score,
+)
+
+SCHEMA_VERSION = 1
+ECO_WEIGHT_KEYS = ["packaging", "ingredient", "bonus"]
+PROFILE_EXTENSIONS = (".json", ".yaml", ".yml")
+
+
+class ScoringProfile:
+    """Named, versioned set of caps and weights (see the module docstring)."""
+
+    def __init__(self, name, version, caps, packaging_weights, eco_weights):
+        self.name = name
+        self.version = str(version)
+        self.caps = tuple(float(v) for v in caps)
+        self.packaging_weights = tuple(float(v) for v in packaging_weights)
+        self.eco_weights = tuple(float(v) for v in eco_weights)
+
+        if len(self.caps) != len(IMPACT_KEYS) or min(self.caps) <= 0:
+            raise ValueError(f"profile {self.key}: caps must be {len(IMPACT_KEYS)} positive numbers")
+        for label, weights in (("packaging_weights", self.packaging_weights),
+                               ("eco_weights", self.eco_weights)):
+            if min(weights) < 0 or not np.isclose(sum(weights), 1):
+                raise ValueError(f"profile {self.key}: {label} must be non-negative and sum to 1")
+
+    @property
+    def key(self):
+        return f"{self.name}@{self.version}"
+
+    @property
+    def fingerprint(self):
+        """Hash of the numbers only: equal fingerprints score identically."""
+        payload = json.dumps([self.caps, self.packaging_weights, self.eco_weights])
+        return hashlib.sha256(payload.encode()).hexdigest()[:16]
+
+    @property
+    def is_default(self):
+        return self.fingerprint == DEFAULT_PROFILE.fingerprint
+
+    def to_dict(self):
+        return {
+            "schema_version": SCHEMA_VERSION,
+            "name": self.name,
+            "version": self.version,
+            "normalization_caps": dict(zip(IMPACT_KEYS, self.caps)),
+            "packaging_weights": dict(zip(IMPACT_KEYS, self.packaging_weights)),
+            "eco_weights": dict(zip(ECO_WEIGHT_KEYS, self.eco_weights)),
+        }
+
+    def __repr__(self):
+        return f"ScoringProfile({self.key})"
+
+
+DEFAULT_PROFILE = ScoringProfile("default", "1", NORMALIZATION_CAPS, PACKAGING_WEIGHTS, ECO_WEIGHTS)
+
+
+def _values(data, section, keys):
+    values = data.get(section)
+    if not isinstance(values, dict):
+        raise ValueError(f"profile is missing the {section!r} mapping")
+    missing = [k for k in keys if k not in values]
+    if missing:
+        raise ValueError(f"profile {section} is missing: {', '.join(missing)}")
+    return [values[k] for k in keys]
+
+
+def profile_from_dict(data):
+    if data.get("schema_version", SCHEMA_VERSION) != SCHEMA_VERSION:
+        raise ValueError(f"unsupported profile schema_version {data['schema_version']!r}")
+    return ScoringProfile(
+        data.get("name", "unnamed"),
+        data.get("version", "1"),
+        _values(data, "normalization_caps", IMPACT_KEYS),
+        _values(data, "packaging_weights", IMPACT_KEYS),
+        _values(data, "eco_weights", ECO_WEIGHT_KEYS),
+    )
+
+
+def load_profile(path):
+    """Read a profile from a ``.json`` or ``.yaml``/``.yml`` file."""
+    with open(path, encoding="utf-8") as f:
+        if path.endswith((".yaml", ".yml")):
+            try:
+                import yaml
+            except ImportError:
+                raise RuntimeError("YAML profiles need PyYAML (pip install pyyaml)") from None
+            data = yaml.safe_load(f)
+        else:
+            data = json.load(f)
+    if not isinstance(data, dict):
+        raise ValueError(f"{path}: a profile must be a mapping")
+    return profile_from_dict(data)
+
+
+def load_profiles(directory, errors=None):
+    """``{name: profile}`` for every profile file in ``directory``, plus the default.
+
+    With an ``errors`` list, a file that fails to load is skipped and
+    ``"<filename>: <reason>"`` is appended to it instead of raising.
+    """
+    profiles = {DEFAULT_PROFILE.name: DEFAULT_PROFILE}
+    if os.path.isdir(directory):
+        for filename in sorted(os.listdir(directory)):
+            if filename.endswith(PROFILE_EXTENSIONS):
+                try:
+                    profile = load_profile(os.path.join(directory, filename))
+                except (OSError, ValueError, RuntimeError) as e:
+                    if errors is None:
+                        raise
+                    errors.append(f"{filename}: {e}")
+                    continue
+                profiles[profile.name] = profile
+    return profiles
+
+
+def rescore(impacts, ingredient, bonus, profile):
+    """``(packaging_score, eco_score)`` arrays for ``profile``.
+
+    ``impacts`` is an ``(N, 4)`` array of ``IMPACT_COLUMNS``; ``ingredient``
+    and ``bonus`` are the profile-independent sub-scores.
+    """
+    packaging = packaging_score(impacts, profile.caps, profile.packaging_weights)
+    eco = eco_score(packaging, np.asarray(ingredient, dtype=np.float64),
+                    np.asarray(bonus, dtype=np.float64), profile.eco_weights)
+    return packaging, eco
+
+
+def assign_profile(subject, arms):
+    """Deterministically pick an A/B arm for ``subject`` (e.g. a session id).
+
+    ``arms`` maps profile name -> relative weight. The same subject always
+    lands in the same arm for a given set of arms.
+    """
+    names = sorted(arms)
+    weights = np.array([arms[n] for n in names], dtype=np.float64)
+    if not len(names) or weights.min() < 0 or weights.sum() <= 0:
+        raise ValueError("A/B arms need non-negative weights with a positive total")
+    digest = hashlib.sha256(str(subject).encode()).digest()
+    point = int.from_bytes(digest[:8], "big") / 2**64
+    arm = int(np.searchsorted(np.cumsum(weights) / weights.sum(), point, side="right"))
+    return names[min(arm, len(names) - 1)]
+
+
+def parse_arms(spec):
+    """Parse ``"default:50,carbon_first:50"`` into ``{name: weight}``."""
+    arms = {}
+    for part in filter(None, (p.strip() for p in spec.split(","))):
+        name, _, weight = part.partition(":")
+        try:
+            arms[name.strip()] = float(weight) if weight else 1.0
+        except ValueError:
+            raise ValueError(f"A/B arm {part!r}: weight must be a number") from None
+    return arms
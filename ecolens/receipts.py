@@ -0,0 +1,111 @@
+"""Receipt import: turn a shopping receipt into logged purchases.
+
+A receipt arrives either as a photo (read with the same OCR call as a
+product scan) or as a CSV export from a store app. Both become a list of
+``(item, quantity)`` line items. :func:`match_receipt` then matches every
+item against the catalogue in a single vectorised fuzzy-match call.
+"""
+
+import re
+
+import pandas as pd
+
+from . import llm, tracing
+from .lookup import match_products, product_scores
+
+# Receipt names are abbreviated ("COCA COLA 1L PET"), so the bar sits a
+# little below the batch scan's
+MIN_RECEIPT_CONFIDENCE = 55
+
+ITEM_COLUMNS = ("item", "name", "product", "description", "article")
+QUANTITY_COLUMNS = ("quantity", "qty", "count", "units")
+
+# Receipt trailers ("SUBTOTAL 12.40", "Card ending 1234", "Tax A 8%"): lines
+# made only of these words, numbers and one-letter tax codes. A product name
+# that merely contains one ("Total Greek Yoghurt", "Cardamom pods") is kept.
+_TRAILER_WORDS = (
+    r"sub\s?total|total|tax|vat|gst|change|cash|card|credit|debit|visa|mastercard|amex|"
+    r"balance|tender(?:ed)?|payment|discount|savings|saved|receipt|invoice|due|paid|"
+    r"amount|ending|items?|no|number|incl|excl|rate|back|you"
+)
+_NOT_ITEMS = re.compile(
+    rf"^[^A-Za-z]*(?:thank\s+you\b.*|(?:(?:{_TRAILER_WORDS}|[A-Za-z])\b[^A-Za-z]*)+)$",
+    re.IGNORECASE,
+)
+_QUANTITY_PREFIX = re.compile(r"^\s*(\d{1,3})\s*(?:x|@|\*)\s+", re.IGNORECASE)
+_QUANTITY_SUFFIX = re.compile(r"\s+(?:x|@|\*)\s*(\d{1,3})\s*$", re.IGNORECASE)
+# Trailing prices / amounts ("1.99", "$2,50 A", "3 @ 0.99")
+_TRAILING_AMOUNTS = re.compile(r"(?:\s+[-$€£₹]?\d+[.,]\d{2}(?:\s*[A-Z]{1,2})?)+\s*$")
+_HAS_LETTERS = re.compile(r"[A-Za-z]{3}")
+
+
+def receipt_lines(text):
+    """Line items ``[(item, quantity)]`` from OCR'd receipt text."""
+    items = []
+    for line in text.splitlines():
+        line = _TRAILING_AMOUNTS.sub("", line.strip())
+        if not _HAS_LETTERS.search(line) or _NOT_ITEMS.search(line):
+            continue
+        quantity = 1
+        for pattern in (_QUANTITY_PREFIX, _QUANTITY_SUFFIX):
+            found = pattern.search(line)
+            if found:
+                quantity = int(found.group(1))
+                line = pattern.sub(" ", line)
+        line = line.strip(" -*:\t")
+        if line:
+            items.append((line, max(quantity, 1)))
+    return items
+
+
+def _find_column(columns, candidates):
+    lowered = {str(c).strip().lower(): c for c in columns}
+    return next((lowered[c] for c in candidates if c in lowered), None)
+
+
+def read_receipt_csv(path_or_buffer):
+    """Line items ``[(item, quantity)]`` from a receipt CSV export.
+
+    The item column is the first of :data:`ITEM_COLUMNS` present (matched
+    case-insensitively); a :data:`QUANTITY_COLUMNS` column is optional.
+    """
+    df = pd.read_csv(path_or_buffer, dtype=str)
+    item_col = _find_column(df.columns, ITEM_COLUMNS)
+    if item_col is None:
+        raise ValueError(f"receipt CSV needs one of the columns: {', '.join(ITEM_COLUMNS)}")
+    qty_col = _find_column(df.columns, QUANTITY_COLUMNS)
+
+    items = df[item_col].fillna("").str.strip()
+    if qty_col is None:
+        quantities = pd.Series(1, index=df.index)
+    else:
+        quantities = pd.to_numeric(df[qty_col], errors="coerce").fillna(1).clip(lower=1).astype(int)
+    keep = items != ""
+    return list(zip(items[keep], quantities[keep]))
+
+
+def read_receipt_image(client, image):
+    """Line items from a receipt photo (one OCR call)."""
+    with tracing.span("receipt.ocr"):
+        return receipt_lines(llm.ocr_image(client, image))
+
+
+def match_receipt(items, summary_df, min_confidence=MIN_RECEIPT_CONFIDENCE):
+    """Match every line item at once.
+
+    Returns a DataFrame with ``item``, ``quantity``, ``product`` (``None``
+    below ``min_confidence``), ``confidence``, ``category`` and
+    ``eco_score``.
+    """
+    with tracing.span("receipt.match", items=len(items)):
+        frame = pd.DataFrame(items, columns=["item", "quantity"])
+        matches, scores = match_products(frame["item"].tolist(), summary_df)
+        frame["confidence"] = [round(float(s), 1) for s in scores]
+        # object dtype even with no items, so the merge key matches ``name``
+        frame["product"] = pd.Series(
+            [m if s >= min_confidence else None for m, s in zip(matches, scores)],
+            index=frame.index, dtype=object,
+        )
+        scores_df = product_scores(frame["product"].dropna().unique(), summary_df)
+        frame = frame.merge(scores_df, how="left", left_on="product", right_on="name")
+        return frame[["item", "quantity", "product", "confidence", "category", "eco_score"]]
@@ -0,0 +1,139 @@
+"""Hot reload: pick up catalogue CSV edits without restarting the app.
+
+A :class:`CatalogueReloader` owns the live :class:`~ecolens.shared.Snapshot`.
+A daemon thread polls the source files' mtimes. When they change and then
+stay unchanged for one more poll (so a half-written CSV is never read),
+the thread loads and scores the new catalogue in the background. It also
+builds the per-category ranking and the greener-alternatives index
+before swapping the snapshot reference, so no script run waits for a reload.
+
+Readers call :meth:`CatalogueReloader.current` once per script run, so each
+run sees one version from start to end. The run after a swap gets the new
+version. If a reload fails (for example a CSV that no longer validates),
+the old version stays live and the error is reported in :meth:`stats`.
+"""
+
+import os
+import threading
+import time
+import weakref
+
+from . import tracing
+from .alternatives import load_index as load_alternatives_index
+from .compact import load_catalogue
+from .shared import Snapshot, SwapMetrics
+
+# Seconds between mtime polls
+RELOAD_INTERVAL = 2.0
+
+
+def load_snapshot(product_path, material_path, alternatives_path=None, version=None):
+    """Load, score and index the catalogue -> :class:`~ecolens.shared.Snapshot`."""
+    materials_df, catalogue, ingest_report, memory = load_catalogue(product_path, material_path)
+    catalogue.ranking()
+    alternatives = None
+    if alternatives_path is not None:
+        alternatives = load_alternatives_index(alternatives_path, materials_df, catalogue)
+    return Snapshot(
+        version or f"{time.time_ns():x}",
+        catalogue,
+        materials_df,
+        ingest_report,
+        memory,
+        catalogue.nbytes(),
+        alternatives,
+    )
+
+
+class CatalogueReloader:
+    """Keeps the newest catalogue built from the CSVs; swaps it in when they change.
+
+    The first :meth:`current` call loads synchronously and starts the
+    watcher thread. Safe to share between threads (e.g. via
+    ``st.cache_resource``).
+    """
+
+    def __init__(self, product_path, material_path, alternatives_path=None,
+                 interval=RELOAD_INTERVAL):
+        self.paths = [p for p in (product_path, material_path, alternatives_path) if p]
+        self.product_path = product_path
+        self.material_path = material_path
+        self.alternatives_path = alternatives_path
+        self.interval = interval
+        self.metrics = SwapMetrics()
+        self.last_error = None
+        self._snapshot = None
+        self._stamp = None
+        self._pending = None
+        self._pending_span = None
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _read_stamp(self):
+        return tuple(os.stat(path).st_mtime_ns for path in self.paths)
+
+    def current(self):
+        """The live :class:`~ecolens.shared.Snapshot`."""
+        snapshot = self._snapshot
+        if snapshot is not None:
+            return snapshot
+        with self._lock:
+            if self._snapshot is None:
+                span = tracing.start_span("catalogue.swap")
+                stamp = self._read_stamp()
+                self._install(self._load(), stamp, span)
+                self._thread = threading.Thread(target=self._watch, name="ecolens-reload", daemon=True)
+                self._thread.start()
+            return self._snapshot
+
+    def _load(self):
+        with tracing.span("catalogue.reload.build"):
+            return load_snapshot(self.product_path, self.material_path, self.alternatives_path)
+
+    def _install(self, snapshot, stamp, span):
+        weakref.finalize(snapshot.catalogue, self.metrics.release, snapshot.version)
+        span.attrs.update(version=snapshot.version, source="files")
+        old, self._snapshot = self._snapshot, snapshot
+        self._stamp = stamp
+        self.metrics.swapped(span, old)
+
+    def check(self):
+        """Reload now if the files changed since the last load (what the watcher runs).
+
+        Returns ``True`` when a new version was swapped in.
+        """
+        try:
+            stamp = self._read_stamp()
+        except FileNotFoundError:
+            return False  # mid-replace; the next poll sees the new file
+        if stamp == self._stamp:
+            return False
+        # Wait until the files have stopped changing for one poll
+        if stamp != self._pending:
+            self._pending = stamp
+            self._pending_span = tracing.start_span("catalogue.swap")
+            return False
+        span = self._pending_span
+        self._pending = None
+        try:
+            snapshot = self._load()
+        except Exception as e:
+            # Keep serving the old version; retry once the files change again
+            self.last_error = f"{type(e).__name__}: {e}"
+            self._stamp = stamp
+            return False
+        self.last_error = None
+        with self._lock:
+            self._install(snapshot, stamp, span)
+        return True
+
+    def _watch(self):
+        while not self._stop.wait(self.interval):
+            self.check()
+
+    def stop(self):
+        self._stop.set()
+
+    def stats(self):
+        return {**self.metrics.stats(self._snapshot), "last_error": self.last_error}
@@ -0,0 +1,276 @@
+"""Eco-score pipeline: packaging impact, ingredient, bonus and final score.
+
+Everything here works on plain pandas/NumPy data so it can be used by the
+Streamlit app, the batch CLI and notebooks alike.
+"""
+
+import numpy as np
+import pandas as pd
+
+# -----------------------------
+# FLAGS (BEAUTY + FOOD)
+# -----------------------------
+ALL_FLAGS = [
+    "microplastics",
+    "petroleum",
+    "silicones",
+    "recyclable_packaging",
+    "eco_certified",
+    "ultra_processed",
+    "high_sugar",
+    "palm_oil",
+    "animal_based"
+]
+
+BEAUTY_CATEGORIES = ["cream", "shampoo", "body wash", "sunscreen"]
+
+# Products list up to this many packaging materials (material_1..material_3)
+MATERIAL_SLOTS = 3
+
+IMPACT_KEYS = ["carbon", "water", "energy", "waste"]
+
+IMPACT_COLUMNS = [
+    "total_carbon_kg",
+    "total_water_L",
+    "total_energy_MJ",
+    "total_waste_score"
+]
+
+# Default scoring profile; see ecolens.profiles for loading others
+NORMALIZATION_CAPS = (0.5, 10, 20, 5)        # per IMPACT_KEYS
+PACKAGING_WEIGHTS = (0.35, 0.25, 0.25, 0.15)  # per IMPACT_KEYS
+ECO_WEIGHTS = (0.50, 0.40, 0.10)             # packaging, ingredient, bonus
+
+SUMMARY_COLUMNS = [
+    "name",
+    "brand",
+    "category",
+    *IMPACT_COLUMNS,
+    "packaging_score",
+    "ingredient_score",
+    "bonus_score",
+    "eco_score",
+    *ALL_FLAGS
+]
+
+
+# =============================
+# MATERIALS
+# =============================
+def material_impact_dict(materials_df):
+    """Map material name -> {'carbon', 'water', 'energy', 'waste'} per kg."""
+    return {
+        row.material: {
+            "carbon": row.carbon_kg_per_kg,
+            "water": row.water_L_per_kg,
+            "energy": row.energy_MJ_per_kg,
+            "waste": row.waste_score,
+        }
+        for row in materials_df.itertuples(index=False)
+    }
+
+
+def material_table(materials_df):
+    """Return ``(vocabulary, table)`` for vectorised lookups.
+
+    ``table`` is a ``(n_materials, 4)`` float array whose columns follow
+    ``IMPACT_KEYS``; row ``i`` belongs to ``vocabulary[i]``.
+    """
+    vocabulary = list(materials_df["material"])
+    table = materials_df[[
+        "carbon_kg_per_kg",
+        "water_L_per_kg",
+        "energy_MJ_per_kg",
+        "waste_score"
+    ]].to_numpy(dtype=np.float64)
+    return vocabulary, table
+
+
+def material_slots(products_df, vocabulary):
+    """Encode the material/weight columns as ``(codes, weights_g)`` arrays.
+
+    Both arrays have shape ``(n_products, MATERIAL_SLOTS)``. Missing or
+    unknown materials get code ``-1``.
+    """
+    n = len(products_df)
+    codes = np.full((n, MATERIAL_SLOTS), -1, dtype=np.int32)
+    weights = np.full((n, MATERIAL_SLOTS), np.nan, dtype=np.float64)
+
+    for j in range(MATERIAL_SLOTS):
+        mat_col = f"material_{j + 1}"
+        wt_col = f"weight_{j + 1}_g"
+        if mat_col not in products_df.columns or wt_col not in products_df.columns:
+            continue
+        codes[:, j] = pd.Categorical(products_df[mat_col], categories=vocabulary).codes
+        weights[:, j] = pd.to_numeric(products_df[wt_col], errors="coerce")
+
+    return codes, weights
+
+
+# =============================
+# PACKAGING IMPACT
+# =============================
+def slot_impacts(codes, weights_g, table):
+    """Per-slot impacts: a ``(..., MATERIAL_SLOTS, 4)`` array.
+
+    Carbon/water/energy are scaled by the slot's weight in kg; the waste
+    column is the material's raw waste score. Slots with an unknown
+    material or a missing weight are all zeros.
+    """
+    codes = np.asarray(codes)
+    weights_g = np.asarray(weights_g, dtype=np.float64)
+    valid = (codes >= 0) & ~np.isnan(weights_g)
+
+    per_slot = table[np.where(valid, codes, 0)]
+    kg = np.where(valid, weights_g, 0.0) / 1000
+
+    impacts = np.where(valid[..., None], per_slot, 0.0)
+    impacts[..., :3] *= kg[..., None]
+    return impacts, valid
+
+
+def packaging_totals(codes, weights_g, table):
+    """Total carbon/water/energy and mean waste score per product.
+
+    ``codes`` and ``weights_g`` are ``(..., MATERIAL_SLOTS)`` arrays (any
+    leading shape broadcasts), ``table`` comes from :func:`material_table`.
+    Slots with an unknown material or a missing weight are skipped, as in
+    the original per-row loop. Returns a ``(..., 4)`` array ordered like
+    ``IMPACT_KEYS``.
+    """
+    slots, valid = slot_impacts(codes, weights_g, table)
+
+    totals = np.zeros(slots.shape[:-2] + (4,))
+    waste_sum = np.zeros(totals.shape[:-1])
+    for j in range(slots.shape[-2]):
+        totals[..., :3] += slots[..., j, :3]
+        waste_sum += slots[..., j, 3]
+
+    count = valid.sum(axis=-1)
+    totals[..., 3] = np.divide(waste_sum, count, out=np.zeros_like(waste_sum), where=count > 0)
+    return totals
+
+
+def packaging_impact(products_df, materials_df):
+    """Per-product packaging impact as a DataFrame of ``IMPACT_COLUMNS``."""
+    vocabulary, table = material_table(materials_df)
+    codes, weights = material_slots(products_df, vocabulary)
+    totals = packaging_totals(codes, weights, table)
+    return pd.DataFrame(totals, columns=IMPACT_COLUMNS, index=products_df.index)
+
+
+# =============================
+# NORMALIZATION + PACKAGING SCORE (0-100)
+# =============================
+def normalize_impacts(totals, caps=NORMALIZATION_CAPS):
+    """Clip impacts against the normalisation caps -> values in ``[0, 1]``."""
+    caps = np.asarray(caps, dtype=np.float64)
+    return np.clip(np.asarray(totals) / caps, 0, 1)
+
+
+def packaging_score(totals, caps=NORMALIZATION_CAPS, weights=PACKAGING_WEIGHTS):
+    """Packaging score (0-100, one decimal) from a ``(..., 4)`` impact array."""
+    norm = normalize_impacts(totals, caps)
+    weights = np.asarray(weights, dtype=np.float64)
+    return np.round(((1 - norm) * weights).sum(axis=-1) * 100, 1)
+
+
+# =============================
+# INGREDIENT SCORE (CATEGORY AWARE)
+# =============================
+# Ingredient penalties per flag, by category family, and bonus points
+BEAUTY_PENALTIES = {"microplastics": 40, "petroleum": 35, "silicones": 25}
+FOOD_PENALTIES = {"ultra_processed": 35, "high_sugar": 25, "palm_oil": 20, "animal_based": 20}
+BONUS_BASE = 60
+BONUS_POINTS = {"recyclable_packaging": 20, "eco_certified": 20}
+
+
+def _flag_vector(points):
+    return np.array([points.get(flag, 0) for flag in ALL_FLAGS], dtype=np.int64)
+
+
+def flag_matrix(products_df):
+    """``(n_products, len(ALL_FLAGS))`` int64 array of the 0/1 flags."""
+    # Flags may be stored as int8; widen before doing arithmetic on them
+    return products_df[ALL_FLAGS].to_numpy(dtype=np.int64)
+
+
+def is_beauty(products_df):
+    return products_df["category"].astype(str).str.lower().isin(BEAUTY_CATEGORIES).to_numpy()
+
+
+def ingredient_points(flags, beauty):
+    """Ingredient score from a ``(..., len(ALL_FLAGS))`` flag array (broadcasts)."""
+    score = 100 - np.where(
+        beauty,
+        flags @ _flag_vector(BEAUTY_PENALTIES),
+        flags @ _flag_vector(FOOD_PENALTIES)
+    )
+    return np.clip(score, 0, 100)
+
+
+def bonus_points(flags):
+    """Bonus score from a ``(..., len(ALL_FLAGS))`` flag array (broadcasts)."""
+    return np.clip(BONUS_BASE + flags @ _flag_vector(BONUS_POINTS), 0, 100)
+
+
+def ingredient_score(products_df):
+    """Ingredient score (0-100) using beauty or food penalties per category."""
+    score = ingredient_points(flag_matrix(products_df), is_beauty(products_df))
+    return pd.Series(score, index=products_df.index)
+
+
+# =============================
+# BONUS SCORE
+# =============================
+def bonus_score(products_df):
+    return pd.Series(bonus_points(flag_matrix(products_df)), index=products_df.index)
+
+
+# =============================
+# FINAL ECOSCORE
+# =============================
+def eco_score(packaging, ingredient, bonus, weights=ECO_WEIGHTS):
+    w_packaging, w_ingredient, w_bonus = weights
+    return (w_packaging*packaging + w_ingredient*ingredient + w_bonus*bonus).round(1)
+
+
+def prepare_flags(products_df):
+    """Ensure every flag column exists as 0/1 ``int8`` (missing -> 0)."""
+    for c in ALL_FLAGS:
+        if c not in products_df.columns:
+            products_df[c] = 0
+
+    products_df[ALL_FLAGS] = products_df[ALL_FLAGS].fillna(0).astype("int8")
+    return products_df
+
+
+def score_products(products_df, materials_df, profile=None):
+    """Return a copy of ``products_df`` with all impact and score columns.
+
+    ``profile`` is a :class:`ecolens.profiles.ScoringProfile`; the default
+    caps and weights above are used when it is ``None``.
+    """
+    caps, pack_weights, eco_weights = (
+        (NORMALIZATION_CAPS, PACKAGING_WEIGHTS, ECO_WEIGHTS) if profile is None
+        else (profile.caps, profile.packaging_weights, profile.eco_weights)
+    )
+    products_df = prepare_flags(products_df.copy())
+
+    impacts = packaging_impact(products_df, materials_df)
+    products_df[IMPACT_COLUMNS] = impacts
+    products_df["packaging_score"] = packaging_score(impacts.to_numpy(), caps, pack_weights)
+    products_df["ingredient_score"] = ingredient_score(products_df)
+    products_df["bonus_score"] = bonus_score(products_df)
+    products_df["eco_score"] = eco_score(
+        products_df["packaging_score"],
+        products_df["ingredient_score"],
+        products_df["bonus_score"],
+        eco_weights
+    )
+    return products_df
+
+
+def summarize(scored_df):
+    """The column subset the app and exports work with."""
+    return scored_df[SUMMARY_COLUMNS].copy()
@@ -0,0 +1,278 @@
+"""Per-session user state: compact, bounded, accounted for, spilled when idle.
+
+The app used to keep each session's purchase log as a pandas DataFrame plus
+a ``logged_keys`` set, and both chat transcripts as unbounded lists, all in
+``st.session_state``. A session now keeps only its id there. Its data is a
+:class:`SessionData` in a process-wide :class:`SessionRegistry`:
+
+- :class:`PurchaseLog` stores one float32 row per purchase plus int32
+  codes for the product name and category, each distinct string stored
+  once. It is capped at :data:`PURCHASE_LOG_LIMIT` purchases.
+- Chat transcripts are capped at :data:`MAX_TRANSCRIPT_MESSAGES`. Capping
+  also bounds the prompt sent to the model.
+- Sessions idle for longer than ``idle_seconds`` are written to a
+  :class:`SessionStore` (sqlite) and dropped from memory. They are read
+  back the next time the session reruns.
+"""
+
+import json
+import sqlite3
+import sys
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+from .compact import widen
+
+# Dashboard column -> ``summary_df`` column
+HISTORY_COLUMNS = {
+    "Product": "name",
+    "Category": "category",
+    "Eco Score": "eco_score",
+    "Carbon (kg)": "total_carbon_kg",
+    "Water (L)": "total_water_L",
+    "Energy (MJ)": "total_energy_MJ",
+    "Waste Score": "total_waste_score",
+}
+_LABEL_COLUMNS = ["Product", "Category"]
+_VALUE_COLUMNS = [c for c in HISTORY_COLUMNS if c not in _LABEL_COLUMNS]
+
+# Oldest purchases are dropped past this (about 40 bytes each)
+PURCHASE_LOG_LIMIT = 10_000
+# Messages kept per transcript, besides the system prompt
+MAX_TRANSCRIPT_MESSAGES = 40
+SESSION_IDLE_SECONDS = 15 * 60
+# Spilled sessions nobody came back for are deleted after this
+SESSION_TTL_SECONDS = 7 * 24 * 3600
+SESSION_DB = "sessions.sqlite"
+
+
+def cap_transcript(messages, limit=MAX_TRANSCRIPT_MESSAGES):
+    """Drop the oldest turns of ``messages`` in place, keeping the system prompt."""
+    if len(messages) > limit + 1:
+        del messages[1:len(messages) - limit]
+    return messages
+
+
+def state_nbytes(value):
+    """Approximate bytes held by ``value`` (recursing into containers)."""
+    if isinstance(value, np.ndarray):
+        return value.nbytes
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        usage = value.memory_usage(deep=True)
+        return int(usage.sum() if isinstance(value, pd.DataFrame) else usage)
+    if hasattr(value, "nbytes") and callable(value.nbytes):
+        return value.nbytes()
+    size = sys.getsizeof(value)
+    if isinstance(value, dict):
+        size += sum(state_nbytes(k) + state_nbytes(v) for k, v in value.items())
+    elif isinstance(value, (list, tuple, set, frozenset)):
+        size += sum(state_nbytes(v) for v in value)
+    return size
+
+
+# -----------------------------
+# Purchase log
+# -----------------------------
+class PurchaseLog:
+    """Append-only purchase history backed by two small arrays.
+
+    A product is logged once per eco score. Logging it again is a no-op,
+    which is what the ``logged_keys`` set used to do. :meth:`frame`
+    rebuilds the dashboard's DataFrame (the :data:`HISTORY_COLUMNS`) on
+    demand.
+    """
+
+    def __init__(self, limit=PURCHASE_LOG_LIMIT):
+        self.limit = limit
+        self._labels = []
+        self._label_codes = {}
+        self._codes = np.empty((0, len(_LABEL_COLUMNS)), dtype=np.int32)
+        self._values = np.empty((0, len(_VALUE_COLUMNS)), dtype=np.float32)
+
+    def __len__(self):
+        return len(self._codes)
+
+    def _code(self, label):
+        label = str(label)
+        code = self._label_codes.get(label)
+        if code is None:
+            code = self._label_codes[label] = len(self._labels)
+            self._labels.append(label)
+        return code
+
+    def log(self, rows):
+        """Append ``summary_df`` rows in one go; returns how many were new."""
+        sources = [HISTORY_COLUMNS[c] for c in _VALUE_COLUMNS]
+        names, scores = self._codes[:, 0], self._values[:, 0]
+        seen = set(zip(names.tolist(), scores.tolist()))
+        codes, values = [], []
+        for name, category, row in zip(rows["name"], rows["category"],
+                                       rows[sources].to_numpy(dtype=np.float32)):
+            key = (self._code(name), float(row[0]))
+            if key not in seen:
+                seen.add(key)
+                codes.append((key[0], self._code(category)))
+                values.append(row)
+        if codes:
+            self._codes = np.concatenate([self._codes, np.asarray(codes, dtype=np.int32)])[-self.limit:]
+            self._values = np.concatenate([self._values, np.asarray(values, dtype=np.float32)])[-self.limit:]
+        return len(codes)
+
+    def frame(self):
+        """The log as a DataFrame with the :data:`HISTORY_COLUMNS`, oldest first."""
+        labels = np.asarray(self._labels, dtype=object)
+        columns = {c: labels[self._codes[:, i]] for i, c in enumerate(_LABEL_COLUMNS)}
+        columns.update({c: widen(self._values[:, i]) for i, c in enumerate(_VALUE_COLUMNS)})
+        return pd.DataFrame(columns, columns=list(HISTORY_COLUMNS))
+
+    def clear(self):
+        self.__init__(self.limit)
+
+    def nbytes(self):
+        return (self._codes.nbytes + self._values.nbytes
+                + sum(sys.getsizeof(label) for label in self._labels))
+
+    def to_state(self):
+        return {"labels": self._labels, "codes": self._codes.tolist(), "values": self._values.tolist()}
+
+    @classmethod
+    def from_state(cls, state, limit=PURCHASE_LOG_LIMIT):
+        log = cls(limit)
+        log._labels = list(state["labels"])
+        log._label_codes = {label: i for i, label in enumerate(log._labels)}
+        if state["codes"]:
+            log._codes = np.asarray(state["codes"], dtype=np.int32)
+            log._values = np.asarray(state["values"], dtype=np.float32)
+        return log
+
+
+# -----------------------------
+# Sessions
+# -----------------------------
+class SessionData:
+    """One session's purchases and chat transcripts (``{key: messages}``)."""
+
+    __slots__ = ("purchases", "transcripts", "last_seen")
+
+    def __init__(self, purchases=None, transcripts=None):
+        self.purchases = purchases if purchases is not None else PurchaseLog()
+        self.transcripts = transcripts if transcripts is not None else {}
+        self.last_seen = time.monotonic()
+
+    def memory(self):
+        """``{part: bytes}`` for the accounting view."""
+        usage = {"purchases": self.purchases.nbytes()}
+        usage.update({f"transcript:{key}": state_nbytes(messages)
+                      for key, messages in self.transcripts.items()})
+        return usage
+
+    def nbytes(self):
+        return sum(self.memory().values())
+
+    def to_json(self):
+        return json.dumps({"purchases": self.purchases.to_state(), "transcripts": self.transcripts})
+
+    @classmethod
+    def from_json(cls, text):
+        state = json.loads(text)
+        return cls(PurchaseLog.from_state(state["purchases"]), state["transcripts"])
+
+
+class SessionStore:
+    """sqlite table of spilled sessions, ``id -> JSON``."""
+
+    def __init__(self, path=SESSION_DB):
+        self.path = path
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS sessions (id TEXT PRIMARY KEY, saved_at REAL, state TEXT)"
+        )
+
+    def save_many(self, sessions):
+        """Write ``[(id, SessionData)]`` in one transaction."""
+        rows = [(session_id, time.time(), data.to_json()) for session_id, data in sessions]
+        with self._lock, self._db:
+            self._db.executemany("INSERT OR REPLACE INTO sessions VALUES (?, ?, ?)", rows)
+
+    def pop(self, session_id):
+        """The spilled :class:`SessionData` for ``session_id`` (removed), or ``None``."""
+        with self._lock, self._db:
+            row = self._db.execute("SELECT state FROM sessions WHERE id = ?", (session_id,)).fetchone()
+            if row is None:
+                return None
+            self._db.execute("DELETE FROM sessions WHERE id = ?", (session_id,))
+        return SessionData.from_json(row[0])
+
+    def expire(self, ttl=SESSION_TTL_SECONDS):
+        with self._lock, self._db:
+            self._db.execute("DELETE FROM sessions WHERE saved_at < ?", (time.time() - ttl,))
+
+    def __len__(self):
+        with self._lock:
+            return self._db.execute("SELECT COUNT(*) FROM sessions").fetchone()[0]
+
+
+class SessionRegistry:
+    """Process-wide ``session id -> SessionData``, spilling idle sessions.
+
+    Every :meth:`get` marks its session as seen. At most once per
+    ``sweep_interval`` seconds it also spills the sessions that have been
+    idle for ``idle_seconds`` to ``store``.
+    """
+
+    def __init__(self, store, idle_seconds=SESSION_IDLE_SECONDS, sweep_interval=60.0):
+        self.store = store
+        self.idle_seconds = idle_seconds
+        self.sweep_interval = sweep_interval
+        self.evictions = 0
+        self.restores = 0
+        self._sessions = {}
+        self._lock = threading.Lock()
+        self._last_sweep = time.monotonic()
+
+    def get(self, session_id):
+        """``session_id``'s :class:`SessionData`, restored or created as needed."""
+        now = time.monotonic()
+        with self._lock:
+            data = self._sessions.get(session_id)
+            if data is None:
+                data = self.store.pop(session_id)
+                if data is None:
+                    data = SessionData()
+                else:
+                    self.restores += 1
+                self._sessions[session_id] = data
+            data.last_seen = now
+        if now - self._last_sweep >= self.sweep_interval:
+            self.evict_idle(now)
+        return data
+
+    def evict_idle(self, now=None):
+        """Spill sessions idle past ``idle_seconds``; returns how many."""
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            self._last_sweep = now
+            idle = [(sid, data) for sid, data in self._sessions.items()
+                    if now - data.last_seen >= self.idle_seconds]
+            if idle:
+                self.store.save_many(idle)
+                for sid, _ in idle:
+                    del self._sessions[sid]
+                self.evictions += len(idle)
+        self.store.expire()
+        return len(idle)
+
+    def stats(self):
+        with self._lock:
+            sessions = list(self._sessions.values())
+        return {
+            "sessions_in_memory": len(sessions),
+            "bytes_in_memory": sum(data.nbytes() for data in sessions),
+            "sessions_spilled": len(self.store),
+            "evictions": self.evictions,
+            "restores": self.restores,
+        }
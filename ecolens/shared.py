@@ -0,0 +1,337 @@
+"""Shared catalogue snapshots for multi-process deployments.
+
+One loader scores the catalogue and publishes it; every app worker maps
+the result read-only instead of building its own copy::
+
+    python -m ecolens publish product.csv --namespace ecolens --watch 5
+    ECOLENS_SHARED=ecolens streamlit run app.py      # in each worker
+
+A snapshot is one file: an 8-byte header length, a JSON header (array
+layout plus the small tables: brands, categories, materials, breakdown
+vocabulary, greener-alternatives index, ingest and memory reports), then
+the catalogue arrays at 64-byte aligned offsets, including the
+per-category ranking used for greener alternatives. Product names are
+stored as UTF-8 data plus offsets and read back through pyarrow without
+copying. Readers ``mmap`` the file read-only, so every worker's arrays
+are views on the same page-cache pages, and the app reads them in place
+(no per-worker DataFrame). Snapshots live on ``/dev/shm`` when it exists.
+
+Hot swap: the loader writes each version to a new file, atomically
+replaces the ``<namespace>.json`` manifest that names it, and then unlinks
+the previous file. Workers stat the manifest on each access and map the
+new version when it changes. Sessions still holding the old catalogue keep
+a valid mapping, which is unmapped once its last array is garbage
+collected. A plain ``SharedMemory.close()`` would unmap it under live
+numpy views.
+"""
+
+import functools
+import json
+import mmap
+import os
+import tempfile
+import threading
+import time
+import weakref
+
+import numpy as np
+import pandas as pd
+
+from . import tracing
+from .compact import CompactCatalogue
+
+HEADER_BYTES = 8
+ALIGNMENT = 64
+SNAPSHOT_SUFFIX = ".snapshot"
+
+_BREAKDOWN_ARRAYS = ("material_codes", "slot_shares", "component_points", "flag_points")
+
+
+def shared_dir():
+    """``$ECOLENS_SHARED_DIR``, else ``/dev/shm`` (RAM-backed), else the temp dir."""
+    directory = os.environ.get("ECOLENS_SHARED_DIR")
+    if directory:
+        return directory
+    return "/dev/shm" if os.path.isdir("/dev/shm") else tempfile.gettempdir()
+
+
+def manifest_path(namespace, directory=None):
+    return os.path.join(directory or shared_dir(), f"{namespace}.json")
+
+
+def _align(offset):
+    return -(-offset // ALIGNMENT) * ALIGNMENT
+
+
+def _encode_strings(values):
+    """``(offsets, data)`` arrays: UTF-8 bytes and int64 start offsets (N + 1)."""
+    encoded = [str(v).encode("utf-8") for v in values]
+    offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+    np.cumsum([len(e) for e in encoded], out=offsets[1:])
+    return offsets, np.frombuffer(b"".join(encoded), dtype=np.uint8)
+
+
+def _decode_strings(offsets, data):
+    """Pandas string array over ``(offsets, data)``, zero-copy with pyarrow."""
+    try:
+        import pyarrow as pa
+    except ImportError:
+        raw = data.tobytes()
+        return pd.array([raw[a:b].decode("utf-8") for a, b in zip(offsets[:-1], offsets[1:])])
+    arrow = pa.Array.from_buffers(
+        pa.large_string(), len(offsets) - 1, [None, pa.py_buffer(offsets), pa.py_buffer(data)]
+    )
+    return pd.array(arrow, dtype="str")
+
+
+# -----------------------------
+# Writing
+# -----------------------------
+def snapshot_arrays(catalogue):
+    """``(arrays, tables)`` describing ``catalogue`` for :func:`write_snapshot`."""
+    name_offsets, name_data = _encode_strings(catalogue.names)
+    arrays = {
+        "name_offsets": name_offsets,
+        "name_data": name_data,
+        "brand_codes": catalogue.brand_codes,
+        "category_codes": catalogue.category_codes,
+        "metrics": catalogue.metrics,
+        "flag_mask": catalogue.flag_mask,
+    }
+    arrays["ranking_order"], arrays["ranking_starts"] = catalogue.ranking()
+    tables = {
+        "brands": [str(b) for b in catalogue.brands],
+        "categories": [str(c) for c in catalogue.categories],
+    }
+    if catalogue.breakdown is not None:
+        for key in _BREAKDOWN_ARRAYS:
+            arrays[key] = getattr(catalogue.breakdown, key)
+        tables["breakdown_vocabulary"] = list(catalogue.breakdown.vocabulary)
+    return {k: np.ascontiguousarray(v) for k, v in arrays.items()}, tables
+
+
+def write_snapshot(path, catalogue, **meta):
+    """Write ``catalogue`` (plus JSON-able ``meta``) to ``path`` atomically."""
+    arrays, tables = snapshot_arrays(catalogue)
+    layout, offset = {}, 0
+    for key, array in arrays.items():
+        offset = _align(offset)
+        layout[key] = [array.dtype.str, list(array.shape), offset]
+        offset += array.nbytes
+    header = json.dumps({"layout": layout, "tables": tables, "meta": meta}).encode("utf-8")
+    data_start = _align(HEADER_BYTES + len(header))
+
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(len(header).to_bytes(HEADER_BYTES, "little"))
+        f.write(header)
+        for key, array in arrays.items():
+            f.seek(data_start + layout[key][2])
+            f.write(array.tobytes())
+        f.truncate(data_start + offset)
+    os.replace(tmp, path)
+    return data_start + offset
+
+
+def publish(catalogue, namespace, directory=None, alternatives=None, **meta):
+    """Publish ``catalogue`` as the namespace's current snapshot.
+
+    ``alternatives`` is the catalogue's greener-alternatives index
+    (:func:`ecolens.alternatives.load_index`), shipped so workers need not
+    rebuild it. Returns the manifest dict. Older snapshot files of the namespace are
+    unlinked; workers that still map them are unaffected.
+    """
+    directory = directory or shared_dir()
+    os.makedirs(directory, exist_ok=True)
+    version = f"{time.time_ns():x}"
+    filename = f"{namespace}-{version}{SNAPSHOT_SUFFIX}"
+    if alternatives is not None:
+        meta["alternatives"] = {category: list(alts) for category, alts in alternatives.items()}
+    size = write_snapshot(os.path.join(directory, filename), catalogue, **meta)
+
+    manifest = {"namespace": namespace, "version": version, "file": filename,
+                "bytes": size, "products": len(catalogue), "published_at": time.time()}
+    path = manifest_path(namespace, directory)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(manifest, f)
+    os.replace(tmp, path)
+
+    for old in os.listdir(directory):
+        if old.startswith(f"{namespace}-") and old.endswith(SNAPSHOT_SUFFIX) and old != filename:
+            try:
+                os.unlink(os.path.join(directory, old))
+            except OSError:
+                pass  # still mapped on platforms that forbid it; next publish retries
+    return manifest
+
+
+# -----------------------------
+# Reading
+# -----------------------------
+class Snapshot:
+    """One catalogue version and the tables loaded with it.
+
+    ``alternatives`` is the greener-alternatives index for the default
+    profile when the loader prebuilt it, else ``None``.
+    """
+
+    def __init__(self, version, catalogue, materials_df, ingest_report, memory_report, nbytes,
+                 alternatives=None):
+        self.version = version
+        self.catalogue = catalogue
+        self.materials_df = materials_df
+        self.ingest_report = ingest_report
+        self.memory_report = memory_report
+        self.nbytes = nbytes
+        self.alternatives = alternatives
+
+
+class SwapMetrics:
+    """Swap and release bookkeeping shared by the snapshot holders.
+
+    Each swap records a ``catalogue.swap`` span (from noticing the new
+    version to it being live) and opens a ``catalogue.release`` span for the version it
+    replaced. That span ends when the old version is garbage collected, so
+    its duration is how long sessions kept it alive.
+    """
+
+    def __init__(self):
+        self.swaps = 0
+        self.released = 0
+        self.last_swap_ms = None
+        self.last_release_ms = None
+        self._retiring = {}
+
+    def swapped(self, span, old):
+        """Close ``span`` (the swap) and start timing ``old``'s release."""
+        self.last_swap_ms = round(span.end().duration_ms, 3)
+        if old is not None:
+            self.swaps += 1
+            self._retiring[old.version] = tracing.start_span(
+                "catalogue.release", version=old.version, bytes=old.nbytes
+            )
+
+    def release(self, version):
+        # Runs from a finalizer: no locks, it may fire inside any allocation
+        self.released += 1
+        span = self._retiring.pop(version, None)
+        if span is not None:
+            self.last_release_ms = round(span.end().duration_ms, 3)
+
+    def stats(self, snapshot):
+        return {
+            "version": snapshot.version if snapshot else None,
+            "bytes": snapshot.nbytes if snapshot else 0,
+            "swaps": self.swaps,
+            "last_swap_ms": self.last_swap_ms,
+            "old_versions_alive": len(self._retiring),
+            "last_release_ms": self.last_release_ms,
+        }
+
+
+def read_snapshot(path, version=None, on_release=None):
+    """Map the snapshot at ``path`` read-only -> :class:`Snapshot`.
+
+    ``on_release`` is called once the mapping is gone, i.e. after the last
+    array viewing it has been garbage collected.
+    """
+    from .explain import Breakdown
+
+    with open(path, "rb") as f:
+        mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    if on_release is not None:
+        weakref.finalize(mapped, on_release)
+
+    header_len = int.from_bytes(mapped[:HEADER_BYTES], "little")
+    header = json.loads(mapped[HEADER_BYTES:HEADER_BYTES + header_len])
+    data_start = _align(HEADER_BYTES + header_len)
+    arrays = {
+        key: np.ndarray(tuple(shape), dtype=np.dtype(dtype), buffer=mapped, offset=data_start + offset)
+        for key, (dtype, shape, offset) in header["layout"].items()
+    }
+    tables, meta = header["tables"], header["meta"]
+
+    breakdown = None
+    if "breakdown_vocabulary" in tables:
+        breakdown = Breakdown(tables["breakdown_vocabulary"],
+                              *(arrays[key] for key in _BREAKDOWN_ARRAYS))
+    catalogue = CompactCatalogue(
+        _decode_strings(arrays["name_offsets"], arrays["name_data"]),
+        arrays["brand_codes"], pd.Index(tables["brands"]),
+        arrays["category_codes"], pd.Index(tables["categories"]),
+        arrays["metrics"], arrays["flag_mask"], breakdown,
+        (arrays["ranking_order"], arrays["ranking_starts"]),
+    )
+    alternatives = meta.get("alternatives")
+    if alternatives is not None:
+        alternatives = {category: tuple(alts) for category, alts in alternatives.items()}
+    return Snapshot(
+        version,
+        catalogue,
+        pd.DataFrame(meta.get("materials", [])),
+        meta.get("ingest_report", {}),
+        meta.get("memory_report", {}),
+        len(mapped),
+        alternatives,
+    )
+
+
+class SharedCatalogue:
+    """Worker-side handle on a namespace: always returns the current snapshot.
+
+    :meth:`current` costs one ``stat`` of the manifest when nothing changed.
+    Safe to share between threads (e.g. via ``st.cache_resource``).
+    """
+
+    def __init__(self, namespace, directory=None):
+        self.namespace = namespace
+        self.directory = directory or shared_dir()
+        self.manifest = manifest_path(namespace, self.directory)
+        self.metrics = SwapMetrics()
+        self._snapshot = None
+        self._stamp = None
+        self._lock = threading.Lock()
+
+    def current(self):
+        """The namespace's current :class:`Snapshot` (mapping a new one if needed)."""
+        try:
+            st = os.stat(self.manifest)
+        except FileNotFoundError:
+            raise RuntimeError(
+                f"no shared catalogue {self.namespace!r} in {self.directory}; "
+                f"run `python -m ecolens publish ... --namespace {self.namespace}` first"
+            ) from None
+        stamp = (st.st_mtime_ns, st.st_ino, st.st_size)
+        if stamp == self._stamp:
+            return self._snapshot
+        with self._lock:
+            if stamp != self._stamp:
+                self._swap(stamp)
+            return self._snapshot
+
+    def _swap(self, stamp):
+        # The previous snapshot may be unlinked between reading the manifest
+        # and opening it: re-read the manifest, which then names a newer one
+        span = tracing.start_span("catalogue.swap")
+        for attempt in range(3):
+            with open(self.manifest, encoding="utf-8") as f:
+                manifest = json.load(f)
+            if self._snapshot is not None and manifest["version"] == self._snapshot.version:
+                self._stamp = stamp
+                return
+            try:
+                snapshot = read_snapshot(os.path.join(self.directory, manifest["file"]),
+                                         manifest["version"],
+                                         functools.partial(self.metrics.release, manifest["version"]))
+                break
+            except FileNotFoundError:
+                if attempt == 2:
+                    raise
+        span.attrs.update(version=snapshot.version, source="shared")
+        old, self._snapshot = self._snapshot, snapshot
+        self._stamp = stamp
+        self.metrics.swapped(span, old)
+
+    def stats(self):
+        return self.metrics.stats(self._snapshot)
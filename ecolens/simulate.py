@@ -0,0 +1,205 @@
+"""What-if scoring: how would eco scores and rankings move if products changed?
+
+A scenario is a plain dict; every key is optional::
+
+    {
+        "swap": {"HDPE": "Glass"},     # replace a packaging material
+        "weight_delta_g": -10,         # grams off (or onto) the heaviest material
+        "flags": {"palm_oil": 0},      # set ingredient/bonus flags
+    }
+
+:meth:`Simulator.apply` runs one scenario for a product or a whole category
+and returns score deltas and rank changes. :meth:`Simulator.bulk` evaluates
+many scenarios at once: they are encoded as arrays and scored as a single
+``(scenarios, products, ...)`` broadcast through the same vectorised
+functions the pipeline uses.
+"""
+
+import numpy as np
+import pandas as pd
+
+from .profiles import DEFAULT_PROFILE
+from .scoring import (
+    ALL_FLAGS,
+    MATERIAL_SLOTS,
+    bonus_points,
+    eco_score,
+    flag_matrix,
+    ingredient_points,
+    is_beauty,
+    material_slots,
+    material_table,
+    packaging_score,
+    packaging_totals,
+    prepare_flags,
+)
+
+SCENARIO_KEYS = {"swap", "weight_delta_g", "flags"}
+BLOCK_CELLS = 1 << 18
+
+
+class Simulator:
+    """Pre-encoded catalogue that scenarios can be scored against."""
+
+    def __init__(self, products_df, materials_df, profile=None):
+        products_df = prepare_flags(products_df.reset_index(drop=True).copy())
+        self.profile = profile or DEFAULT_PROFILE
+        self.vocabulary, self.table = material_table(materials_df)
+        self.codes, self.weights = material_slots(products_df, self.vocabulary)
+        self.flags = flag_matrix(products_df)
+        self.beauty = is_beauty(products_df)
+        self.names = products_df["name"].to_numpy(dtype=object)
+        self.categories = products_df["category"].astype(str).to_numpy(dtype=object)
+
+        # Weight deltas go to each product's heaviest listed material
+        valid = (self.codes >= 0) & ~np.isnan(self.weights)
+        self.heaviest = np.where(valid, self.weights, -np.inf).argmax(axis=1)
+        self.has_material = valid.any(axis=1)
+
+        self.eco_score = self._score(self.codes, self.weights, self.flags, self.beauty)
+
+    def _score(self, codes, weights, flags, beauty):
+        totals = packaging_totals(codes, weights, self.table)
+        packaging = packaging_score(totals, self.profile.caps, self.profile.packaging_weights)
+        return eco_score(
+            packaging,
+            ingredient_points(flags, beauty),
+            bonus_points(flags),
+            self.profile.eco_weights,
+        )
+
+    # -----------------------------
+    # Selection
+    # -----------------------------
+    def select(self, names=None, category=None):
+        """Row numbers for product ``names`` and/or a ``category`` (default: all)."""
+        mask = np.ones(len(self.names), dtype=bool)
+        if names is not None:
+            names = [names] if isinstance(names, str) else list(names)
+            mask &= np.isin(self.names, names)
+            unknown = set(names) - set(self.names[mask])
+            if unknown:
+                raise ValueError(f"unknown products: {', '.join(sorted(unknown))}")
+        if category is not None:
+            mask &= self.categories == category
+        rows = np.flatnonzero(mask)
+        if not len(rows):
+            raise ValueError("the selection matches no products")
+        return rows
+
+    # -----------------------------
+    # Scenario encoding
+    # -----------------------------
+    def _encode(self, scenarios):
+        """Scenario dicts -> ``(swap_table, weight_delta, flag_override)`` arrays.
+
+        ``swap_table[s, old_code]`` is the code material ``old_code`` becomes
+        in scenario ``s``; ``flag_override`` is ``-1`` where a flag is kept.
+        """
+        n, m = len(scenarios), len(self.vocabulary)
+        swap_table = np.tile(np.arange(m), (n, 1))
+        weight_delta = np.zeros(n)
+        flag_override = np.full((n, len(ALL_FLAGS)), -1, dtype=np.int64)
+        code_of = {material: i for i, material in enumerate(self.vocabulary)}
+
+        for s, scenario in enumerate(scenarios):
+            unknown_keys = set(scenario) - SCENARIO_KEYS
+            if unknown_keys:
+                raise ValueError(f"unknown scenario keys: {', '.join(sorted(unknown_keys))}")
+            for old, new in scenario.get("swap", {}).items():
+                for material in (old, new):
+                    if material not in code_of:
+                        raise ValueError(
+                            f"unknown material: {material!r} has no row in the material table "
+                            f"(known: {', '.join(self.vocabulary)})"
+                        )
+                swap_table[s, code_of[old]] = code_of[new]
+            weight_delta[s] = scenario.get("weight_delta_g", 0)
+            for flag, value in scenario.get("flags", {}).items():
+                if flag not in ALL_FLAGS or value not in (0, 1):
+                    raise ValueError(f"flags must be ALL_FLAGS set to 0 or 1, got {flag}={value!r}")
+                flag_override[s, ALL_FLAGS.index(flag)] = value
+        return swap_table, weight_delta, flag_override
+
+    # -----------------------------
+    # Scoring
+    # -----------------------------
+    def bulk(self, scenarios, names=None, category=None, block_cells=BLOCK_CELLS):
+        """Score every scenario against the selected products in one broadcast.
+
+        Returns a dict of arrays: ``rows``/``names`` ``(P,)`` and
+        ``eco_score``, ``delta``, ``rank``, ``rank_change`` ``(S, P)``.
+        Ranks are 1-based within each product's category (ties share the
+        better rank), with the scenario applied to every selected product
+        and the rest of the catalogue unchanged. Scenarios are broadcast in
+        blocks of about ``block_cells`` scenario x product cells to bound
+        memory.
+        """
+        rows = self.select(names, category)
+        swap_table, weight_delta, flag_override = self._encode(scenarios)
+        step = max(1, block_cells // len(rows))
+        eco = np.concatenate([
+            self._score_block(rows, swap_table[i:i + step], weight_delta[i:i + step],
+                              flag_override[i:i + step])
+            for i in range(0, len(scenarios), step)
+        ]) if len(scenarios) else np.empty((0, len(rows)))
+
+        rank_before = self._ranks(rows, self.eco_score[None, rows])[0]
+        rank_after = self._ranks(rows, eco)
+        return {
+            "rows": rows,
+            "names": self.names[rows],
+            "eco_score": eco,
+            "delta": np.round(eco - self.eco_score[rows], 1),
+            "rank": rank_after,
+            "rank_change": rank_before - rank_after,
+        }
+
+    def _score_block(self, rows, swap_table, weight_delta, flag_override):
+        codes = self.codes[rows]                                           # (P, 3)
+        codes = np.where(codes >= 0, swap_table[:, np.maximum(codes, 0)], -1)  # (S, P, 3)
+
+        slot = np.arange(MATERIAL_SLOTS) == self.heaviest[rows, None]      # (P, 3)
+        slot &= self.has_material[rows, None]
+        weights = np.maximum(self.weights[rows] + weight_delta[:, None, None] * slot, 0)
+
+        flags = np.where(flag_override[:, None, :] >= 0, flag_override[:, None, :],
+                         self.flags[rows])                                 # (S, P, F)
+        return self._score(codes, weights, flags, self.beauty[rows])
+
+    def _ranks(self, rows, eco):
+        """Category ranks (1 = best) of ``rows`` given their ``(S, P)`` scores.
+
+        Products outside ``rows`` keep their current score.
+        """
+        n = eco.shape[0]
+        ranks = np.empty(eco.shape, dtype=np.int64)
+        # Offsetting each scenario row lets one searchsorted rank all rows
+        offset = np.arange(n)[:, None] * 1000.0
+        selected = self.categories[rows]
+        for category in np.unique(selected):
+            cols = np.flatnonzero(self.categories == category)
+            mine = np.flatnonzero(selected == category)
+            peers = np.tile(self.eco_score[cols], (n, 1))
+            peers[:, np.searchsorted(cols, rows[mine])] = eco[:, mine]
+            flat = np.sort(peers + offset, axis=None)
+            higher = flat.size - np.searchsorted(flat, eco[:, mine] + offset, side="right")
+            # Drop the peers counted from the scenario rows after this one
+            higher -= (n - 1 - np.arange(n))[:, None] * len(cols)
+            ranks[:, mine] = higher + 1
+        return ranks
+
+    def apply(self, scenario, names=None, category=None):
+        """One scenario -> DataFrame of before/after scores and ranks per product."""
+        result = self.bulk([scenario], names, category)
+        rows = result["rows"]
+        return pd.DataFrame({
+            "name": result["names"],
+            "category": self.categories[rows],
+            "eco_score": self.eco_score[rows],
+            "simulated_eco_score": result["eco_score"][0],
+            "delta": result["delta"][0],
+            "rank": result["rank"][0] + result["rank_change"][0],
+            "simulated_rank": result["rank"][0],
+            "rank_change": result["rank_change"][0],
+        })
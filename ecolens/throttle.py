@@ -0,0 +1,220 @@
+"""Request coalescing and rate limiting for model calls.
+
+:class:`GatedClient` wraps an OpenAI client so that every
+``responses.create`` and ``chat.completions.create`` call goes through a
+process-wide :class:`ModelGate`. Because the :mod:`ecolens.llm` functions
+already take the client as an argument, none of them need to change.
+
+The gate does three things:
+
+1. Per-user rate limiting. Every request first takes a token from its
+   own user's bucket, before it can share anything with other users. A
+   user over the rate waits for that token (or gets
+   :class:`RateLimitExceeded`), and other users never inherit the wait.
+2. Coalescing. Requests with identical arguments (the same model, prompt
+   and image) that are in flight together share one call. The first caller
+   makes it; the others wait on its future and get the same response.
+   Typical cases are several users opening the same dashboard explanation
+   or scanning the same product at once.
+3. Per-model rate limiting. Each distinct call takes a token from its
+   model's bucket, so a caller waits instead of hitting the provider's
+   throttling. Coalesced followers take no model tokens.
+
+A wait longer than ``max_wait`` fails with :class:`RateLimitExceeded`.
+"""
+
+import hashlib
+import json
+import threading
+import time
+from concurrent.futures import Future
+from types import SimpleNamespace
+
+from . import tracing
+
+# Model calls per second (sustained) and burst size, per user and per model.
+# One product scan is 2 calls, so a user can scan about 5 products in a
+# burst before being paced.
+USER_RATE = 1.0
+USER_BURST = 10
+MODEL_RATE = 5.0
+MODEL_BURST = 20
+# Seconds a call may wait for a token before failing
+MAX_WAIT = 30.0
+# Per-user buckets kept before refilled (idle) ones are pruned
+MAX_USER_BUCKETS = 10_000
+
+
+class RateLimitExceeded(RuntimeError):
+    """A model call would have waited longer than ``max_wait`` for a token."""
+
+
+class TokenBucket:
+    """``burst`` tokens, refilled at ``rate`` per second. Thread-safe.
+
+    :meth:`reserve` takes a token right away, even if that leaves the
+    balance negative, and returns how long the caller must wait before
+    using it. Callers are therefore served in arrival order.
+    """
+
+    def __init__(self, rate, burst):
+        self.rate = rate
+        self.burst = burst
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now):
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def reserve(self, max_wait=MAX_WAIT):
+        """Take a token; returns seconds to wait, or raises :class:`RateLimitExceeded`."""
+        with self._lock:
+            self._refill(time.monotonic())
+            wait = max(0.0, (1 - self._tokens) / self.rate)
+            if wait > max_wait:
+                raise RateLimitExceeded(
+                    f"too many model requests; try again in {wait:.0f}s"
+                )
+            self._tokens -= 1
+            return wait
+
+    def refund(self):
+        with self._lock:
+            self._tokens = min(self.burst, self._tokens + 1)
+
+    def full(self, now):
+        with self._lock:
+            return self._tokens + (now - self._updated) * self.rate >= self.burst
+
+
+class Coalescer:
+    """Runs one call per distinct in-flight key; concurrent callers share its future."""
+
+    def __init__(self):
+        self.leaders = 0
+        self.followers = 0
+        self._inflight = {}
+        self._lock = threading.Lock()
+
+    def run(self, key, fn):
+        with self._lock:
+            future = self._inflight.get(key)
+            leader = future is None
+            if leader:
+                future = self._inflight[key] = Future()
+                self.leaders += 1
+            else:
+                self.followers += 1
+        if not leader:
+            with tracing.span("model.coalesced"):
+                return future.result()
+        try:
+            result = fn()
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                del self._inflight[key]
+
+
+def request_key(endpoint, kwargs):
+    """Digest identifying a request: the endpoint plus its JSON-encoded arguments."""
+    payload = json.dumps([endpoint, kwargs], sort_keys=True, default=str)
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()
+
+
+class ModelGate:
+    """Rate-limits each user, coalesces identical model requests, then rate-limits each model."""
+
+    def __init__(self, user_rate=USER_RATE, user_burst=USER_BURST, model_rate=MODEL_RATE,
+                 model_burst=MODEL_BURST, max_wait=MAX_WAIT):
+        self.user_rate, self.user_burst = user_rate, user_burst
+        self.model_rate, self.model_burst = model_rate, model_burst
+        self.max_wait = max_wait
+        self.coalescer = Coalescer()
+        self.rejected = 0
+        self.waited = 0
+        self.wait_seconds = 0.0
+        self._users = {}
+        self._models = {}
+        self._lock = threading.Lock()
+
+    def _bucket(self, buckets, key, rate, burst):
+        with self._lock:
+            bucket = buckets.get(key)
+            if bucket is None:
+                if buckets is self._users and len(buckets) >= MAX_USER_BUCKETS:
+                    now = time.monotonic()
+                    for idle in [k for k, b in buckets.items() if b.full(now)]:
+                        del buckets[idle]
+                bucket = buckets[key] = TokenBucket(rate, burst)
+            return bucket
+
+    def call(self, endpoint, kwargs, fn, user=None):
+        """``fn()``, paced for ``user``, coalesced on ``(endpoint, kwargs)``, paced for the model."""
+        key = request_key(endpoint, kwargs)
+        model = kwargs.get("model")
+        if user is None:
+            return self.coalescer.run(key, lambda: self._limited(model, fn))
+        bucket = self._bucket(self._users, user, self.user_rate, self.user_burst)
+        self._take(bucket, user=user)
+        try:
+            return self.coalescer.run(key, lambda: self._limited(model, fn))
+        except RateLimitExceeded:
+            # The model was saturated: no call was made on this user's behalf
+            bucket.refund()
+            raise
+
+    def _limited(self, model, fn):
+        self._take(self._bucket(self._models, model, self.model_rate, self.model_burst), model=model)
+        return fn()
+
+    def _take(self, bucket, **attrs):
+        """Reserve a token from ``bucket`` and sleep until it is usable."""
+        try:
+            wait = bucket.reserve(self.max_wait)
+        except RateLimitExceeded:
+            self.rejected += 1
+            raise
+        if wait > 0:
+            self.waited += 1
+            self.wait_seconds += wait
+            with tracing.span("model.rate_wait", wait_ms=round(wait * 1000, 1), **attrs):
+                time.sleep(wait)
+
+    def stats(self):
+        return {
+            "calls": self.coalescer.leaders,
+            "coalesced": self.coalescer.followers,
+            "rate_waits": self.waited,
+            "rate_wait_s": round(self.wait_seconds, 3),
+            "rejected": self.rejected,
+            "users_tracked": len(self._users),
+        }
+
+
+class _Endpoint:
+    def __init__(self, name, create, gate, user):
+        self._name, self._create, self._gate, self._user = name, create, gate, user
+
+    def create(self, **kwargs):
+        return self._gate.call(self._name, kwargs, lambda: self._create(**kwargs), self._user)
+
+
+class GatedClient:
+    """The parts of an OpenAI client :mod:`ecolens.llm` uses, routed through ``gate``.
+
+    Cheap to build: make one per request with the caller's ``user`` id.
+    """
+
+    def __init__(self, client, gate, user=None):
+        self.responses = _Endpoint("responses", client.responses.create, gate, user)
+        self.chat = SimpleNamespace(
+            completions=_Endpoint("chat.completions", client.chat.completions.create, gate, user)
+        )
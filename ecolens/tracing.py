@@ -0,0 +1,139 @@
+"""Span-based timing for the app's hot paths.
+
+Spans are kept in a bounded in-process ring buffer, so recording one costs
+a couple of ``perf_counter_ns`` calls and a deque append. ``summary()``
+aggregates them into per-phase percentiles and ``export_chrome_trace()``
+writes them in the Chrome/Perfetto Trace Event Format.
+"""
+
+import functools
+import json
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+MAX_SPANS = 20_000
+
+_spans = deque(maxlen=MAX_SPANS)
+_lock = threading.Lock()
+_pid = os.getpid()
+
+
+class Span:
+    __slots__ = ("name", "start_ns", "duration_ns", "thread_id", "attrs")
+
+    def __init__(self, name, attrs=None):
+        self.name = name
+        self.attrs = attrs or {}
+        self.thread_id = threading.get_ident()
+        self.duration_ns = None
+        self.start_ns = time.perf_counter_ns()
+
+    def end(self):
+        """Close the span and record it (idempotent)."""
+        if self.duration_ns is None:
+            self.duration_ns = time.perf_counter_ns() - self.start_ns
+            _spans.append(self)
+        return self
+
+    @property
+    def duration_ms(self):
+        return None if self.duration_ns is None else self.duration_ns / 1e6
+
+
+def start_span(name, **attrs):
+    """Open a span that is recorded when ``.end()`` is called."""
+    return Span(name, attrs)
+
+
+@contextmanager
+def span(name, **attrs):
+    """Time the enclosed block as ``name``."""
+    s = Span(name, attrs)
+    try:
+        yield s
+    finally:
+        s.end()
+
+
+def traced(name=None):
+    """Decorator form of :func:`span`; defaults to the function's name."""
+    def decorate(fn):
+        label = name or fn.__qualname__
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with span(label):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+def spans():
+    """Snapshot of the recorded spans, oldest first."""
+    with _lock:
+        return list(_spans)
+
+
+def clear():
+    with _lock:
+        _spans.clear()
+
+
+def _percentile(sorted_values, q):
+    idx = min(len(sorted_values) - 1, max(0, int(round(q * (len(sorted_values) - 1)))))
+    return sorted_values[idx]
+
+
+def summary():
+    """Per-span-name ``{count, p50_ms, p95_ms, max_ms, total_ms}`` rows."""
+    by_name = {}
+    for s in spans():
+        by_name.setdefault(s.name, []).append(s.duration_ns / 1e6)
+
+    rows = []
+    for name, values in by_name.items():
+        values.sort()
+        rows.append({
+            "phase": name,
+            "count": len(values),
+            "p50_ms": round(_percentile(values, 0.50), 3),
+            "p95_ms": round(_percentile(values, 0.95), 3),
+            "max_ms": round(values[-1], 3),
+            "total_ms": round(sum(values), 3),
+        })
+    rows.sort(key=lambda r: r["total_ms"], reverse=True)
+    return rows
+
+
+def chrome_trace(recorded=None):
+    """Spans as a Trace Event Format document (``chrome://tracing``, Perfetto)."""
+    events = []
+    for s in spans() if recorded is None else recorded:
+        events.append({
+            "name": s.name,
+            "cat": s.name.split(".", 1)[0],
+            "ph": "X",
+            "ts": s.start_ns / 1000,
+            "dur": s.duration_ns / 1000,
+            "pid": _pid,
+            "tid": s.thread_id,
+            "args": {k: str(v) for k, v in s.attrs.items()},
+        })
+    return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+
+def export_chrome_trace(directory=None):
+    """Write the recorded spans to ``<directory>/ecolens-trace-<time>.json``.
+
+    ``directory`` defaults to ``$ECOLENS_TRACE_DIR`` or ``traces``. Returns
+    the path written.
+    """
+    directory = directory or os.environ.get("ECOLENS_TRACE_DIR", "traces")
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, time.strftime("ecolens-trace-%Y%m%d-%H%M%S.json"))
+    with open(path, "w") as f:
+        json.dump(chrome_trace(), f)
+    return path
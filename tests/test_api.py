@@ -0,0 +1,64 @@
+import asyncio
+import os
+
+import pandas as pd
+import pytest
+
+from ecolens.api import MAX_HEADERS, ScoringServer, load_scoring_index
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@pytest.fixture(scope="module")
+def index():
+    materials_df = pd.read_csv(os.path.join(ROOT, "material.csv"))
+    return load_scoring_index(os.path.join(ROOT, "product.csv"), materials_df)
+
+
+def exchange(server, request):
+    """Send raw ``request`` bytes to ``server`` and return the status line."""
+    async def run():
+        listener = await asyncio.start_server(server.handle, "127.0.0.1", 0)
+        host, port = listener.sockets[0].getsockname()[:2]
+        async with listener:
+            reader, writer = await asyncio.open_connection(host, port)
+            writer.write(request)
+            await writer.drain()
+            response = await asyncio.wait_for(reader.read(), 5)
+            writer.close()
+        return response.split(b"\r\n", 1)[0].decode()
+
+    return asyncio.run(run())
+
+
+def test_product(index):
+    request = b"GET /product?name=Coca%20Cola%201L HTTP/1.1\r\nConnection: close\r\n\r\n"
+    assert exchange(ScoringServer(index), request) == "HTTP/1.1 200 OK"
+
+
+@pytest.mark.parametrize("length", [b"-5", b"abc"])
+def test_bad_content_length(index, length):
+    request = b"POST /score HTTP/1.1\r\nContent-Length: " + length + b"\r\n\r\n"
+    assert exchange(ScoringServer(index), request) == "HTTP/1.1 400 Bad Request"
+
+
+def test_too_many_headers(index):
+    headers = b"".join(b"X-H%d: 1\r\n" % i for i in range(MAX_HEADERS + 1))
+    request = b"GET /product?name=x HTTP/1.1\r\n" + headers + b"\r\n"
+    assert exchange(ScoringServer(index), request).startswith("HTTP/1.1 431")
+
+    headers = b"".join(b"X-H%d: 1\r\n" % i for i in range(MAX_HEADERS - 1))
+    request = b"GET /product?name=x HTTP/1.1\r\n" + headers + b"Connection: close\r\n\r\n"
+    assert exchange(ScoringServer(index), request).startswith("HTTP/1.1 404")
+
+
+def test_handler_error_is_a_500(index, capsys):
+    server = ScoringServer(index)
+
+    def broken(target):
+        raise RuntimeError("boom")
+
+    server.get = broken
+    request = b"GET /product?name=x HTTP/1.1\r\n\r\n"
+    assert exchange(server, request) == "HTTP/1.1 500 Internal Server Error"
+    assert "RuntimeError: boom" in capsys.readouterr().err
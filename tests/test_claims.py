@@ -0,0 +1,46 @@
+import os
+
+import pytest
+
+from ecolens.claims import check_claims, load_detector
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@pytest.fixture(scope="module")
+def detector():
+    return load_detector(os.path.join(ROOT, "claims.csv"))
+
+
+def claims(detector, text, **kwargs):
+    return [c["claim"] for c in detector.detect(text, **kwargs)]
+
+
+@pytest.mark.parametrize("text", [
+    "Not recyclable",
+    "Non-organic cotton",
+    "This pack isn't recyclable.",
+    "not a natural product",
+    "Free of natural dyes",
+])
+def test_negated_phrases_are_not_claims(detector, text):
+    assert claims(detector, text) == []
+
+
+def test_negation_stops_at_the_clause(detector):
+    assert claims(detector, "No artificial colours, recyclable packaging") == ["recyclable"]
+    assert claims(detector, "Recyclable! Not compostable") == ["recyclable"]
+
+
+def test_phrases_that_start_with_no_are_claims(detector):
+    assert claims(detector, "No palm oil. 100% natural") == ["palm-oil-free", "natural"]
+
+
+def test_product_name_is_not_a_claim(detector):
+    assert claims(detector, "Lipton Green Tea, green packaging", exclude=("Lipton Green Tea",)) == ["green"]
+    assert claims(detector, "Green Giant sweet corn", exclude=("Green Giant Sweet Corn",)) == []
+
+
+def test_honest_not_recyclable_is_not_contradicted(detector):
+    row = {"eco_score": 40.0, "recyclable_packaging": 0}
+    assert check_claims(detector.detect("Packaging not recyclable"), row) == []
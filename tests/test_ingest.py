@@ -0,0 +1,33 @@
+import pandas as pd
+
+from ecolens.ingest import validate_chunk
+from ecolens.scoring import ALL_FLAGS
+
+VOCABULARY = ["PET", "Glass"]
+
+
+def raw_chunk(**columns):
+    base = {"name": ["Cola"], "brand": ["Acme"], "category": ["Soft Drink"],
+            "material_1": ["PET"], "weight_1_g": ["30"]}
+    base.update(columns)
+    return pd.DataFrame(base, dtype=str)
+
+
+def test_blank_flag_means_zero():
+    for cell in ["", " ", "\t"]:
+        clean, rejected, _ = validate_chunk(raw_chunk(palm_oil=[cell]), VOCABULARY)
+        assert len(rejected) == 0, repr(cell)
+        assert clean["palm_oil"].tolist() == [0]
+
+
+def test_padded_flag_is_read():
+    clean, rejected, _ = validate_chunk(raw_chunk(palm_oil=[" 1 "]), VOCABULARY)
+    assert len(rejected) == 0
+    assert clean["palm_oil"].tolist() == [1]
+    assert set(ALL_FLAGS) <= set(clean.columns)
+
+
+def test_invalid_flag_is_rejected():
+    clean, rejected, _ = validate_chunk(raw_chunk(palm_oil=["2"]), VOCABULARY)
+    assert len(clean) == 0
+    assert rejected["reject_reason"].tolist() == ["invalid palm_oil"]
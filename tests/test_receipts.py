@@ -0,0 +1,36 @@
+import os
+
+import pytest
+
+from ecolens.compact import load_catalogue
+from ecolens.receipts import match_receipt, receipt_lines
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+COLUMNS = ["item", "quantity", "product", "confidence", "category", "eco_score"]
+
+
+@pytest.fixture(scope="module")
+def catalogue():
+    _, catalogue, _, _ = load_catalogue(os.path.join(ROOT, "product.csv"),
+                                        os.path.join(ROOT, "material.csv"))
+    return catalogue
+
+
+@pytest.mark.parametrize("frame", [False, True])
+def test_empty_receipt(catalogue, frame):
+    result = match_receipt([], catalogue.frame() if frame else catalogue)
+    assert list(result.columns) == COLUMNS
+    assert len(result) == 0
+
+
+def test_nothing_read_off_the_receipt(catalogue):
+    items = receipt_lines("SUBTOTAL 3.98\nVISA ****1234\nThank you!")
+    assert items == []
+    assert len(match_receipt(items, catalogue)) == 0
+
+
+def test_matches_line_items(catalogue):
+    result = match_receipt([("COCA COLA 1L", 2), ("xyzzy", 1)], catalogue)
+    assert result["product"].tolist() == ["Coca Cola 1L", None]
+    assert result["quantity"].tolist() == [2, 1]
+    assert result["eco_score"].notna().tolist() == [True, False]
@@ -0,0 +1,74 @@
+import threading
+import time
+
+import pytest
+
+from ecolens.throttle import ModelGate, RateLimitExceeded
+
+REQUEST = {"model": "gpt-4o-mini", "input": "explain Coca Cola 1L"}
+
+
+def _start_leader(gate, user, calls, release):
+    """Start ``user``'s call on a thread; returns once the model call is in flight."""
+    started = threading.Event()
+    results = []
+
+    def fn():
+        calls.append(user)
+        started.set()
+        release.wait(5)
+        return "reply"
+
+    thread = threading.Thread(target=lambda: results.append(gate.call("responses", REQUEST, fn, user)))
+    thread.start()
+    assert started.wait(5)
+    return thread, results
+
+
+def _follow(gate, user, calls):
+    def fn():
+        calls.append(user)
+        return "second call"
+
+    return gate.call("responses", REQUEST, fn, user)
+
+
+def test_two_users_share_one_call():
+    gate = ModelGate()
+    calls, release = [], threading.Event()
+    thread, results = _start_leader(gate, "alice", calls, release)
+
+    follower = []
+    joined = threading.Thread(target=lambda: follower.append(_follow(gate, "bob", calls)))
+    joined.start()
+    deadline = time.monotonic() + 5
+    while gate.coalescer.followers == 0 and joined.is_alive() and time.monotonic() < deadline:
+        joined.join(0.01)
+    followers = gate.coalescer.followers
+    release.set()
+    thread.join(5)
+    joined.join(5)
+
+    assert followers == 1, "bob never joined alice's call"
+    assert calls == ["alice"]
+    assert results == follower == ["reply"]
+    assert gate.stats()["calls"] == 1
+    assert gate.stats()["coalesced"] == 1
+
+
+def test_follower_is_limited_by_its_own_bucket_only():
+    gate = ModelGate(user_rate=0.001, user_burst=1, max_wait=0.5)
+    calls, release = [], threading.Event()
+    # bob spends his only token; alice's bucket is untouched
+    assert _follow(gate, "bob", calls) == "second call"
+    thread, results = _start_leader(gate, "alice", calls, release)
+
+    with pytest.raises(RateLimitExceeded):
+        _follow(gate, "bob", calls)
+    release.set()
+    thread.join(5)
+
+    assert results == ["reply"]
+    assert calls == ["bob", "alice"]
+    assert gate.stats()["rejected"] == 1
+    assert gate.stats()["coalesced"] == 0